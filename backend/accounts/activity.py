@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import atexit
+import logging
+import os
+import threading
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import close_old_connections
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+
+logger = logging.getLogger(__name__)
+
+
+class LastLoginBuffer:
+    # Write-behind for User.last_login. A login only notes its timestamp in
+    # memory; a background thread per worker writes everything noted since
+    # the previous flush as one UPDATE every LAST_LOGIN_FLUSH_INTERVAL
+    # seconds, or as soon as LAST_LOGIN_BATCH_SIZE users are waiting. Repeat
+    # logins between flushes collapse into one row. A flush writes at most
+    # LAST_LOGIN_BATCH_SIZE users per UPDATE; a failed batch puts itself and
+    # the unwritten rest back, and whatever is still buffered is written at
+    # exit. While the database is down the buffer holds at most
+    # LAST_LOGIN_MAX_PENDING users and drops (and counts) logins of any more.
+    # LAST_LOGIN_FLUSH_INTERVAL=0 writes each login inline instead.
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._pending: dict = {}
+        self._thread: threading.Thread | None = None
+        self._thread_pid: int | None = None
+        self.recorded = 0
+        self.written = 0
+        self.flushes = 0
+        self.failures = 0
+        self.dropped = 0
+        self._shedding = False
+        atexit.register(self.flush)
+
+    @property
+    def interval(self) -> float:
+        return getattr(settings, "LAST_LOGIN_FLUSH_INTERVAL", 5.0)
+
+    @property
+    def batch_size(self) -> int:
+        return max(getattr(settings, "LAST_LOGIN_BATCH_SIZE", 500), 1)
+
+    @property
+    def max_pending(self) -> int:
+        return getattr(settings, "LAST_LOGIN_MAX_PENDING", 100_000)
+
+    def record(self, user, when=None) -> None:
+        if not api_settings.UPDATE_LAST_LOGIN:
+            return
+        when = when or timezone.now()
+        user.last_login = when
+        with self._lock:
+            self._merge({user.pk: when})
+            self.recorded += 1
+            full = len(self._pending) >= self.batch_size
+            if self.interval > 0:
+                self._ensure_thread()
+        if self.interval <= 0:
+            self.flush()
+        elif full:
+            self._wake.set()
+
+    async def arecord(self, user, when=None) -> None:
+        if self.interval <= 0:
+            await sync_to_async(self.record)(user, when)
+        else:
+            self.record(user, when)
+
+    def _merge(self, timestamps: dict) -> None:
+        # Caller holds self._lock.
+        pending, limit = self._pending, self.max_pending
+        for pk, when in timestamps.items():
+            current = pending.get(pk)
+            if current is None and len(pending) >= limit:
+                self.dropped += 1
+                if not self._shedding:
+                    self._shedding = True
+                    logger.warning("last_login buffer is full (%d users); dropping logins until a flush succeeds", limit)
+                continue
+            if current is None or current < when:
+                pending[pk] = when
+
+    def _ensure_thread(self) -> None:
+        # A thread inherited across fork() does not run in the child; start a fresh one.
+        if self._thread is None or self._thread_pid != os.getpid():
+            self._thread = threading.Thread(target=self._run, name="last-login-flush", daemon=True)
+            self._thread_pid = os.getpid()
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            interval = self.interval
+            self._wake.wait(interval if interval > 0 else None)
+            self._wake.clear()
+            close_old_connections()
+            self.flush()
+
+    def flush(self) -> int:
+        # Flushes are serialized so a put-back never races a newer batch.
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            items = list(pending.items())
+            size, written = self.batch_size, 0
+            for start in range(0, len(items), size):
+                batch = dict(items[start : start + size])
+                try:
+                    get_user_model()._default_manager.update_last_logins(batch)
+                except Exception:
+                    unwritten = dict(items[start:])
+                    logger.exception("Writing last_login for %d users failed; will retry", len(unwritten))
+                    with self._lock:
+                        self._merge(unwritten)
+                        self.failures += 1
+                    return written
+                written += len(batch)
+                with self._lock:
+                    self.written += len(batch)
+                    self.flushes += 1
+                    self._shedding = False
+            return written
+
+    def stats(self) -> dict:
+        return {
+            "pending": len(self._pending),
+            "recorded": self.recorded,
+            "written": self.written,
+            "flushes": self.flushes,
+            "failures": self.failures,
+            "dropped": self.dropped,
+        }
+
+
+last_login_buffer = LastLoginBuffer()
@@ -1,14 +1,61 @@
 from django.contrib import admin
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.admin.views.main import ORDER_VAR, ChangeList
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 
 from accounts.models import User
+from accounts.pagination import EstimatedCountPaginator, decode_cursor, encode_cursor, older_than
+
+CURSOR_VAR = "after"
+
+
+class KeysetChangeList(ChangeList):
+    # With the default ("-created_at", "-id") ordering, pages are fetched with
+    # a WHERE on the last row of the previous page (walking
+    # accounts_user_created_idx) instead of OFFSET, so page 10,000 costs the
+    # same as page 1. Sorting by another column falls back to numbered pages.
+
+    def get_filters_params(self, params=None):
+        lookup_params = super().get_filters_params(params)
+        lookup_params.pop(CURSOR_VAR, None)
+        return lookup_params
+
+    def get_results(self, request):
+        self.keyset = ORDER_VAR not in self.params and not self.show_all
+        if not self.keyset:
+            return super().get_results(request)
+
+        try:
+            self.cursor = decode_cursor(request.GET[CURSOR_VAR]) if CURSOR_VAR in request.GET else None
+        except ValueError as exc:
+            raise IncorrectLookupParameters from exc
+        queryset = older_than(self.queryset, self.cursor) if self.cursor else self.queryset
+        rows = list(queryset[: self.list_per_page + 1])
+        result_list = rows[: self.list_per_page]
+
+        self.paginator = self.model_admin.get_paginator(request, self.queryset, self.list_per_page)
+        self.result_count = self.paginator.count
+        self.show_full_result_count = False
+        self.full_result_count = None
+        self.show_admin_actions = True
+        self.result_list = result_list
+        self.can_show_all = False
+        self.multi_page = bool(self.cursor) or len(rows) > self.list_per_page
+        self.first_page_url = self.get_query_string(remove=[CURSOR_VAR])
+        self.next_page_url = None
+        if len(rows) > self.list_per_page:
+            last = result_list[-1]
+            self.next_page_url = self.get_query_string({CURSOR_VAR: encode_cursor(last.created_at, last.pk)})
 
 
 @admin.register(User)
 class UserAdmin(BaseUserAdmin):
-    ordering = ("-created_at",)
+    ordering = ("-created_at", "-id")
     list_display = ("email", "is_staff", "is_active", "date_joined")
     search_fields = ("email",)
+    search_help_text = "Emails starting with the search term."
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     readonly_fields = ("id", "date_joined", "last_login", "created_at", "updated_at")
 
     fieldsets = (
@@ -25,3 +72,14 @@ class UserAdmin(BaseUserAdmin):
             },
         ),
     )
+
+    def get_changelist(self, request, **kwargs):
+        return KeysetChangeList
+
+    def get_search_results(self, request, queryset, search_term):
+        # Stored emails are lower-cased, so a case-sensitive prefix match is
+        # exact and can use accounts_user_email_prefix_idx; icontains cannot.
+        term = search_term.strip().lower()
+        if not term:
+            return queryset, False
+        return queryset.filter(email__startswith=term), False
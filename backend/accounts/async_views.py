@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+from rest_framework import permissions, status
+from rest_framework.response import Response
+
+from accounts.serializers import (
+    AsyncLoginSerializer,
+    AsyncLogoutSerializer,
+    AsyncRefreshTokenSerializer,
+    AsyncRegisterSerializer,
+)
+from accounts.services import abuild_auth_response
+from api.async_views import AsyncAPIView
+
+
+class AsyncRegisterAPIView(AsyncAPIView):
+    permission_classes = [permissions.AllowAny]
+    throttle_scope = "auth_register"
+
+    async def post(self, request, *args, **kwargs):
+        serializer = AsyncRegisterSerializer(data=request.data, context={"request": request})
+        await serializer.ais_valid(raise_exception=True)
+        user = await serializer.asave()
+        payload = await abuild_auth_response(user)
+        return Response(payload, status=status.HTTP_201_CREATED)
+
+
+class AsyncLoginAPIView(AsyncAPIView):
+    permission_classes = [permissions.AllowAny]
+    throttle_scope = "auth_login"
+
+    async def post(self, request, *args, **kwargs):
+        serializer = AsyncLoginSerializer(data=request.data, context={"request": request})
+        serializer.is_valid(raise_exception=True)
+        user = await serializer.aauthenticate()
+        payload = await abuild_auth_response(user)
+        return Response(payload, status=status.HTTP_200_OK)
+
+
+class AsyncRefreshAPIView(AsyncAPIView):
+    permission_classes = [permissions.AllowAny]
+    throttle_scope = "auth_refresh"
+
+    async def post(self, request, *args, **kwargs):
+        serializer = AsyncRefreshTokenSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return Response(await serializer.arotate(), status=status.HTTP_200_OK)
+
+
+class AsyncLogoutAPIView(AsyncAPIView):
+    permission_classes = [permissions.IsAuthenticated]
+    throttle_scope = "auth_logout"
+
+    async def post(self, request, *args, **kwargs):
+        serializer = AsyncLogoutSerializer(data=request.data, context={"request": request})
+        serializer.is_valid(raise_exception=True)
+        await serializer.asave()
+        return Response({"detail": "Logout successful."}, status=status.HTTP_200_OK)
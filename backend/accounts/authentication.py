@@ -0,0 +1,245 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from api.routers import use_primary_if_written
+from api.throttling import SharedWindowTable
+
+SNAPSHOT_FIELDS = ("id", "email", "is_active", "is_staff", "is_superuser")
+
+# A change stamp per user, shared by every worker on the host. Saving or
+# deleting a user bumps it; a cached principal whose stamp moved since it was
+# cached is read again, whichever worker made the change.
+principal_changes = SharedWindowTable(
+    "goplan-principal-changes", "AUTH_PRINCIPAL_SHARED_PATH", "AUTH_PRINCIPAL_SHARED_SLOTS"
+)
+
+# Large enough that recording a change never counts as over a limit.
+_UNLIMITED = 2**32 - 1
+
+
+def snapshot_fields(model) -> tuple[str, ...]:
+    # Model.from_db() expects partial values in concrete field order.
+    return tuple(field.attname for field in model._meta.concrete_fields if field.attname in SNAPSHOT_FIELDS)
+
+
+class PrincipalCache:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._entries: OrderedDict[bytes, tuple] = OrderedDict()
+            self._keys_by_user: dict[str, set[bytes]] = {}
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+            self.expirations = 0
+            self.invalidations = 0
+            self.changes = 0
+
+    @property
+    def max_size(self) -> int:
+        return getattr(settings, "AUTH_PRINCIPAL_CACHE_SIZE", 10_000)
+
+    @property
+    def ttl(self) -> float:
+        return getattr(settings, "AUTH_PRINCIPAL_CACHE_TTL", 60.0)
+
+    @staticmethod
+    def _change_key(user_pk) -> str:
+        return f"user:{user_pk}"
+
+    def stamp(self, user_pk):
+        # Read before the user row, so a change that lands in between is not missed.
+        return principal_changes.stamp(self._change_key(user_pk), time.time())
+
+    def get(self, raw_token: bytes):
+        with self._lock:
+            entry = self._entries.get(raw_token)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, validated_token, db_alias, user_key, fields, values, stamp = entry
+            if expires_at <= time.monotonic():
+                self._discard(raw_token)
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+        changed = self.stamp(user_key) != stamp
+        with self._lock:
+            if changed:
+                if self._entries.get(raw_token) is entry:
+                    self._discard(raw_token)
+                self.changes += 1
+                self.misses += 1
+                return None
+            if raw_token in self._entries:
+                self._entries.move_to_end(raw_token)
+            self.hits += 1
+        return validated_token, db_alias, fields, values
+
+    def put(self, raw_token: bytes, validated_token, user, stamp) -> None:
+        if self.max_size <= 0:
+            return
+        lifetime = min(self.ttl, validated_token["exp"] - time.time())
+        if lifetime <= 0:
+            return
+        fields = snapshot_fields(type(user))
+        values = tuple(getattr(user, field) for field in fields)
+        user_key = str(user.pk)
+        with self._lock:
+            if raw_token in self._entries:
+                self._discard(raw_token)
+            self._entries[raw_token] = (
+                time.monotonic() + lifetime,
+                validated_token,
+                user._state.db,
+                user_key,
+                fields,
+                values,
+                stamp,
+            )
+            self._keys_by_user.setdefault(user_key, set()).add(raw_token)
+            while len(self._entries) > self.max_size:
+                self._discard(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _discard(self, raw_token: bytes) -> None:
+        entry = self._entries.pop(raw_token)
+        user_key = entry[3]
+        keys = self._keys_by_user.get(user_key)
+        if keys is not None:
+            keys.discard(raw_token)
+            if not keys:
+                del self._keys_by_user[user_key]
+
+    def invalidate_user(self, user_pk) -> None:
+        # Also call this after writes that send no post_save, such as QuerySet.update().
+        principal_changes.hit(self._change_key(user_pk), _UNLIMITED, max(self.ttl, 1.0), time.time())
+        with self._lock:
+            keys = self._keys_by_user.pop(str(user_pk), ())
+            for raw_token in keys:
+                self._entries.pop(raw_token, None)
+            if keys:
+                self.invalidations += 1
+
+    def invalidate_if_changed(self, user, update_fields=None) -> None:
+        # Compares against the values the instance was loaded (or last saved)
+        # with, so saves that leave the snapshot alone cost other workers nothing.
+        fields = snapshot_fields(type(user))
+        if update_fields is not None and not set(update_fields) & set(fields):
+            return
+        loaded = getattr(user, "_loaded_values", None)
+        # Deferred fields were not loaded on this instance, so the save cannot have changed them.
+        current = user.__dict__
+        changed = loaded is None or any(
+            field in current and current[field] != loaded.get(field)
+            for field in fields
+        )
+        if changed:
+            self.invalidate_user(user.pk)
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+            "changes": self.changes,
+        }
+
+
+principal_cache = PrincipalCache()
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    # Serves repeat requests carrying the same access token from a per-worker
+    # cache of the decoded token and a snapshot of the user row, so the common
+    # authenticated path neither re-verifies the signature nor queries accounts_user.
+    # A hit still checks the user's change stamp in principal_changes.
+
+    def authenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            # Revocation by password hash needs the full row on every request.
+            validated_token = self.get_validated_token(raw_token)
+            return self.get_user(validated_token), validated_token
+
+        cached = principal_cache.get(raw_token)
+        if cached is not None:
+            validated_token, db_alias, fields, values = cached
+            return self.user_model.from_db(db_alias, fields, values), validated_token
+
+        validated_token = self.get_validated_token(raw_token)
+        stamp = principal_cache.stamp(validated_token.get(api_settings.USER_ID_CLAIM))
+        user = self.get_user(validated_token)
+        principal_cache.put(raw_token, validated_token, user, stamp)
+        return user, validated_token
+
+    async def aauthenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            return await sync_to_async(self.authenticate)(request)
+
+        cached = principal_cache.get(raw_token)
+        if cached is not None:
+            validated_token, db_alias, fields, values = cached
+            return self.user_model.from_db(db_alias, fields, values), validated_token
+
+        validated_token = self.get_validated_token(raw_token)
+        stamp = principal_cache.stamp(validated_token.get(api_settings.USER_ID_CLAIM))
+        user = await self.aget_user(validated_token)
+        principal_cache.put(raw_token, validated_token, user, stamp)
+        return user, validated_token
+
+    def get_user(self, validated_token):
+        use_primary_if_written(user_id=validated_token.get(api_settings.USER_ID_CLAIM))
+        return super().get_user(validated_token)
+
+    async def aget_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as exc:
+            raise InvalidToken(_("Token contained no recognizable user identification")) from exc
+
+        use_primary_if_written(user_id=user_id)
+
+        try:
+            user = await self.user_model.objects.aget(**{api_settings.USER_ID_FIELD: user_id})
+        except self.user_model.DoesNotExist as exc:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found") from exc
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        return user
@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+
+from accounts.hashing import hashing_pool
+
+UserModel = get_user_model()
+
+
+class AccountModelBackend(ModelBackend):
+    # ModelBackend.aauthenticate runs the dummy hash for unknown emails with the
+    # sync set_password(), which would block the event loop for a full hash.
+
+    async def aauthenticate(self, request, username=None, password=None, **kwargs):
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        try:
+            user = await UserModel._default_manager.aget_by_natural_key(username)
+        except UserModel.DoesNotExist:
+            # Run the default password hasher once to reduce the timing
+            # difference between an existing and a nonexistent user (#20760).
+            await hashing_pool.amake_password(password)
+            return None
+        if await user.acheck_password(password) and self.user_can_authenticate(user):
+            return user
+        return None
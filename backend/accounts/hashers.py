@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+from django.conf import settings
+from django.contrib.auth.hashers import (
+    Argon2PasswordHasher,
+    BCryptSHA256PasswordHasher,
+    PBKDF2PasswordHasher,
+    ScryptPasswordHasher,
+)
+
+
+class CalibratedHasherMixin:
+    # Cost parameters come from PASSWORD_HASHER_PARAMS (written by `manage.py
+    # calibrate_hashers`); anything not calibrated keeps Django's default.
+    tunable_params: tuple[str, ...] = ()
+
+    def __init__(self):
+        params = getattr(settings, "PASSWORD_HASHER_PARAMS", {}).get(self.algorithm, {})
+        for name in self.tunable_params:
+            if name in params:
+                setattr(self, name, int(params[name]))
+
+
+class CalibratedPBKDF2PasswordHasher(CalibratedHasherMixin, PBKDF2PasswordHasher):
+    tunable_params = ("iterations",)
+
+
+class CalibratedScryptPasswordHasher(CalibratedHasherMixin, ScryptPasswordHasher):
+    tunable_params = ("work_factor", "block_size", "parallelism", "maxmem")
+
+
+class CalibratedArgon2PasswordHasher(CalibratedHasherMixin, Argon2PasswordHasher):
+    tunable_params = ("time_cost", "memory_cost", "parallelism")
+
+
+class CalibratedBCryptSHA256PasswordHasher(CalibratedHasherMixin, BCryptSHA256PasswordHasher):
+    tunable_params = ("rounds",)
+
@@ -0,0 +1,291 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from api.metrics import observe_phase
+
+logger = logging.getLogger(__name__)
+
+
+class HashingUnavailable(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "Password hashing is temporarily overloaded. Please retry shortly."
+    default_code = "hashing_unavailable"
+
+
+def _init_worker(settings_module: str) -> None:
+    # Hashers only need settings, so workers skip django.setup() and the app registry.
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", settings_module)
+
+
+def _make_password(password: str) -> tuple[str, float]:
+    from django.contrib.auth.hashers import make_password
+
+    started = time.perf_counter()
+    encoded = make_password(password)
+    return encoded, time.perf_counter() - started
+
+
+def _verify_password(password: str, encoded: str) -> tuple[tuple[bool, bool], float]:
+    from django.contrib.auth.hashers import verify_password
+
+    started = time.perf_counter()
+    result = verify_password(password, encoded)
+    return result, time.perf_counter() - started
+
+
+class HashingPool:
+    # Runs password hashing in a process pool with a bounded number of pending
+    # jobs. Callers past the bound get HashingUnavailable (503) immediately
+    # instead of queueing behind a login burst.
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._executor: ProcessPoolExecutor | None = None
+        self._executor_pid: int | None = None
+        self.pending = 0
+        self.submitted = 0
+        self.completed = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+        self.hash_seconds_total = 0.0
+
+    @property
+    def workers(self) -> int:
+        return getattr(settings, "PASSWORD_HASHING_WORKERS", 0)
+
+    @property
+    def max_pending(self) -> int:
+        return getattr(settings, "PASSWORD_HASHING_MAX_PENDING", 32)
+
+    @property
+    def timeout(self) -> float:
+        return getattr(settings, "PASSWORD_HASHING_TIMEOUT", 5.0)
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        # A pool inherited across fork() belongs to the parent; start a fresh one.
+        if self._executor is None or self._executor_pid != os.getpid():
+            start_method = getattr(settings, "PASSWORD_HASHING_START_METHOD", "forkserver")
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context(start_method),
+                initializer=_init_worker,
+                initargs=(os.environ.get("DJANGO_SETTINGS_MODULE", "configs.settings"),),
+            )
+            self._executor_pid = os.getpid()
+        return self._executor
+
+    def _reset_executor(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _acquire(self) -> None:
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise HashingUnavailable()
+            self.pending += 1
+            self.submitted += 1
+
+    def _release(self, started: float, hash_seconds: float | None) -> None:
+        latency = time.perf_counter() - started
+        with self._lock:
+            self.pending -= 1
+            if hash_seconds is None:
+                return
+            self.completed += 1
+            self.latency_total += latency
+            self.latency_max = max(self.latency_max, latency)
+            self.hash_seconds_total += hash_seconds
+
+    def _submit(self, fn, *args) -> Future:
+        self._acquire()
+        started = time.perf_counter()
+        try:
+            with self._lock:
+                executor = self._get_executor()
+            future = executor.submit(fn, *args)
+        except (BrokenProcessPool, RuntimeError) as exc:
+            self._release(started, None)
+            self._reset_executor()
+            raise HashingUnavailable() from exc
+
+        def on_done(done: Future) -> None:
+            if done.cancelled() or done.exception() is not None:
+                self._release(started, None)
+            else:
+                self._release(started, done.result()[1])
+
+        future.add_done_callback(on_done)
+        return future
+
+    def _run_inline(self, fn, *args):
+        self._acquire()
+        started = time.perf_counter()
+        hash_seconds = None
+        try:
+            result, hash_seconds = fn(*args)
+        finally:
+            self._release(started, hash_seconds)
+        return result
+
+    def run(self, fn, *args):
+        started = time.perf_counter()
+        try:
+            return self._run(fn, *args)
+        finally:
+            observe_phase("password_hashing", time.perf_counter() - started)
+
+    async def arun(self, fn, *args):
+        started = time.perf_counter()
+        try:
+            return await self._arun(fn, *args)
+        finally:
+            observe_phase("password_hashing", time.perf_counter() - started)
+
+    def _run(self, fn, *args):
+        if self.workers <= 0:
+            return self._run_inline(fn, *args)
+
+        future = self._submit(fn, *args)
+        try:
+            return future.result(timeout=self.timeout)[0]
+        except FutureTimeoutError as exc:
+            future.cancel()
+            self.timeouts += 1
+            raise HashingUnavailable() from exc
+        except BrokenProcessPool as exc:
+            self._reset_executor()
+            raise HashingUnavailable() from exc
+
+    async def _arun(self, fn, *args):
+        if self.workers <= 0:
+            return await sync_to_async(self._run_inline, thread_sensitive=False)(fn, *args)
+
+        future = self._submit(fn, *args)
+        try:
+            result = await asyncio.wait_for(asyncio.wrap_future(future), timeout=self.timeout)
+        except asyncio.TimeoutError as exc:
+            self.timeouts += 1
+            raise HashingUnavailable() from exc
+        except BrokenProcessPool as exc:
+            self._reset_executor()
+            raise HashingUnavailable() from exc
+        return result[0]
+
+    def make_password(self, password: str) -> str:
+        return self.run(_make_password, password)
+
+    def verify_password(self, password: str, encoded: str) -> tuple[bool, bool]:
+        return self.run(_verify_password, password, encoded)
+
+    async def amake_password(self, password: str) -> str:
+        return await self.arun(_make_password, password)
+
+    async def averify_password(self, password: str, encoded: str) -> tuple[bool, bool]:
+        return await self.arun(_verify_password, password, encoded)
+
+    def stats(self) -> dict:
+        completed = self.completed
+        return {
+            "workers": self.workers,
+            "queue_depth": self.pending,
+            "max_pending": self.max_pending,
+            "submitted": self.submitted,
+            "completed": completed,
+            "rejected": self.rejected,
+            "timeouts": self.timeouts,
+            "latency_avg": self.latency_total / completed if completed else 0.0,
+            "latency_max": self.latency_max,
+            "hash_seconds_avg": self.hash_seconds_total / completed if completed else 0.0,
+        }
+
+
+hashing_pool = HashingPool()
+
+
+class RehashQueue:
+    # Upgrades password hashes made with outdated hasher parameters after a
+    # successful login, off the response path. The UPDATE is conditional on the
+    # old hash so a password change made in the meantime is never overwritten.
+    # When the queue is full the upgrade is simply retried on a later login.
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._executor: ThreadPoolExecutor | None = None
+        self._executor_pid: int | None = None
+        self._futures: set[Future] = set()
+        self.scheduled = 0
+        self.upgraded = 0
+        self.skipped = 0
+
+    @property
+    def max_pending(self) -> int:
+        return getattr(settings, "PASSWORD_REHASH_MAX_PENDING", 256)
+
+    def schedule(self, user_model, user_pk, raw_password: str, old_encoded: str) -> bool:
+        with self._lock:
+            if len(self._futures) >= self.max_pending:
+                self.skipped += 1
+                return False
+            if self._executor is None or self._executor_pid != os.getpid():
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="password-rehash")
+                self._executor_pid = os.getpid()
+            future = self._executor.submit(self._rehash, user_model, user_pk, raw_password, old_encoded)
+            self._futures.add(future)
+            self.scheduled += 1
+        future.add_done_callback(self._forget)
+        return True
+
+    def _forget(self, future: Future) -> None:
+        with self._lock:
+            self._futures.discard(future)
+
+    def _rehash(self, user_model, user_pk, raw_password: str, old_encoded: str) -> None:
+        close_old_connections()
+        try:
+            encoded = hashing_pool.make_password(raw_password)
+        except HashingUnavailable:
+            self.skipped += 1
+            return
+        try:
+            updated = user_model._default_manager.filter(pk=user_pk, password=old_encoded).update(password=encoded)
+        except Exception:
+            logger.exception("Password rehash failed for user %s", user_pk)
+            return
+        self.upgraded += updated
+
+    def drain(self, timeout: float | None = None) -> None:
+        with self._lock:
+            futures = list(self._futures)
+        for future in futures:
+            future.result(timeout=timeout)
+
+    def stats(self) -> dict:
+        return {
+            "pending": len(self._futures),
+            "scheduled": self.scheduled,
+            "upgraded": self.upgraded,
+            "skipped": self.skipped,
+        }
+
+
+rehash_queue = RehashQueue()
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from jwt.algorithms import has_crypto
+
+if has_crypto:
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import ed448, ed25519, rsa
+    from jwt.algorithms import OKPAlgorithm, RSAAlgorithm
+
+KEY_SUFFIX = ".pem"
+
+
+def _key_types(algorithm: str) -> tuple:
+    if algorithm.startswith("RS"):
+        return rsa.RSAPrivateKey, rsa.RSAPublicKey
+    return ed25519.Ed25519PrivateKey, ed448.Ed448PrivateKey, ed25519.Ed25519PublicKey, ed448.Ed448PublicKey
+
+
+def generate_private_key(algorithm: str):
+    if algorithm.startswith("RS"):
+        return rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    return ed25519.Ed25519PrivateKey.generate()
+
+
+def private_key_pem(key) -> bytes:
+    return key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+
+
+class KeyRing:
+    # JWT keys for asymmetric algorithms, read from JWT_KEYS_DIR once per
+    # process and kept as parsed key objects. Each <kid>.pem holds a private
+    # key (can sign and verify) or a public key (verify only, for a retired
+    # signer whose tokens have not expired yet). Every key is published in the
+    # JWKS; JWT_ACTIVE_KID, or the last kid in sort order, signs new tokens.
+    # With an HS* algorithm the ring is empty and SECRET_KEY is used instead.
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._owner: tuple | None = None
+            self._verifying: dict[str, object] = {}
+            self._signing: tuple[str, object] | None = None
+            self._jwks: tuple[bytes, str] | None = None
+
+    @property
+    def algorithm(self) -> str:
+        return getattr(settings, "JWT_ALGORITHM", "HS256")
+
+    @property
+    def asymmetric(self) -> bool:
+        return not self.algorithm.startswith("HS")
+
+    def _load(self) -> None:
+        owner = (self.algorithm, str(getattr(settings, "JWT_KEYS_DIR", "")), getattr(settings, "JWT_ACTIVE_KID", ""))
+        if self._owner == owner:
+            return
+        with self._lock:
+            if self._owner == owner:
+                return
+            algorithm, directory, active_kid = owner
+            verifying, private = {}, {}
+            if self.asymmetric:
+                if not has_crypto:
+                    raise ImproperlyConfigured(f"JWT_ALGORITHM={algorithm} requires the cryptography package.")
+                for path in sorted(Path(directory).glob(f"*{KEY_SUFFIX}")):
+                    kid = path.name.removesuffix(KEY_SUFFIX)
+                    key = self._read(path)
+                    if not isinstance(key, _key_types(algorithm)):
+                        raise ImproperlyConfigured(f"{path} is not a key for {algorithm}.")
+                    if hasattr(key, "public_key"):
+                        private[kid] = key
+                        verifying[kid] = key.public_key()
+                    else:
+                        verifying[kid] = key
+                if not private:
+                    raise ImproperlyConfigured(
+                        f"JWT_ALGORITHM={algorithm} needs a private key in {directory}; "
+                        "run `python manage.py generate_jwt_key`."
+                    )
+                signing_kid = active_kid or max(private)
+                if signing_kid not in private:
+                    raise ImproperlyConfigured(f"JWT_ACTIVE_KID={signing_kid} has no private key in {directory}.")
+                self._signing = (signing_kid, private[signing_kid])
+            else:
+                self._signing = None
+            self._verifying = verifying
+            self._jwks = None
+            self._owner = owner
+
+    @staticmethod
+    def _read(path: Path):
+        data = path.read_bytes()
+        if b"PRIVATE KEY" in data:
+            return serialization.load_pem_private_key(data, password=None)
+        return serialization.load_pem_public_key(data)
+
+    def signing_key(self) -> tuple[str, object]:
+        self._load()
+        return self._signing
+
+    def verifying_key(self, kid: str | None):
+        self._load()
+        return self._verifying.get(kid)
+
+    def jwks(self) -> tuple[bytes, str]:
+        # Serialized once per key set; the ETag is a digest of the exact body.
+        self._load()
+        cached = self._jwks
+        if cached is not None:
+            return cached
+        keys = []
+        for kid, key in self._verifying.items():
+            exporter = RSAAlgorithm if self.algorithm.startswith("RS") else OKPAlgorithm
+            jwk = exporter.to_jwk(key, as_dict=True)
+            keys.append({**jwk, "kid": kid, "alg": self.algorithm, "use": "sig"})
+        body = json.dumps({"keys": keys}, separators=(",", ":"), sort_keys=True).encode()
+        cached = self._jwks = (body, f'"{hashlib.sha256(body).hexdigest()[:32]}"')
+        return cached
+
+
+key_ring = KeyRing()
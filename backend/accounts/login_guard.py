@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import ipaddress
+import threading
+import time
+
+from django.conf import settings
+from rest_framework.exceptions import Throttled
+from rest_framework.throttling import BaseThrottle
+
+from api.metrics import metrics_registry
+from api.throttling import SharedWindowTable
+
+failure_windows = SharedWindowTable("goplan-login-failures", "LOGIN_GUARD_SHARED_PATH", "LOGIN_GUARD_SHARED_SLOTS")
+
+
+class LoginGuard:
+    # Failed logins counted per normalized email and per client network, in a
+    # fixed-size table shared by the host's workers, over a sliding window in
+    # which old failures decay. Once either count reaches its threshold, check()
+    # refuses the login with 429 before authenticate() hashes anything, so a
+    # botnet spread over many IPs still runs out of guesses per email, and one
+    # network out of guesses across emails. Unknown emails fail and are counted
+    # exactly like wrong passwords, and a refusal reads neither the user table
+    # nor the hasher: it costs the same whether or not the account exists.
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.checked = 0
+            self.failures = 0
+            self.refused_email = 0
+            self.refused_network = 0
+
+    @property
+    def enabled(self) -> bool:
+        return getattr(settings, "LOGIN_GUARD_ENABLED", True)
+
+    @property
+    def window(self) -> float:
+        return getattr(settings, "LOGIN_GUARD_WINDOW", 900.0)
+
+    @staticmethod
+    def network(request) -> str | None:
+        # The client address as DRF's throttles see it (NUM_PROXIES applies), widened to its prefix.
+        try:
+            address = ipaddress.ip_address(BaseThrottle().get_ident(request))
+        except (AttributeError, ValueError):
+            return None
+        if address.version == 4:
+            prefix = getattr(settings, "LOGIN_GUARD_IPV4_PREFIX", 24)
+        else:
+            prefix = getattr(settings, "LOGIN_GUARD_IPV6_PREFIX", 48)
+        return str(ipaddress.ip_network(f"{address}/{prefix}", strict=False))
+
+    def _keys(self, email: str, request) -> list[tuple[str, str, int]]:
+        keys = [("email", f"login-failures:email:{email}", getattr(settings, "LOGIN_GUARD_EMAIL_FAILURES", 10))]
+        network = self.network(request)
+        if network is not None:
+            limit = getattr(settings, "LOGIN_GUARD_NETWORK_FAILURES", 100)
+            keys.append(("network", f"login-failures:network:{network}", limit))
+        return keys
+
+    def check(self, email: str, request) -> None:
+        if not self.enabled:
+            return
+        now = time.time()
+        with self._lock:
+            self.checked += 1
+        for scope, key, limit in self._keys(email, request):
+            allowed, retry_after = failure_windows.hit(key, limit, self.window, now, count=False)
+            if allowed:
+                continue
+            with self._lock:
+                if scope == "email":
+                    self.refused_email += 1
+                else:
+                    self.refused_network += 1
+            metrics_registry.count_event(f"login_guard_refused_{scope}")
+            metrics_registry.count_event("login_guard_hashes_avoided")
+            raise Throttled(wait=retry_after)
+
+    def record_failure(self, email: str, request) -> None:
+        # Counts stop at the threshold, which is all check() needs to know.
+        if not self.enabled:
+            return
+        now = time.time()
+        for _scope, key, limit in self._keys(email, request):
+            failure_windows.hit(key, limit, self.window, now)
+        with self._lock:
+            self.failures += 1
+        metrics_registry.count_event("login_guard_failures")
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "checked": self.checked,
+            "failures": self.failures,
+            "refused_email": self.refused_email,
+            "refused_network": self.refused_network,
+            # authenticate() hashes exactly once per call, for unknown emails too.
+            "hashes_avoided": self.refused_email + self.refused_network,
+        }
+
+
+login_guard = LoginGuard()
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import time
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from accounts.models import SessionFamily
+
+# Arbitrary constant shared by every process so overlapping purge runs skip instead of contending.
+PURGE_LOCK_KEY = 0x676F706C616E
+
+
+def table_sizes(using: str = "default") -> dict:
+    connection = connections[using]
+    sizes = {}
+    for model in (SessionFamily, OutstandingToken, BlacklistedToken):
+        table = model._meta.db_table
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT pg_total_relation_size(c.oid), c.reltuples::bigint FROM pg_class c WHERE c.oid = %s::regclass",
+                    [table],
+                )
+                total_bytes, estimated_rows = cursor.fetchone()
+            sizes[table] = {"bytes": total_bytes, "rows": max(estimated_rows, 0)}
+        else:
+            sizes[table] = {"bytes": None, "rows": model.objects.using(using).count()}
+    return sizes
+
+
+def _session_locks(connection) -> bool:
+    # A transaction-level pooler hands each transaction a different server
+    # session, so a session advisory lock could leak or be released elsewhere.
+    # Without it overlapping purges still work; they just contend on rows.
+    return connection.vendor == "postgresql" and getattr(settings, "DB_CONN_MODE", "direct") != "pgbouncer"
+
+
+def _try_lock(connection) -> bool:
+    if not _session_locks(connection):
+        return True
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_try_advisory_lock(%s)", [PURGE_LOCK_KEY])
+        return cursor.fetchone()[0]
+
+
+def _unlock(connection) -> None:
+    if _session_locks(connection):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_unlock(%s)", [PURGE_LOCK_KEY])
+
+
+def purge_expired_tokens(
+    batch_size: int | None = None,
+    time_budget: float | None = None,
+    pause: float = 0.0,
+    using: str = "default",
+) -> dict:
+    # Deletes expired or revoked session families and expired outstanding/blacklisted
+    # tokens in short transactions of at most `batch_size` rows each, stopping once
+    # `time_budget` seconds are spent.
+    # Unlike flushexpiredtokens, row locks are held for one batch at a time and
+    # autovacuum can reclaim space between batches. Safe to call from cron, a
+    # scheduler thread or a task queue; concurrent runs on Postgres skip.
+    batch_size = batch_size or getattr(settings, "TOKEN_PURGE_BATCH_SIZE", 5000)
+    if time_budget is None:
+        time_budget = getattr(settings, "TOKEN_PURGE_TIME_BUDGET", 60.0)
+
+    started = time.monotonic()
+    deadline = started + time_budget
+    cutoff = timezone.now()
+    connection = connections[using]
+    report = {"families": 0, "blacklisted": 0, "outstanding": 0, "batches": 0, "complete": False, "skipped": False}
+
+    if not _try_lock(connection):
+        report["skipped"] = True
+        return report
+
+    try:
+        # A token whose family row is gone cannot be rotated, so revoked families go too.
+        # Blacklist rows before outstanding rows so the latter have nothing left to cascade to.
+        targets = (
+            (
+                "families",
+                SessionFamily,
+                SessionFamily.objects.filter(Q(expires_at__lte=cutoff) | Q(revoked_at__isnull=False)),
+            ),
+            ("blacklisted", BlacklistedToken, BlacklistedToken.objects.filter(token__expires_at__lte=cutoff)),
+            ("outstanding", OutstandingToken, OutstandingToken.objects.filter(expires_at__lte=cutoff)),
+        )
+        for key, model, expired in targets:
+            while time.monotonic() < deadline:
+                with transaction.atomic(using=using):
+                    ids = list(expired.using(using).order_by().values_list("pk", flat=True)[:batch_size])
+                    if ids:
+                        model.objects.using(using).filter(pk__in=ids).delete()
+                        report[key] += len(ids)
+                        report["batches"] += 1
+                if len(ids) < batch_size:
+                    break
+                if pause:
+                    time.sleep(pause)
+            else:
+                # Budget spent before this table was drained.
+                break
+        else:
+            report["complete"] = True
+    finally:
+        _unlock(connection)
+
+    report["seconds"] = round(time.monotonic() - started, 3)
+    report["tables"] = table_sizes(using)
+    return report
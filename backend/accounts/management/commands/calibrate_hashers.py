@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import json
+import os
+import platform
+import statistics
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.hashers import get_hasher, get_hashers
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from accounts.hashers import CalibratedHasherMixin
+
+SAMPLE_PASSWORD = "Calibration#Sample-2026"
+PBKDF2_PROBE_ITERATIONS = 100_000
+PBKDF2_STEP = 10_000
+
+
+class Command(BaseCommand):
+    help = "Benchmark the configured password hashers on this machine and write recommended cost parameters."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--target-ms", type=float, default=250.0, help="Target latency of a single hash.")
+        parser.add_argument("--samples", type=int, default=3, help="Timed hashes per candidate (median is used).")
+        parser.add_argument("--hashers", default="", help="Comma-separated algorithms to calibrate (default: all).")
+        parser.add_argument("--preferred", default="", help="Algorithm used for new hashes (default: current).")
+        parser.add_argument("--output", default="", help="Where to write the configuration (default: PASSWORD_HASHER_CALIBRATION_FILE).")
+        parser.add_argument(
+            "--allow-weaker",
+            action="store_true",
+            help="Allow parameters below Django's defaults when the target latency demands it.",
+        )
+
+    def handle(self, *args, **options):
+        self.target_ms = options["target_ms"]
+        self.samples = max(options["samples"], 1)
+        self.allow_weaker = options["allow_weaker"]
+        selected = {name.strip() for name in options["hashers"].split(",") if name.strip()}
+
+        results = {}
+        for hasher in get_hashers():
+            if not isinstance(hasher, CalibratedHasherMixin):
+                continue
+            if selected and hasher.algorithm not in selected:
+                continue
+            if hasher.library:
+                try:
+                    hasher._load_library()
+                except ValueError:
+                    self.stdout.write(f"Skipping {hasher.algorithm}: {hasher.library} is not installed.")
+                    continue
+
+            calibrate = getattr(self, f"calibrate_{hasher.algorithm}")
+            params, measured_ms = calibrate(type(hasher))
+            results[hasher.algorithm] = {**params, "measured_ms": round(measured_ms, 1)}
+            summary = ", ".join(f"{name}={value}" for name, value in params.items())
+            self.stdout.write(f"{hasher.algorithm:<14} {summary:<60} {measured_ms:8.1f} ms")
+            if measured_ms > self.target_ms:
+                self.stdout.write(self.style.WARNING(f"  {hasher.algorithm} exceeds the target at its minimum allowed cost."))
+
+        if not results:
+            raise CommandError("No calibratable hashers are available.")
+
+        preferred = options["preferred"] or get_hasher("default").algorithm
+        if preferred not in results:
+            raise CommandError(f"Preferred hasher {preferred!r} was not calibrated.")
+
+        output = Path(options["output"] or settings.PASSWORD_HASHER_CALIBRATION_FILE)
+        config = {
+            "generated_at": timezone.now().isoformat(),
+            "host": platform.node(),
+            "cpu_count": os.cpu_count(),
+            "target_ms": self.target_ms,
+            "preferred": preferred,
+            "hashers": results,
+        }
+        output.write_text(json.dumps(config, indent=2) + "\n")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Wrote {output}. Restart workers to apply it; existing hashes are upgraded on each user's next login."
+            )
+        )
+
+    def measure(self, hasher_class, **params) -> float:
+        hasher = hasher_class()
+        for name, value in params.items():
+            setattr(hasher, name, value)
+        salt = hasher.salt()
+        timings = []
+        for _ in range(self.samples):
+            started = time.perf_counter()
+            hasher.encode(SAMPLE_PASSWORD, salt)
+            timings.append(time.perf_counter() - started)
+        return statistics.median(timings) * 1000
+
+    def pick(self, hasher_class, candidates) -> tuple[dict, float]:
+        # Largest candidate (in ascending cost order) whose latency stays within the target;
+        # the cheapest allowed candidate is kept even if it already exceeds it.
+        chosen, chosen_ms = None, None
+        for params in candidates:
+            elapsed = self.measure(hasher_class, **params)
+            if chosen is not None and elapsed > self.target_ms:
+                break
+            chosen, chosen_ms = params, elapsed
+            if elapsed > self.target_ms:
+                break
+        return chosen, chosen_ms
+
+    def allowed(self, value: int, default: int) -> bool:
+        return self.allow_weaker or value >= default
+
+    def calibrate_pbkdf2_sha256(self, hasher_class) -> tuple[dict, float]:
+        probe_ms = self.measure(hasher_class, iterations=PBKDF2_PROBE_ITERATIONS)
+        iterations = int(PBKDF2_PROBE_ITERATIONS * self.target_ms / probe_ms) // PBKDF2_STEP * PBKDF2_STEP
+        iterations = max(iterations, PBKDF2_STEP)
+        if not self.allowed(iterations, hasher_class.iterations):
+            iterations = hasher_class.iterations
+        return {"iterations": iterations}, self.measure(hasher_class, iterations=iterations)
+
+    def calibrate_scrypt(self, hasher_class) -> tuple[dict, float]:
+        # hashlib.scrypt rejects work factors whose memory exceeds maxmem (32 MiB by default).
+        candidates = [
+            {"work_factor": 2**exponent, "maxmem": 256 * 2**exponent * hasher_class.block_size}
+            for exponent in range(12, 21)
+            if self.allowed(2**exponent, hasher_class.work_factor)
+        ]
+        return self.pick(hasher_class, candidates)
+
+    def calibrate_argon2(self, hasher_class) -> tuple[dict, float]:
+        candidates = [
+            {"time_cost": time_cost, "memory_cost": hasher_class.memory_cost, "parallelism": hasher_class.parallelism}
+            for time_cost in range(1, 17)
+            if self.allowed(time_cost, hasher_class.time_cost)
+        ]
+        return self.pick(hasher_class, candidates)
+
+    def calibrate_bcrypt_sha256(self, hasher_class) -> tuple[dict, float]:
+        candidates = [{"rounds": rounds} for rounds in range(10, 17) if self.allowed(rounds, hasher_class.rounds)]
+        return self.pick(hasher_class, candidates)
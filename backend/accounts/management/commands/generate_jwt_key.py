@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from jwt.algorithms import has_crypto
+
+from accounts.keys import KEY_SUFFIX, generate_private_key, private_key_pem
+
+
+class Command(BaseCommand):
+    help = "Create a JWT signing key in JWT_KEYS_DIR for RS256 or EdDSA; its file name is the kid."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--algorithm", default="", help="RS256 or EdDSA (default: JWT_ALGORITHM).")
+        parser.add_argument("--kid", default="", help="Key id (default: a UTC timestamp, so newer keys sort last).")
+        parser.add_argument("--directory", default="", help="Where to write the key (default: JWT_KEYS_DIR).")
+
+    def handle(self, *args, **options):
+        algorithm = options["algorithm"] or settings.JWT_ALGORITHM
+        if algorithm not in {"RS256", "RS384", "RS512", "EdDSA"}:
+            raise CommandError(f"{algorithm} does not use key pairs; pass --algorithm RS256 or EdDSA.")
+        if not has_crypto:
+            raise CommandError("Generating keys requires the cryptography package.")
+
+        kid = options["kid"] or timezone.now().strftime("%Y%m%d%H%M%S")
+        directory = Path(options["directory"] or settings.JWT_KEYS_DIR)
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"{kid}{KEY_SUFFIX}"
+        if path.exists():
+            raise CommandError(f"{path} already exists.")
+
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(private_key_pem(generate_private_key(algorithm)))
+
+        self.stdout.write(self.style.SUCCESS(f"Wrote {algorithm} key {kid} to {path}."))
+        self.stdout.write(
+            "It is published in the JWKS once workers restart. It signs new tokens unless JWT_ACTIVE_KID "
+            "names another key; keep that set until caches have picked the new key up."
+        )
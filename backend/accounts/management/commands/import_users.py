@@ -0,0 +1,279 @@
+from __future__ import annotations
+
+import csv
+import itertools
+import json
+import multiprocessing
+import os
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import identify_hasher
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.core.validators import validate_email
+from django.db import connections, transaction
+from django.utils import timezone
+
+from accounts.hashing import _init_worker, _make_password
+from accounts.password_policy import password_policy
+
+User = get_user_model()
+
+TRUE_VALUES = {"1", "true", "yes", "y", "t"}
+FALSE_VALUES = {"0", "false", "no", "n", "f", ""}
+
+
+class Command(BaseCommand):
+    help = "Stream users from a CSV or JSONL file into accounts_user in batches, with resumable checkpoints."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV (with a header row) or JSONL file with email and password columns.")
+        parser.add_argument("--format", choices=("auto", "csv", "jsonl"), default="auto")
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Hashing processes (0 hashes in this process).",
+        )
+        parser.add_argument(
+            "--prehashed",
+            action="store_true",
+            help="The password column already holds Django-encoded hashes.",
+        )
+        parser.add_argument(
+            "--skip-validation",
+            action="store_true",
+            help="Skip AUTH_PASSWORD_VALIDATORS for plaintext passwords.",
+        )
+        parser.add_argument(
+            "--method",
+            choices=("auto", "bulk", "copy"),
+            default="auto",
+            help="copy uses Postgres COPY through a staging table; auto picks it on Postgres.",
+        )
+        parser.add_argument("--checkpoint", default="", help="Checkpoint file (default: <path>.checkpoint).")
+        parser.add_argument("--rejects", default="", help="Rejection report (default: <path>.rejects.csv).")
+        parser.add_argument("--restart", action="store_true", help="Ignore an existing checkpoint and start over.")
+        parser.add_argument("--database", default="default")
+
+    def handle(self, *args, **options):
+        source = Path(options["path"]).resolve()
+        if not source.is_file():
+            raise CommandError(f"{source} does not exist.")
+        self.batch_size = max(options["batch_size"], 1)
+        self.prehashed = options["prehashed"]
+        self.validate = not options["skip_validation"]
+        self.database = options["database"]
+
+        fmt = options["format"]
+        if fmt == "auto":
+            fmt = "jsonl" if source.suffix in {".jsonl", ".ndjson"} else "csv"
+
+        method = options["method"]
+        vendor = connections[self.database].vendor
+        if method == "auto":
+            method = "copy" if vendor == "postgresql" else "bulk"
+        elif method == "copy" and vendor != "postgresql":
+            raise CommandError("--method=copy requires PostgreSQL.")
+        self.insert = self.insert_copy if method == "copy" else self.insert_bulk
+
+        checkpoint_path = Path(options["checkpoint"] or f"{source}.checkpoint")
+        rejects_path = Path(options["rejects"] or f"{source}.rejects.csv")
+        state = {"source": str(source), "rows": 0, "imported": 0, "rejected": 0, "completed": False}
+        if checkpoint_path.exists() and not options["restart"]:
+            saved = json.loads(checkpoint_path.read_text())
+            if saved.get("source") != str(source):
+                raise CommandError(f"{checkpoint_path} belongs to {saved.get('source')}; pass --restart to discard it.")
+            state.update(saved)
+            self.stdout.write(f"Resuming after row {state['rows']}.")
+        resuming = state["rows"] > 0
+
+        executor = None
+        self.workers = options["workers"]
+        if not self.prehashed and self.workers > 0:
+            start_method = getattr(settings, "PASSWORD_HASHING_START_METHOD", "forkserver")
+            executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context(start_method),
+                initializer=_init_worker,
+                initargs=(os.environ.get("DJANGO_SETTINGS_MODULE", "configs.settings"),),
+            )
+        self.executor = executor
+
+        started = time.perf_counter()
+        with open(source, newline="", encoding="utf-8") as handle, open(
+            rejects_path, "a" if resuming else "w", newline="", encoding="utf-8"
+        ) as rejects_file:
+            rejects = csv.writer(rejects_file)
+            if not resuming:
+                rejects.writerow(["row", "email", "reason"])
+
+            rows = self.read_rows(handle, fmt)
+            batches = iter(lambda: list(itertools.islice(rows, self.batch_size)), [])
+            try:
+                for batch in batches:
+                    if batch[-1][0] <= state["rows"]:
+                        continue
+                    batch = [row for row in batch if row[0] > state["rows"]]
+                    imported, rejected = self.import_batch(batch)
+                    for row_number, email, reason in rejected:
+                        rejects.writerow([row_number, email, reason])
+                    rejects_file.flush()
+
+                    state["rows"] = batch[-1][0]
+                    state["imported"] += imported
+                    state["rejected"] += len(rejected)
+                    self.save_checkpoint(checkpoint_path, state)
+                    elapsed = time.perf_counter() - started
+                    self.stdout.write(
+                        f"row {state['rows']}: imported {state['imported']}, rejected {state['rejected']} "
+                        f"({state['rows'] / elapsed:.0f} rows/s)"
+                    )
+            finally:
+                if executor is not None:
+                    executor.shutdown(cancel_futures=True)
+
+        state["completed"] = True
+        self.save_checkpoint(checkpoint_path, state)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {state['imported']} users, rejected {state['rejected']} (see {rejects_path})."
+            )
+        )
+
+    def read_rows(self, handle, fmt: str):
+        # Yields (row_number, record_or_error) lazily so memory stays bounded by one batch.
+        if fmt == "csv":
+            for row_number, record in enumerate(csv.DictReader(handle), start=1):
+                yield row_number, record
+            return
+        for row_number, line in enumerate(handle, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                yield row_number, "malformed JSON line"
+                continue
+            yield row_number, record if isinstance(record, dict) else "not a JSON object"
+
+    @staticmethod
+    def save_checkpoint(path: Path, state: dict) -> None:
+        temporary = path.with_name(path.name + ".tmp")
+        temporary.write_text(json.dumps(state))
+        os.replace(temporary, path)
+
+    def parse(self, record) -> tuple[dict | None, str, str]:
+        if isinstance(record, str):
+            return None, "", record
+        if not isinstance(record, dict):
+            return None, "", "not a JSON object"
+        email = record.get("email") or ""
+        if not isinstance(email, str):
+            return None, "", "invalid email"
+        email = User.objects.normalize_email_value(email)
+        password = record.get("password") or ""
+        if not isinstance(password, str):
+            return None, email, "invalid password"
+        try:
+            validate_email(email)
+        except ValidationError:
+            return None, email, "invalid email"
+        # validate_email() allows 320 characters; the column holds fewer.
+        if len(email) > User._meta.get_field("email").max_length:
+            return None, email, "email too long"
+        if not password:
+            return None, email, "missing password"
+
+        is_active = str(record.get("is_active", "1")).strip().lower()
+        if is_active not in TRUE_VALUES | FALSE_VALUES:
+            return None, email, "invalid is_active"
+        fields = {"email": email, "password": password, "is_active": is_active in TRUE_VALUES}
+
+        if self.prehashed:
+            try:
+                identify_hasher(password)
+            except ValueError:
+                return None, email, "unrecognized password hash"
+        elif self.validate:
+            try:
+                password_policy.validate(password, user=User(email=email))
+            except ValidationError as exc:
+                return None, email, " ".join(exc.messages)
+        return fields, email, ""
+
+    def import_batch(self, batch) -> tuple[int, list]:
+        rejected, candidates, seen = [], [], set()
+        for row_number, record in batch:
+            fields, email, reason = self.parse(record)
+            if fields is None:
+                rejected.append((row_number, email, reason))
+            elif email in seen:
+                rejected.append((row_number, email, "duplicate email in file"))
+            else:
+                seen.add(email)
+                candidates.append((row_number, fields))
+
+        existing = set(
+            User.objects.using(self.database).filter(email__in=seen).values_list("email", flat=True).iterator()
+        )
+        pending = []
+        for row_number, fields in candidates:
+            if fields["email"] in existing:
+                rejected.append((row_number, fields["email"], "email already exists"))
+            else:
+                pending.append((row_number, fields))
+
+        if not self.prehashed:
+            passwords = [fields["password"] for _, fields in pending]
+            if self.executor is not None:
+                chunksize = max(len(passwords) // (self.workers * 4), 1)
+                hashed = self.executor.map(_make_password, passwords, chunksize=chunksize)
+            else:
+                hashed = map(_make_password, passwords)
+            for (_, fields), (encoded, _seconds) in zip(pending, hashed):
+                fields["password"] = encoded
+
+        now = timezone.now()
+        users = [
+            User(id=uuid.uuid4(), date_joined=now, created_at=now, updated_at=now, **fields) for _, fields in pending
+        ]
+        inserted = self.insert(users) if users else set()
+
+        # Rows that lost a race with a concurrent insert of the same email.
+        for (row_number, fields), user in zip(pending, users):
+            if user.pk not in inserted:
+                rejected.append((row_number, fields["email"], "email already exists"))
+        rejected.sort()
+        return len(inserted), rejected
+
+    def insert_bulk(self, users) -> set:
+        with transaction.atomic(using=self.database):
+            User.objects.using(self.database).bulk_create(users, ignore_conflicts=True)
+            return set(
+                User.objects.using(self.database).filter(pk__in=[user.pk for user in users]).values_list("pk", flat=True)
+            )
+
+    def insert_copy(self, users) -> set:
+        fields = User._meta.concrete_fields
+        columns = ", ".join(field.column for field in fields)
+        table = User._meta.db_table
+        connection = connections[self.database]
+        with transaction.atomic(using=self.database), connection.cursor() as cursor:
+            cursor.execute(f"CREATE TEMP TABLE import_users_stage (LIKE {table} INCLUDING DEFAULTS)")
+            with cursor.copy(f"COPY import_users_stage ({columns}) FROM STDIN") as copy:
+                for user in users:
+                    copy.write_row([getattr(user, field.attname) for field in fields])
+            cursor.execute(
+                f"INSERT INTO {table} ({columns}) SELECT {columns} FROM import_users_stage "
+                f"ON CONFLICT DO NOTHING RETURNING {User._meta.pk.column}"
+            )
+            inserted = {row[0] for row in cursor.fetchall()}
+            cursor.execute("DROP TABLE import_users_stage")
+        return inserted
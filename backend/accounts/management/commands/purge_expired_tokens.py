@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import json
+
+from django.core.management.base import BaseCommand
+
+from accounts.maintenance import purge_expired_tokens
+
+
+class Command(BaseCommand):
+    help = "Delete expired or revoked session families and expired outstanding/blacklisted tokens in small batches within a time budget."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=None, help="Rows per delete (default: TOKEN_PURGE_BATCH_SIZE).")
+        parser.add_argument(
+            "--time-budget",
+            type=float,
+            default=None,
+            help="Seconds to spend before stopping (default: TOKEN_PURGE_TIME_BUDGET).",
+        )
+        parser.add_argument("--pause", type=float, default=0.0, help="Seconds to sleep between batches.")
+        parser.add_argument("--database", default="default")
+        parser.add_argument("--json", action="store_true", help="Print the report as JSON.")
+
+    def handle(self, *args, **options):
+        report = purge_expired_tokens(
+            batch_size=options["batch_size"],
+            time_budget=options["time_budget"],
+            pause=options["pause"],
+            using=options["database"],
+        )
+        if options["json"]:
+            self.stdout.write(json.dumps(report))
+            return
+        if report["skipped"]:
+            self.stdout.write(self.style.WARNING("Another purge is running; skipped."))
+            return
+
+        self.stdout.write(
+            f"Purged {report['families']} session families, {report['blacklisted']} blacklisted and "
+            f"{report['outstanding']} outstanding tokens "
+            f"in {report['batches']} batches ({report['seconds']}s)."
+        )
+        for table, size in report["tables"].items():
+            size_text = f", {size['bytes'] / 1024 / 1024:.1f} MiB" if size["bytes"] is not None else ""
+            self.stdout.write(f"  {table}: {size['rows']} rows{size_text}")
+        if not report["complete"]:
+            self.stdout.write(self.style.WARNING("Time budget reached; expired tokens remain for the next run."))
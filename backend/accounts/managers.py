@@ -1,7 +1,13 @@
 from __future__ import annotations
 
+from asgiref.sync import sync_to_async
 from django.contrib.auth.base_user import BaseUserManager
-from django.contrib.auth.password_validation import validate_password
+from django.db import connections, models, router
+from django.db.models import Case, F, Q, Value, When
+from django.utils import timezone
+
+from accounts.hashing import hashing_pool
+from accounts.password_policy import password_policy
 
 
 class UserManager(BaseUserManager):
@@ -20,7 +26,7 @@ class UserManager(BaseUserManager):
 
         normalized_email = self.normalize_email_value(email)
         user = self.model(email=normalized_email, **extra_fields)
-        validate_password(password, user=user)
+        password_policy.validate(password, user=user)
         user.set_password(password)
         user.save(using=self._db)
         return user
@@ -31,6 +37,55 @@ class UserManager(BaseUserManager):
         extra_fields.setdefault("is_active", True)
         return self._create_user(email=email, password=password, **extra_fields)
 
+    async def acreate_user(self, email: str, password: str, **extra_fields):
+        extra_fields.setdefault("is_staff", False)
+        extra_fields.setdefault("is_superuser", False)
+        extra_fields.setdefault("is_active", True)
+        if not email:
+            raise ValueError("The Email must be set.")
+        if not password:
+            raise ValueError("The Password must be set.")
+
+        normalized_email = self.normalize_email_value(email)
+        user = self.model(email=normalized_email, **extra_fields)
+        password_policy.validate(password, user=user)
+        user.password = await hashing_pool.amake_password(password)
+        user._password = password
+        await user.asave(using=self._db)
+        return user
+
+    def insert_if_absent(self, user) -> bool:
+        # Single round trip INSERT ... ON CONFLICT (lower(email)) DO NOTHING RETURNING
+        # against the lower(email) unique index. Returns False, leaving `user` unsaved,
+        # when the email is taken; any other unique violation still raises. The caller
+        # has already normalized and validated; save() and its signals are bypassed for
+        # a row that cannot have cached state yet.
+        db = self._db or router.db_for_write(self.model, instance=user)
+        connection = connections[db]
+        fields = self.model._meta.concrete_fields
+        values = [field.get_db_prep_save(field.pre_save(user, add=True), connection) for field in fields]
+        quote = connection.ops.quote_name
+        sql = (
+            "INSERT INTO {table} ({columns}) VALUES ({placeholders}) "
+            "ON CONFLICT (lower({email})) DO NOTHING RETURNING {pk}"
+        ).format(
+            table=quote(self.model._meta.db_table),
+            email=quote(self.model._meta.get_field("email").column),
+            columns=", ".join(quote(field.column) for field in fields),
+            placeholders=", ".join(["%s"] * len(fields)),
+            pk=quote(self.model._meta.pk.column),
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, values)
+            inserted = cursor.fetchone() is not None
+        if inserted:
+            user._state.adding = False
+            user._state.db = db
+        return inserted
+
+    async def ainsert_if_absent(self, user) -> bool:
+        return await sync_to_async(self.insert_if_absent)(user)
+
     def create_superuser(self, email: str, password: str, **extra_fields):
         extra_fields.setdefault("is_staff", True)
         extra_fields.setdefault("is_superuser", True)
@@ -42,3 +97,70 @@ class UserManager(BaseUserManager):
             raise ValueError("Superuser must have is_superuser=True.")
 
         return self._create_user(email=email, password=password, **extra_fields)
+
+    def update_last_logins(self, timestamps: dict) -> int:
+        # One UPDATE for a batch of {pk: last_login}. A timestamp older than
+        # the stored one is ignored, so a late or repeated batch never moves
+        # last_login backwards.
+        db = self._db or router.db_for_write(self.model)
+        connection = connections[db]
+        if connection.vendor != "postgresql":
+            newer = [
+                When(Q(pk=pk) & (Q(last_login__isnull=True) | Q(last_login__lt=when)), then=Value(when))
+                for pk, when in timestamps.items()
+            ]
+            field = self.model._meta.get_field("last_login")
+            last_login = Case(*newer, default="last_login", output_field=field)
+            return self.using(db).filter(pk__in=timestamps).update(last_login=last_login)
+        quote = connection.ops.quote_name
+        sql = (
+            "UPDATE {table} AS u SET {column} = v.last_login "
+            "FROM (VALUES {rows}) AS v (pk, last_login) "
+            "WHERE u.{pk} = v.pk AND (u.{column} IS NULL OR u.{column} < v.last_login)"
+        ).format(
+            table=quote(self.model._meta.db_table),
+            column=quote("last_login"),
+            pk=quote(self.model._meta.pk.column),
+            rows=", ".join(["(%s::uuid, %s::timestamptz)"] * len(timestamps)),
+        )
+        params = [value for pk, when in timestamps.items() for value in (str(pk), when)]
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.rowcount
+
+
+class SessionFamilyManager(models.Manager):
+    # A refresh token names its family and generation; only the newest
+    # generation of a live family can be rotated, and rotating is one
+    # conditional UPDATE, so two uses of the same token cannot both succeed.
+    # Every condition must stay on the updated row itself: a join (such as
+    # user__is_active) makes Django wrap the filter in a subquery over this
+    # table, which PostgreSQL does not re-check after waiting on the row
+    # lock, so the loser of a race would match the already-rotated row.
+    def _current(self, family_id, generation: int):
+        users = self.model._meta.get_field("user").related_model._default_manager
+        return self.filter(
+            pk=family_id,
+            generation=generation,
+            revoked_at__isnull=True,
+            expires_at__gt=timezone.now(),
+            user_id__in=users.filter(is_active=True).values("pk"),
+        )
+
+    def rotate(self, family_id, generation: int, expires_at) -> bool:
+        rotated = self._current(family_id, generation).update(
+            generation=F("generation") + 1, rotated_at=timezone.now(), expires_at=expires_at
+        )
+        return rotated == 1
+
+    async def arotate(self, family_id, generation: int, expires_at) -> bool:
+        rotated = await self._current(family_id, generation).aupdate(
+            generation=F("generation") + 1, rotated_at=timezone.now(), expires_at=expires_at
+        )
+        return rotated == 1
+
+    def revoke(self, family_id, **filters) -> int:
+        return self.filter(pk=family_id, revoked_at__isnull=True, **filters).update(revoked_at=timezone.now())
+
+    async def arevoke(self, family_id, **filters) -> int:
+        return await self.filter(pk=family_id, revoked_at__isnull=True, **filters).aupdate(revoked_at=timezone.now())
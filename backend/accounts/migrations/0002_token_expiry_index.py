@@ -0,0 +1,30 @@
+from django.db import migrations
+
+INDEX_NAME = "token_outstanding_expires_idx"
+TABLE = "token_blacklist_outstandingtoken"
+
+
+# simplejwt ships no index on expires_at, so every purge batch would scan the
+# whole table. Postgres builds it CONCURRENTLY to avoid blocking token writes.
+def create_index(apps, schema_editor):
+    concurrently = "CONCURRENTLY " if schema_editor.connection.vendor == "postgresql" else ""
+    schema_editor.execute(f"CREATE INDEX {concurrently}IF NOT EXISTS {INDEX_NAME} ON {TABLE} (expires_at)")
+
+
+def drop_index(apps, schema_editor):
+    concurrently = "CONCURRENTLY " if schema_editor.connection.vendor == "postgresql" else ""
+    schema_editor.execute(f"DROP INDEX {concurrently}IF EXISTS {INDEX_NAME}")
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ("accounts", "0001_initial"),
+        ("token_blacklist", "0013_alter_blacklistedtoken_options_and_more"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index, elidable=False),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 5.2.6 on 2026-10-18 17:00
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+TABLE = "accounts_user"
+LOWER_UNIQUE = "accounts_user_email_lower_uniq"
+EMAIL_INDEX = "accounts_user_email_idx"
+
+
+# accounts_user can hold millions of rows, so Postgres builds both indexes
+# CONCURRENTLY (as in 0002 and 0004) and the state is updated separately.
+def _concurrently(schema_editor) -> str:
+    return "CONCURRENTLY " if schema_editor.connection.vendor == "postgresql" else ""
+
+
+def create_indexes(apps, schema_editor):
+    concurrently = _concurrently(schema_editor)
+    schema_editor.execute(f"CREATE UNIQUE INDEX {concurrently}IF NOT EXISTS {LOWER_UNIQUE} ON {TABLE} (lower(email))")
+    schema_editor.execute(f"CREATE INDEX {concurrently}IF NOT EXISTS {EMAIL_INDEX} ON {TABLE} (email)")
+
+
+def drop_indexes(apps, schema_editor):
+    concurrently = _concurrently(schema_editor)
+    schema_editor.execute(f"DROP INDEX {concurrently}IF EXISTS {EMAIL_INDEX}")
+    schema_editor.execute(f"DROP INDEX {concurrently}IF EXISTS {LOWER_UNIQUE}")
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('accounts', '0002_token_expiry_index'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    # The case-insensitive constraint is created before the plain unique index
+    # is dropped so email uniqueness is never unenforced.
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[migrations.RunPython(create_indexes, drop_indexes, elidable=False)],
+            state_operations=[
+                migrations.AddConstraint(
+                    model_name='user',
+                    constraint=models.UniqueConstraint(django.db.models.functions.text.Lower('email'), name=LOWER_UNIQUE, violation_error_message='A user with this email already exists.'),
+                ),
+                migrations.AddIndex(
+                    model_name='user',
+                    index=models.Index(fields=['email'], name=EMAIL_INDEX),
+                ),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='user',
+            name='email',
+            field=models.EmailField(max_length=254),
+        ),
+    ]
@@ -0,0 +1,55 @@
+from django.db import migrations, models
+
+TABLE = "accounts_user"
+OLD_EMAIL_INDEX = "accounts_user_email_idx"
+
+
+# accounts_user can hold millions of rows, so Postgres builds the new indexes
+# CONCURRENTLY (as in 0002) and the state is updated separately.
+def _concurrently(schema_editor) -> str:
+    return "CONCURRENTLY " if schema_editor.connection.vendor == "postgresql" else ""
+
+
+def create_indexes(apps, schema_editor):
+    concurrently = _concurrently(schema_editor)
+    opclass = " varchar_pattern_ops" if schema_editor.connection.vendor == "postgresql" else ""
+    schema_editor.execute(
+        f"CREATE INDEX {concurrently}IF NOT EXISTS accounts_user_email_prefix_idx ON {TABLE} (email{opclass})"
+    )
+    schema_editor.execute(f"CREATE INDEX {concurrently}IF NOT EXISTS accounts_user_created_idx ON {TABLE} (created_at, id)")
+    schema_editor.execute(f"DROP INDEX {concurrently}IF EXISTS {OLD_EMAIL_INDEX}")
+
+
+def drop_indexes(apps, schema_editor):
+    concurrently = _concurrently(schema_editor)
+    schema_editor.execute(f"CREATE INDEX {concurrently}IF NOT EXISTS {OLD_EMAIL_INDEX} ON {TABLE} (email)")
+    schema_editor.execute(f"DROP INDEX {concurrently}IF EXISTS accounts_user_created_idx")
+    schema_editor.execute(f"DROP INDEX {concurrently}IF EXISTS accounts_user_email_prefix_idx")
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ("accounts", "0003_email_lower_unique"),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[migrations.RunPython(create_indexes, drop_indexes, elidable=False)],
+            state_operations=[
+                migrations.RemoveIndex(model_name="user", name=OLD_EMAIL_INDEX),
+                migrations.AddIndex(
+                    model_name="user",
+                    index=models.Index(
+                        fields=["email"], name="accounts_user_email_prefix_idx", opclasses=["varchar_pattern_ops"]
+                    ),
+                ),
+                migrations.AddIndex(
+                    model_name="user",
+                    index=models.Index(fields=["created_at", "id"], name="accounts_user_created_idx"),
+                ),
+            ],
+        ),
+    ]
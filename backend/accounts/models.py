@@ -4,14 +4,17 @@ import uuid
 
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin
 from django.db import models
+from django.db.models.functions import Lower
 from django.utils import timezone
 
-from accounts.managers import UserManager
+from accounts.hashing import hashing_pool, rehash_queue
+from accounts.managers import SessionFamilyManager, UserManager
 
 
 class User(AbstractBaseUser, PermissionsMixin):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
-    email = models.EmailField(unique=True, db_index=True)
+    # Uniqueness is enforced case-insensitively by accounts_user_email_lower_uniq below.
+    email = models.EmailField()
     is_active = models.BooleanField(default=True)
     is_staff = models.BooleanField(default=False)
     date_joined = models.DateTimeField(default=timezone.now)
@@ -26,10 +29,79 @@ class User(AbstractBaseUser, PermissionsMixin):
     class Meta:
         db_table = "accounts_user"
         ordering = ("-created_at",)
+        indexes = [
+            # varchar_pattern_ops (PostgreSQL) also serves `LIKE 'prefix%'` for the admin search.
+            models.Index(fields=["email"], name="accounts_user_email_prefix_idx", opclasses=["varchar_pattern_ops"]),
+            # Keyset pagination of the admin changelist walks this backwards.
+            models.Index(fields=["created_at", "id"], name="accounts_user_created_idx"),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                Lower("email"),
+                name="accounts_user_email_lower_uniq",
+                violation_error_message="A user with this email already exists.",
+            ),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._remember_loaded_values()
+        return instance
 
     def save(self, *args, **kwargs):
         self.email = UserManager.normalize_email_value(self.email)
         super().save(*args, **kwargs)
+        self._remember_loaded_values()
+
+    def _remember_loaded_values(self):
+        # Values as last read from or written to the database; the post_save
+        # handler compares against them to decide whether cached principals moved.
+        loaded = self.__dict__
+        self._loaded_values = {
+            field.attname: loaded[field.attname] for field in self._meta.concrete_fields if field.attname in loaded
+        }
+
+    # Hashing runs in the bounded pool from accounts.hashing so a login burst fails fast
+    # with 503 instead of stacking PBKDF2 work on every request worker.
+    def set_password(self, raw_password):
+        self.password = hashing_pool.make_password(raw_password)
+        self._password = raw_password
+
+    def check_password(self, raw_password):
+        is_correct, must_update = hashing_pool.verify_password(raw_password, self.password)
+        if is_correct and must_update:
+            rehash_queue.schedule(type(self), self.pk, raw_password, self.password)
+        return is_correct
+
+    async def acheck_password(self, raw_password):
+        is_correct, must_update = await hashing_pool.averify_password(raw_password, self.password)
+        if is_correct and must_update:
+            rehash_queue.schedule(type(self), self.pk, raw_password, self.password)
+        return is_correct
 
     def __str__(self) -> str:
         return self.email
+
+
+class SessionFamily(models.Model):
+    # One row per login session, replacing an OutstandingToken row per issued
+    # refresh token and a BlacklistedToken row per rotation. Each rotation bumps
+    # `generation` and slides `expires_at`; presenting an older generation
+    # (a replayed token) revokes the family, as does logging out.
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="session_families")
+    generation = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    rotated_at = models.DateTimeField(null=True, blank=True)
+    expires_at = models.DateTimeField(db_index=True)
+    revoked_at = models.DateTimeField(null=True, blank=True)
+
+    objects = SessionFamilyManager()
+
+    class Meta:
+        db_table = "accounts_session_family"
+        verbose_name_plural = "session families"
+
+    def __str__(self) -> str:
+        return f"{self.user_id} #{self.generation}"
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import uuid
+from datetime import datetime
+
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+CURSOR_SEPARATOR = "_"
+
+
+def estimated_row_count(model, using: str = "default") -> int | None:
+    # Planner statistics from the last ANALYZE/autovacuum; None when unavailable
+    # (not PostgreSQL, or the table was never analyzed).
+    connection = connections[using]
+    if connection.vendor != "postgresql":
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass", [model._meta.db_table])
+        row = cursor.fetchone()
+    if row is None or row[0] < 0:
+        return None
+    return row[0]
+
+
+class EstimatedCountPaginator(Paginator):
+    # Avoids COUNT(*) over large tables. An unfiltered queryset above
+    # ADMIN_ESTIMATED_COUNT_THRESHOLD rows uses the pg_class estimate; a
+    # filtered one is counted up to ADMIN_COUNT_LIMIT rows. `count_note`
+    # says which of the two happened ("estimated", "at least" or "").
+    count_note = ""
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.has_filters():
+            estimate = estimated_row_count(queryset.model, queryset.db)
+            if estimate is not None and estimate >= getattr(settings, "ADMIN_ESTIMATED_COUNT_THRESHOLD", 100_000):
+                self.count_note = "estimated"
+                return estimate
+            return queryset.count()
+        limit = getattr(settings, "ADMIN_COUNT_LIMIT", 10_000)
+        count = queryset.order_by()[: limit + 1].count()
+        if count > limit:
+            self.count_note = "at least"
+            return limit
+        return count
+
+
+def encode_cursor(created_at: datetime, pk) -> str:
+    return f"{created_at.isoformat()}{CURSOR_SEPARATOR}{pk}"
+
+
+def decode_cursor(value: str) -> tuple[datetime, uuid.UUID]:
+    # Raises ValueError for anything encode_cursor() could not have produced.
+    created_at, _, pk = value.rpartition(CURSOR_SEPARATOR)
+    return datetime.fromisoformat(created_at), uuid.UUID(pk)
+
+
+def older_than(queryset, cursor: tuple[datetime, uuid.UUID]):
+    # Rows after `cursor` in ("-created_at", "-id") order. The redundant
+    # created_at__lte gives PostgreSQL an index condition on
+    # accounts_user_created_idx, so the scan starts at the cursor instead of
+    # filtering every newer row again.
+    created_at, pk = cursor
+    return queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk), created_at__lte=created_at)
+
+
+class KeysetPagination(BasePagination):
+    # Cursor pagination over ("-created_at", "-id"), the User.Meta ordering
+    # plus the id tie-breaker. The cursor is the last row of the previous
+    # page, so every page is an index range scan of accounts_user_created_idx
+    # no matter how deep. Works on model and .values() querysets.
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    page_size = 50
+    max_page_size = 200
+
+    def get_page_size(self, request) -> int:
+        try:
+            requested = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except ValueError:
+            return self.page_size
+        return min(max(requested, 1), self.max_page_size)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+        raw_cursor = request.query_params.get(self.cursor_query_param)
+        if raw_cursor:
+            try:
+                queryset = older_than(queryset, decode_cursor(raw_cursor))
+            except ValueError as exc:
+                raise NotFound("Invalid cursor.") from exc
+        rows = list(queryset.order_by("-created_at", "-id")[: page_size + 1])
+        page = rows[:page_size]
+        self.next_cursor = None
+        if len(rows) > page_size:
+            last = page[-1]
+            if isinstance(last, dict):
+                self.next_cursor = encode_cursor(last["created_at"], last["id"])
+            else:
+                self.next_cursor = encode_cursor(last.created_at, last.pk)
+        return page
+
+    def get_next_link(self) -> str | None:
+        if self.next_cursor is None:
+            return None
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, self.next_cursor)
+
+    def get_first_link(self) -> str:
+        return remove_query_param(self.request.build_absolute_uri(), self.cursor_query_param)
+
+    def get_paginated_response(self, data):
+        return Response({"next": self.get_next_link(), "first": self.get_first_link(), "results": data})
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import gzip
+import re
+import threading
+from array import array
+from bisect import bisect_left
+from difflib import SequenceMatcher
+
+from django.contrib.auth import password_validation
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+
+
+class PasswordList:
+    # A password list as one sorted array of the entries' 64-bit str hashes:
+    # Django's 20000 common passwords take 160 KB instead of a 1.6 MB set of str
+    # objects, and a lookup only reads the buffer, so the pages a pre-fork
+    # master built stay shared with its workers. hash() is salted per process,
+    # which is fine for a list that is built and queried in the same one (or
+    # in a fork of it). Anything longer than the longest entry is not hashed.
+    __slots__ = ("hashes", "longest")
+
+    def __init__(self, passwords):
+        passwords = set(passwords)
+        self.hashes = array("q", sorted({hash(password) for password in passwords}))
+        self.longest = max(map(len, passwords), default=0)
+
+    @classmethod
+    def load(cls, path) -> PasswordList:
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                return cls(line.strip() for line in f)
+        except OSError:
+            with open(path) as f:
+                return cls(line.strip() for line in f)
+
+    def __contains__(self, password: str) -> bool:
+        if len(password) > self.longest:
+            return False
+        value = hash(password)
+        index = bisect_left(self.hashes, value)
+        return index < len(self.hashes) and self.hashes[index] == value
+
+    def __len__(self) -> int:
+        return len(self.hashes)
+
+
+_password_lists: dict[str, PasswordList] = {}
+_password_lists_lock = threading.Lock()
+
+
+def password_list(path) -> PasswordList:
+    key = str(path)
+    with _password_lists_lock:
+        if key not in _password_lists:
+            _password_lists[key] = PasswordList.load(path)
+        return _password_lists[key]
+
+
+class CommonPasswordValidator(password_validation.CommonPasswordValidator):
+    # Django's validator, but each list is read once per process rather than
+    # once per validator instance, and kept as a PasswordList.
+    def __init__(self, password_list_path=None):
+        self.passwords = password_list(password_list_path or self.DEFAULT_PASSWORD_LIST_PATH)
+
+
+class UserAttributeSimilarityValidator(password_validation.UserAttributeSimilarityValidator):
+    # Same verdicts as Django's validator at a bounded cost. quick_ratio() is
+    # 2 * matches / (len(a) + len(b)), and matches never exceed the shorter
+    # string, so a pair whose lengths alone keep it under max_similarity is
+    # skipped without building a SequenceMatcher, and a long password is only
+    # compared against attribute parts of a similar length.
+    def validate(self, password, user=None):
+        if not user:
+            return
+
+        password = password.lower()
+        password_length = len(password)
+        for attribute_name in self.user_attributes:
+            value = getattr(user, attribute_name, None)
+            if not value or not isinstance(value, str):
+                continue
+            value_lower = value.lower()
+            for value_part in (*re.split(r"\W+", value_lower), value_lower):
+                part_length = len(value_part)
+                if 2 * min(password_length, part_length) < self.max_similarity * (password_length + part_length):
+                    continue
+                if SequenceMatcher(a=password, b=value_part).quick_ratio() >= self.max_similarity:
+                    try:
+                        verbose_name = str(user._meta.get_field(attribute_name).verbose_name)
+                    except FieldDoesNotExist:
+                        verbose_name = attribute_name
+                    raise ValidationError(
+                        self.get_error_message(),
+                        code="password_too_similar",
+                        params={"verbose_name": verbose_name},
+                    )
+
+
+class PasswordPolicy:
+    # AUTH_PASSWORD_VALIDATORS as one engine for every path that sets a
+    # password: registration, create_user() and import_users. The validators
+    # are Django's cached instances (rebuilt when the setting changes); warm()
+    # builds them, and the common-password list with them, at app-ready time,
+    # so a gunicorn master does it once before forking instead of every worker
+    # on its first registration.
+    def warm(self) -> list:
+        return password_validation.get_default_password_validators()
+
+    def validate(self, password: str, user=None) -> None:
+        password_validation.validate_password(password, user=user, password_validators=self.warm())
+
+
+password_policy = PasswordPolicy()
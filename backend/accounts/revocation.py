@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import hashlib
+import math
+import threading
+import time
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+# Rows committed slightly after a newer row was already observed are re-read on
+# the next sync instead of being skipped by the watermark.
+SYNC_OVERLAP = timedelta(seconds=60)
+
+
+class BloomFilter:
+    def __init__(self, capacity: int, error_rate: float):
+        capacity = max(int(capacity), 1)
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(int(-capacity * math.log(error_rate) / (math.log(2) ** 2)), 8)
+        self.num_hashes = max(int(round(self.num_bits / capacity * math.log(2))), 1)
+        self.count = 0
+        self._bits = bytearray((self.num_bits + 7) // 8)
+
+    def _positions(self, value: str):
+        digest = hashlib.blake2b(value.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        for index in range(self.num_hashes):
+            yield (first + index * second) % self.num_bits
+
+    def add(self, value: str) -> bool:
+        # Only values that set a new bit are counted, so re-adding the rows a
+        # sync overlaps with (or a JTI this worker blacklisted itself) does not
+        # push the filter towards saturated.
+        added = False
+        for position in self._positions(value):
+            mask = 1 << (position & 7)
+            if not self._bits[position >> 3] & mask:
+                self._bits[position >> 3] |= mask
+                added = True
+        if added:
+            self.count += 1
+        return added
+
+    def __contains__(self, value: str) -> bool:
+        bits = self._bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(value))
+
+    @property
+    def saturated(self) -> bool:
+        return self.count > self.capacity
+
+
+# Per-process index of blacklisted refresh-token JTIs. A negative lookup skips
+# the blacklist query; a positive one is confirmed against the database. Rows
+# blacklisted by other workers are picked up at most REVOCATION_FILTER_SYNC_SECONDS later.
+class RevocationIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._rebuild_lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._filter: BloomFilter | None = None
+            self._watermark = None
+            self._last_sync = 0.0
+            self.hits = 0
+            self.misses = 0
+            self.false_positives = 0
+            self.syncs = 0
+            self.rebuilds = 0
+
+    @property
+    def enabled(self) -> bool:
+        return getattr(settings, "REVOCATION_FILTER_ENABLED", True)
+
+    def _new_filter(self, expected: int) -> BloomFilter:
+        capacity = max(getattr(settings, "REVOCATION_FILTER_CAPACITY", 100_000), expected * 2)
+        return BloomFilter(capacity, getattr(settings, "REVOCATION_FILTER_ERROR_RATE", 0.001))
+
+    def rebuild(self) -> None:
+        now = timezone.now()
+        rows = BlacklistedToken.objects.filter(token__expires_at__gt=now)
+        bloom = self._new_filter(rows.count())
+        watermark = None
+        for jti, blacklisted_at in rows.values_list("token__jti", "blacklisted_at").iterator():
+            bloom.add(jti)
+            if watermark is None or blacklisted_at > watermark:
+                watermark = blacklisted_at
+
+        with self._lock:
+            self._filter = bloom
+            self._watermark = watermark or now
+            self._last_sync = time.monotonic()
+            self.rebuilds += 1
+
+    def _rebuild_due(self) -> bool:
+        return self._filter is None or self._filter.saturated
+
+    def _sync_due(self) -> bool:
+        if self._rebuild_due():
+            return True
+        return time.monotonic() - self._last_sync >= getattr(settings, "REVOCATION_FILTER_SYNC_SECONDS", 5.0)
+
+    def sync(self, force: bool = False) -> None:
+        if self._rebuild_due():
+            # One full-table read per process: threads that queued behind it
+            # find the new filter and return.
+            with self._rebuild_lock:
+                if self._rebuild_due():
+                    self.rebuild()
+            return
+        if not force and not self._sync_due():
+            return
+
+        with self._lock:
+            # Claim this sync round so concurrent threads keep serving lookups.
+            self._last_sync = time.monotonic()
+            since = self._watermark - SYNC_OVERLAP
+
+        rows = BlacklistedToken.objects.filter(blacklisted_at__gte=since).values_list("token__jti", "blacklisted_at")
+        with self._lock:
+            for jti, blacklisted_at in rows:
+                self._filter.add(jti)
+                if blacklisted_at > self._watermark:
+                    self._watermark = blacklisted_at
+            self.syncs += 1
+
+    def add(self, jti: str) -> None:
+        if self._filter is None:
+            return
+        with self._lock:
+            self._filter.add(jti)
+
+    def is_revoked(self, jti: str) -> bool:
+        if not self.enabled:
+            return BlacklistedToken.objects.filter(token__jti=jti).exists()
+
+        self.sync()
+        if jti not in self._filter:
+            self.misses += 1
+            return False
+
+        if BlacklistedToken.objects.filter(token__jti=jti).exists():
+            self.hits += 1
+            return True
+
+        self.false_positives += 1
+        return False
+
+    async def ais_revoked(self, jti: str) -> bool:
+        blacklisted = BlacklistedToken.objects.filter(token__jti=jti)
+        if not self.enabled:
+            return await blacklisted.aexists()
+
+        if self._sync_due():
+            await sync_to_async(self.sync)()
+        if jti not in self._filter:
+            self.misses += 1
+            return False
+
+        if await blacklisted.aexists():
+            self.hits += 1
+            return True
+
+        self.false_positives += 1
+        return False
+
+    def stats(self) -> dict:
+        bloom = self._filter
+        return {
+            "enabled": self.enabled,
+            "hits": self.hits,
+            "misses": self.misses,
+            "false_positives": self.false_positives,
+            "syncs": self.syncs,
+            "rebuilds": self.rebuilds,
+            "entries": bloom.count if bloom else 0,
+            "capacity": bloom.capacity if bloom else 0,
+            "bits": bloom.num_bits if bloom else 0,
+            "hashes": bloom.num_hashes if bloom else 0,
+        }
+
+
+revocation_index = RevocationIndex()
@@ -1,14 +1,22 @@
 from __future__ import annotations
 
-from django.contrib.auth import authenticate, get_user_model
-from django.contrib.auth.password_validation import validate_password
+from asgiref.sync import sync_to_async
+from django.contrib.auth import aauthenticate, authenticate, get_user_model
 from django.core.exceptions import ValidationError as DjangoValidationError
-from django.db import IntegrityError, transaction
+from django.db.models.functions import Lower
 from rest_framework.exceptions import AuthenticationFailed, PermissionDenied
 from rest_framework import serializers
 from rest_framework_simplejwt.exceptions import InvalidToken
 from rest_framework_simplejwt.serializers import TokenRefreshSerializer
-from rest_framework_simplejwt.tokens import RefreshToken, TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import TokenError
+
+from accounts.activity import last_login_buffer
+from accounts.hashing import hashing_pool
+from accounts.login_guard import login_guard
+from accounts.password_policy import password_policy
+from accounts.tokens import RefreshToken, asign
+from api.routers import use_primary_if_written
 
 User = get_user_model()
 
@@ -17,29 +25,47 @@ class RegisterSerializer(serializers.Serializer):
     email = serializers.EmailField()
     password = serializers.CharField(write_only=True, min_length=8, trim_whitespace=False)
 
+    duplicate_email_error = {"email": ["A user with this email already exists."]}
+
+    # Both fields are checked in their own validators, so a taken email and a weak
+    # password are reported together. The email check is one indexed lookup on
+    # lower(email); the INSERT ... ON CONFLICT in create() stays the race-safe check.
     def validate_email(self, value: str) -> str:
-        normalized_email = User.objects.normalize_email_value(value)
-        if User.objects.filter(email=normalized_email).exists():
-            raise serializers.ValidationError("A user with this email already exists.")
-        return normalized_email
+        email = User.objects.normalize_email_value(value)
+        use_primary_if_written(email=email)
+        if User.objects.alias(email_lower=Lower("email")).filter(email_lower=email).exists():
+            raise serializers.ValidationError(self.duplicate_email_error["email"])
+        return email
 
     def validate_password(self, value: str) -> str:
-        candidate_user = User(email=self.initial_data.get("email", ""))
+        email = self.initial_data.get("email")
+        email = User.objects.normalize_email_value(email) if isinstance(email, str) else ""
         try:
-            validate_password(value, user=candidate_user)
+            password_policy.validate(value, user=User(email=email))
         except DjangoValidationError as exc:
             raise serializers.ValidationError(list(exc.messages)) from exc
         return value
 
     def create(self, validated_data):
-        try:
-            with transaction.atomic():
-                return User.objects.create_user(
-                    email=validated_data["email"],
-                    password=validated_data["password"],
-                )
-        except IntegrityError as exc:
-            raise serializers.ValidationError({"email": ["A user with this email already exists."]}) from exc
+        user = User(email=validated_data["email"])
+        user.set_password(validated_data["password"])
+        if not User.objects.insert_if_absent(user):
+            raise serializers.ValidationError(self.duplicate_email_error)
+        return user
+
+
+class UserDirectoryFilterSerializer(serializers.Serializer):
+    is_active = serializers.BooleanField(required=False, allow_null=True, default=None)
+    is_staff = serializers.BooleanField(required=False, allow_null=True, default=None)
+    email = serializers.CharField(required=False, allow_blank=True, trim_whitespace=True, max_length=254)
+
+    def filter(self, queryset):
+        filters = {key: value for key in ("is_active", "is_staff") if (value := self.validated_data[key]) is not None}
+        prefix = self.validated_data.get("email", "").lower()
+        if prefix:
+            # Emails are stored lower-cased; a case-sensitive prefix uses accounts_user_email_prefix_idx.
+            filters["email__startswith"] = prefix
+        return queryset.filter(**filters)
 
 
 class LoginSerializer(serializers.Serializer):
@@ -51,19 +77,41 @@ class LoginSerializer(serializers.Serializer):
         password = attrs["password"]
         request = self.context.get("request")
 
+        use_primary_if_written(email=email)
+        login_guard.check(email, request)
         user = authenticate(request=request, email=email, password=password)
         if user is None or not user.is_active:
+            login_guard.record_failure(email, request)
             raise AuthenticationFailed("Invalid email or password.")
 
+        last_login_buffer.record(user)
         attrs["user"] = user
         return attrs
 
 
+class RotatingTokenRefreshSerializer(TokenRefreshSerializer):
+    token_class = RefreshToken
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs["refresh"])
+        if refresh.family_id is None:
+            # Issued before session families: blacklisted, and replaced by the first token of a new family.
+            user_id = refresh.payload.get(api_settings.USER_ID_CLAIM)
+            user = User.objects.filter(**{api_settings.USER_ID_FIELD: user_id}).first()
+            if not api_settings.USER_AUTHENTICATION_RULE(user):
+                raise AuthenticationFailed(self.error_messages["no_active_account"], "no_active_account")
+            refresh.blacklist()
+            refresh = self.token_class.for_user(user)
+        else:
+            refresh.rotate()
+        return {"access": str(refresh.access_token), "refresh": str(refresh)}
+
+
 class RefreshTokenSerializer(serializers.Serializer):
     refresh = serializers.CharField(write_only=True)
 
     def validate(self, attrs):
-        token_serializer = TokenRefreshSerializer(data={"refresh": attrs["refresh"]})
+        token_serializer = RotatingTokenRefreshSerializer(data={"refresh": attrs["refresh"]})
         try:
             token_serializer.is_valid(raise_exception=True)
         except TokenError as exc:
@@ -74,12 +122,15 @@ class RefreshTokenSerializer(serializers.Serializer):
 class LogoutSerializer(serializers.Serializer):
     refresh = serializers.CharField(write_only=True)
 
+    def decode_refresh(self, value: str) -> RefreshToken:
+        return RefreshToken(value)
+
     def validate(self, attrs):
         request = self.context["request"]
         refresh_value = attrs["refresh"]
 
         try:
-            token = RefreshToken(refresh_value)
+            token = self.decode_refresh(refresh_value)
         except TokenError:
             attrs["token"] = None
             return attrs
@@ -101,9 +152,92 @@ class LogoutSerializer(serializers.Serializer):
             return None
 
         try:
-            token.blacklist()
+            # One UPDATE ends the token's session family. A token from before
+            # families is blacklisted instead, which also records its JTI in
+            # this worker's revocation index.
+            token.revoke()
         except TokenError:
             # Idempotent behavior: token may already be invalid/blacklisted.
             return None
 
         return None
+
+
+# -------- Async Variants --------
+# Used by accounts.async_views. Each keeps the field validation and error shapes
+# of its sync parent but moves database work into a coroutine so it can run on
+# the async ORM instead of blocking the event loop.
+
+
+class AsyncRegisterSerializer(RegisterSerializer):
+    async def ais_valid(self, raise_exception: bool = False) -> bool:
+        # The duplicate-email pre-check queries the database, so validation runs off the event loop.
+        return await sync_to_async(self.is_valid)(raise_exception=raise_exception)
+
+    async def asave(self):
+        user = User(email=self.validated_data["email"])
+        user.password = await hashing_pool.amake_password(self.validated_data["password"])
+        if not await User.objects.ainsert_if_absent(user):
+            raise serializers.ValidationError(self.duplicate_email_error)
+        self.instance = user
+        return user
+
+
+class AsyncLoginSerializer(LoginSerializer):
+    def validate(self, attrs):
+        attrs["email"] = User.objects.normalize_email_value(attrs["email"])
+        return attrs
+
+    async def aauthenticate(self):
+        attrs = self.validated_data
+        request = self.context.get("request")
+        use_primary_if_written(email=attrs["email"])
+        login_guard.check(attrs["email"], request)
+        user = await aauthenticate(request=request, email=attrs["email"], password=attrs["password"])
+        if user is None or not user.is_active:
+            login_guard.record_failure(attrs["email"], request)
+            raise AuthenticationFailed("Invalid email or password.")
+        await last_login_buffer.arecord(user)
+        attrs["user"] = user
+        return user
+
+
+class AsyncRefreshTokenSerializer(RefreshTokenSerializer):
+    def validate(self, attrs):
+        return attrs
+
+    async def arotate(self) -> dict:
+        raw_refresh = self.validated_data["refresh"]
+        try:
+            refresh = RefreshToken(raw_refresh, check_blacklist=False)
+            if refresh.family_id is not None:
+                await refresh.arotate()
+                encoded = await asign(refresh)
+            else:
+                await refresh.acheck_blacklist()
+                user = await self.alegacy_user(refresh)
+                await refresh.ablacklist(raw_refresh)
+                refresh, encoded = await RefreshToken.afor_user(user)
+        except TokenError as exc:
+            raise InvalidToken(exc.args[0]) from exc
+        return {"access": await asign(refresh.access_token), "refresh": encoded}
+
+    async def alegacy_user(self, refresh: RefreshToken):
+        user_id = refresh.payload.get(api_settings.USER_ID_CLAIM)
+        user = await User.objects.filter(**{api_settings.USER_ID_FIELD: user_id}).afirst()
+        if not api_settings.USER_AUTHENTICATION_RULE(user):
+            raise AuthenticationFailed("No active account found for the given token.", "no_active_account")
+        return user
+
+
+class AsyncLogoutSerializer(LogoutSerializer):
+    def decode_refresh(self, value: str) -> RefreshToken:
+        # Revoking is idempotent, so the blacklist lookup is skipped entirely.
+        return RefreshToken(value, check_blacklist=False)
+
+    async def asave(self):
+        token = self.validated_data.get("token")
+        if token is None:
+            return None
+        await token.arevoke(self.validated_data["refresh"])
+        return None
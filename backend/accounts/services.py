@@ -1,7 +1,8 @@
 from __future__ import annotations
 
 from django.contrib.auth import get_user_model
-from rest_framework_simplejwt.tokens import RefreshToken
+
+from accounts.tokens import RefreshToken, asign
 
 User = get_user_model()
 
@@ -19,3 +20,18 @@ def build_auth_response(user: User) -> dict:
             "token_type": "Bearer",
         },
     }
+
+
+async def abuild_auth_response(user: User) -> dict:
+    refresh, encoded_refresh = await RefreshToken.afor_user(user)
+    return {
+        "user": {
+            "id": str(user.id),
+            "email": user.email,
+        },
+        "tokens": {
+            "access": await asign(refresh.access_token),
+            "refresh": encoded_refresh,
+            "token_type": "Bearer",
+        },
+    }
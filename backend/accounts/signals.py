@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from accounts.authentication import principal_cache
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def refresh_cached_principal(sender, instance, created, update_fields, **kwargs):
+    # A new user cannot be cached anywhere yet.
+    if not created:
+        principal_cache.invalidate_if_changed(instance, update_fields)
+
+
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def drop_cached_principal(sender, instance, **kwargs):
+    principal_cache.invalidate_user(instance.pk)
@@ -1,15 +1,77 @@
 from __future__ import annotations
 
+import csv
+import io
+import json
+import tempfile
+import unittest
 import uuid
+from datetime import timedelta
+from pathlib import Path
+from unittest import mock
 
+import jwt
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.contrib.auth import password_validation
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import path
+from django.utils import timezone
 from rest_framework import status
-from rest_framework.test import APITestCase
+from rest_framework.exceptions import AuthenticationFailed, ValidationError as DRFValidationError
+from rest_framework.test import APIRequestFactory, APITestCase
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
 from rest_framework_simplejwt.tokens import RefreshToken
 
+from accounts.activity import LastLoginBuffer
+from accounts.async_views import AsyncLoginAPIView, AsyncLogoutAPIView, AsyncRefreshAPIView, AsyncRegisterAPIView
+from accounts.authentication import CachedJWTAuthentication, PrincipalCache, principal_cache
+from accounts.hashing import hashing_pool, rehash_queue
+from accounts.keys import generate_private_key, key_ring
+from accounts.login_guard import failure_windows, login_guard
+from accounts.maintenance import purge_expired_tokens
+from accounts.models import SessionFamily
+from accounts.password_policy import PasswordList, password_policy
+from accounts.revocation import revocation_index
+from accounts.serializers import RegisterSerializer
+from accounts.tokens import RefreshToken as FamilyRefreshToken
+from api.metrics import metrics_registry
+from api.throttling import shared_windows
+
 User = get_user_model()
 
 
+def setUpModule():
+    # Throttle counters and metrics snapshots are host-wide files; give the test run its own.
+    # last_login is written inline so no flush thread writes into a test transaction.
+    directory = tempfile.TemporaryDirectory()
+    shared_settings = override_settings(
+        THROTTLE_SHARED_PATH=str(Path(directory.name) / "throttle"),
+        METRICS_DIR=str(Path(directory.name) / "metrics"),
+        LOGIN_GUARD_SHARED_PATH=str(Path(directory.name) / "login-failures"),
+        AUTH_PRINCIPAL_SHARED_PATH=str(Path(directory.name) / "principal-changes"),
+        LAST_LOGIN_FLUSH_INTERVAL=0,
+        DB_STICKY_SHARED_PATH=str(Path(directory.name) / "recent-writes"),
+    )
+    shared_settings.enable()
+    unittest.addModuleCleanup(directory.cleanup)
+    unittest.addModuleCleanup(shared_settings.disable)
+
+# Routes for AsyncAuthAPITestCase; the project urlconf picks views once from API_VIEW_MODE.
+urlpatterns = [
+    path("async/register", AsyncRegisterAPIView.as_view()),
+    path("async/login", AsyncLoginAPIView.as_view()),
+    path("async/refresh", AsyncRefreshAPIView.as_view()),
+    path("async/logout", AsyncLogoutAPIView.as_view()),
+]
+
+
 class AuthAPITestCase(APITestCase):
     register_url = "/api/auth/register"
     login_url = "/api/auth/login"
@@ -42,7 +104,51 @@ class AuthAPITestCase(APITestCase):
         response = self.client.post(self.register_url, payload, format="json")
 
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
-        self.assertIn("email", response.data)
+        self.assertEqual(response.data, {"email": ["A user with this email already exists."]})
+
+    def test_register_rejects_email_differing_only_in_case_at_the_database(self):
+        # A row written around save() keeps its case; the lower(email) index still matches it.
+        User.objects.bulk_create([User(email="Owner@Example.com", password="!")])
+        payload = {"email": "owner@example.com", "password": "StrongPass#2026"}
+
+        response = self.client.post(self.register_url, payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data, {"email": ["A user with this email already exists."]})
+        self.assertEqual(User.objects.count(), 1)
+
+    def test_register_reports_taken_email_and_weak_password_together(self):
+        User.objects.create_user(email="owner@example.com", password="StrongPass#2026")
+        payload = {"email": "owner@example.com", "password": "password"}
+
+        response = self.client.post(self.register_url, payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data["email"], ["A user with this email already exists."])
+        self.assertIn("password", response.data)
+
+    def test_register_rejects_email_taken_after_validation(self):
+        serializer = RegisterSerializer(data={"email": "owner@example.com", "password": "StrongPass#2026"})
+        self.assertTrue(serializer.is_valid())
+        User.objects.bulk_create([User(email="Owner@Example.com", password="!")])
+
+        with self.assertRaises(DRFValidationError) as caught:
+            serializer.save()
+
+        self.assertEqual(caught.exception.detail, {"email": ["A user with this email already exists."]})
+        self.assertEqual(User.objects.count(), 1)
+
+    def test_register_creates_user_with_a_single_insert(self):
+        user = User(email="owner@example.com")
+        user.set_password("StrongPass#2026")
+
+        with self.assertNumQueries(1):
+            self.assertTrue(User.objects.insert_if_absent(user))
+        with self.assertNumQueries(1):
+            self.assertFalse(User.objects.insert_if_absent(User(email="owner@example.com", password="!")))
+
+        self.assertFalse(user._state.adding)
+        self.assertTrue(User.objects.get(pk=user.pk).check_password("StrongPass#2026"))
 
     def test_register_normalizes_email_to_lowercase(self):
         payload = {"email": "Owner@Example.Com", "password": "StrongPass#2026"}
@@ -85,6 +191,25 @@ class AuthAPITestCase(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data["user"]["email"], "owner@example.com")
 
+    def test_login_fails_fast_with_503_when_hashing_pool_is_full(self):
+        User.objects.create_user(email="owner@example.com", password="StrongPass#2026")
+        payload = {"email": "owner@example.com", "password": "StrongPass#2026"}
+
+        with self.settings(PASSWORD_HASHING_MAX_PENDING=0):
+            response = self.client.post(self.login_url, payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response.data["detail"].code, "hashing_unavailable")
+
+    def test_register_fails_fast_with_503_when_hashing_pool_is_full(self):
+        payload = {"email": "owner@example.com", "password": "StrongPass#2026"}
+
+        with self.settings(PASSWORD_HASHING_MAX_PENDING=0):
+            response = self.client.post(self.register_url, payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(User.objects.count(), 0)
+
     def test_refresh_success_returns_new_access_and_refresh(self):
         user = User.objects.create_user(email="owner@example.com", password="StrongPass#2026")
         tokens = self.issue_tokens_for_user(user)
@@ -162,3 +287,840 @@ class AuthAPITestCase(APITestCase):
 
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertIn("refresh", response.data)
+
+
+@override_settings(ROOT_URLCONF="accounts.tests")
+class AsyncAuthAPITestCase(TestCase):
+    register_url = "/async/register"
+    login_url = "/async/login"
+    refresh_url = "/async/refresh"
+    logout_url = "/async/logout"
+
+    async def post(self, url, payload, **extra):
+        return await self.async_client.post(url, payload, content_type="application/json", **extra)
+
+    async def test_register_then_login(self):
+        payload = {"email": "Owner@Example.Com", "password": "StrongPass#2026"}
+
+        register_response = await self.post(self.register_url, payload)
+        login_response = await self.post(self.login_url, payload)
+
+        self.assertEqual(register_response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(register_response.data["user"]["email"], "owner@example.com")
+        self.assertEqual(login_response.status_code, status.HTTP_200_OK)
+        self.assertEqual(await SessionFamily.objects.filter(user__email="owner@example.com").acount(), 2)
+        self.assertFalse(await OutstandingToken.objects.aexists())
+        self.assertIsNotNone((await User.objects.aget(email="owner@example.com")).last_login)
+
+    async def test_register_rejects_duplicate_email(self):
+        await User.objects.acreate_user(email="owner@example.com", password="StrongPass#2026")
+
+        response = await self.post(self.register_url, {"email": "OWNER@example.com", "password": "StrongPass#2026"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("email", response.data)
+
+    async def test_login_rejects_unknown_email_and_wrong_password(self):
+        await User.objects.acreate_user(email="owner@example.com", password="StrongPass#2026")
+
+        unknown = await self.post(self.login_url, {"email": "nobody@example.com", "password": "StrongPass#2026"})
+        wrong = await self.post(self.login_url, {"email": "owner@example.com", "password": "WrongPass#2026"})
+
+        self.assertEqual(unknown.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(wrong.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    async def test_refresh_rotates_and_blacklists_old_token(self):
+        user = await User.objects.acreate_user(email="owner@example.com", password="StrongPass#2026")
+        tokens = await sync_to_async(AuthAPITestCase.issue_tokens_for_user)(user)
+
+        first = await self.post(self.refresh_url, {"refresh": tokens["refresh"]})
+        replay = await self.post(self.refresh_url, {"refresh": tokens["refresh"]})
+
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(first.data["refresh"], tokens["refresh"])
+        self.assertEqual(replay.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    async def test_logout_blacklists_refresh(self):
+        user = await User.objects.acreate_user(email="owner@example.com", password="StrongPass#2026")
+        tokens = await sync_to_async(AuthAPITestCase.issue_tokens_for_user)(user)
+        auth = {"headers": {"Authorization": f"Bearer {tokens['access']}"}}
+
+        anonymous = await self.post(self.logout_url, {"refresh": tokens["refresh"]})
+        response = await self.post(self.logout_url, {"refresh": tokens["refresh"]}, **auth)
+        again = await self.post(self.logout_url, {"refresh": tokens["refresh"]}, **auth)
+
+        self.assertEqual(anonymous.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["detail"], "Logout successful.")
+        self.assertEqual(again.status_code, status.HTTP_200_OK)
+        self.assertTrue(await BlacklistedToken.objects.filter(token__user=user).aexists())
+
+    async def test_family_token_rotates_and_replay_revokes_the_family(self):
+        payload = {"email": "owner@example.com", "password": "StrongPass#2026"}
+        tokens = (await self.post(self.register_url, payload)).data["tokens"]
+
+        first = await self.post(self.refresh_url, {"refresh": tokens["refresh"]})
+        replay = await self.post(self.refresh_url, {"refresh": tokens["refresh"]})
+        newest = await self.post(self.refresh_url, {"refresh": first.data["refresh"]})
+
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual(replay.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(newest.status_code, status.HTTP_401_UNAUTHORIZED)
+        family = await SessionFamily.objects.aget()
+        self.assertEqual(family.generation, 1)
+        self.assertIsNotNone(family.revoked_at)
+
+
+@override_settings(REVOCATION_FILTER_SYNC_SECONDS=3600)
+class RevocationIndexTestCase(TestCase):
+    def setUp(self):
+        revocation_index.reset()
+        self.user = User.objects.create_user(email="owner@example.com", password="StrongPass#2026")
+
+    def test_negative_lookup_skips_database(self):
+        revocation_index.sync()
+
+        with self.assertNumQueries(0):
+            self.assertFalse(revocation_index.is_revoked(uuid.uuid4().hex))
+
+        self.assertEqual(revocation_index.misses, 1)
+
+    def test_positive_lookup_is_confirmed_against_blacklist(self):
+        refresh = RefreshToken.for_user(self.user)
+        refresh.blacklist()
+        revocation_index.rebuild()
+
+        self.assertTrue(revocation_index.is_revoked(refresh["jti"]))
+        self.assertEqual(revocation_index.hits, 1)
+
+    def test_false_positive_is_counted_and_not_revoked(self):
+        revocation_index.sync()
+        jti = uuid.uuid4().hex
+        revocation_index.add(jti)
+
+        self.assertFalse(revocation_index.is_revoked(jti))
+        self.assertEqual(revocation_index.false_positives, 1)
+
+    def test_sync_picks_up_revocations_from_other_workers(self):
+        revocation_index.sync()
+        refresh = RefreshToken.for_user(self.user)
+        outstanding = OutstandingToken.objects.get(jti=refresh["jti"])
+        BlacklistedToken.objects.create(token=outstanding)
+
+        self.assertFalse(revocation_index.is_revoked(refresh["jti"]))
+        revocation_index.sync(force=True)
+        self.assertTrue(revocation_index.is_revoked(refresh["jti"]))
+
+    def test_overlapping_syncs_count_each_jti_once(self):
+        refresh = RefreshToken.for_user(self.user)
+        refresh.blacklist()
+        revocation_index.rebuild()
+        revocation_index.add(refresh["jti"])
+        revocation_index.sync(force=True)
+        revocation_index.sync(force=True)
+
+        self.assertEqual(revocation_index.stats()["entries"], 1)
+        self.assertEqual(revocation_index.rebuilds, 1)
+
+
+class CachedJWTAuthenticationTestCase(TestCase):
+    def setUp(self):
+        principal_cache.reset()
+        self.user = User.objects.create_user(email="owner@example.com", password="StrongPass#2026")
+        access = str(RefreshToken.for_user(self.user).access_token)
+        self.request = APIRequestFactory().get("/", HTTP_AUTHORIZATION=f"Bearer {access}")
+
+    def test_repeat_authentication_does_not_query_user(self):
+        CachedJWTAuthentication().authenticate(self.request)
+
+        with self.assertNumQueries(0):
+            user, token = CachedJWTAuthentication().authenticate(self.request)
+
+        self.assertEqual(user.pk, self.user.pk)
+        self.assertEqual(user.email, "owner@example.com")
+        self.assertTrue(user.is_authenticated)
+        self.assertEqual(principal_cache.stats()["hits"], 1)
+
+    def test_deactivating_user_invalidates_cached_principal(self):
+        CachedJWTAuthentication().authenticate(self.request)
+
+        self.user.is_active = False
+        self.user.save()
+
+        with self.assertRaises(AuthenticationFailed):
+            CachedJWTAuthentication().authenticate(self.request)
+        self.assertEqual(principal_cache.stats()["invalidations"], 1)
+
+    def test_unrelated_save_keeps_cached_principal(self):
+        CachedJWTAuthentication().authenticate(self.request)
+
+        self.user.save()
+
+        with self.assertNumQueries(0):
+            CachedJWTAuthentication().authenticate(self.request)
+
+    def test_change_on_another_worker_invalidates_cached_principal(self):
+        CachedJWTAuthentication().authenticate(self.request)
+
+        # Another worker, with its own (empty) cache, deactivates the user without a post_save.
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        PrincipalCache().invalidate_user(self.user.pk)
+
+        with self.assertRaises(AuthenticationFailed):
+            CachedJWTAuthentication().authenticate(self.request)
+        self.assertEqual(principal_cache.stats()["changes"], 1)
+
+
+class HashingPoolTestCase(TestCase):
+    def test_pool_hashes_and_verifies_passwords(self):
+        encoded = hashing_pool.make_password("StrongPass#2026")
+
+        self.assertEqual(hashing_pool.verify_password("StrongPass#2026", encoded), (True, False))
+        self.assertEqual(hashing_pool.verify_password("WrongPass#2026", encoded), (False, False))
+        stats = hashing_pool.stats()
+        self.assertEqual(stats["queue_depth"], 0)
+        self.assertGreater(stats["completed"], 0)
+
+
+class PasswordRehashTestCase(TransactionTestCase):
+    login_url = "/api/auth/login"
+
+    def test_login_upgrades_outdated_hash_in_background(self):
+        user = User.objects.create_user(email="owner@example.com", password="StrongPass#2026")
+        outdated = PBKDF2PasswordHasher().encode("StrongPass#2026", PBKDF2PasswordHasher().salt(), iterations=1000)
+        User.objects.filter(pk=user.pk).update(password=outdated)
+
+        response = self.client.post(
+            self.login_url,
+            {"email": "owner@example.com", "password": "StrongPass#2026"},
+            content_type="application/json",
+        )
+        rehash_queue.drain(timeout=30)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        user.refresh_from_db()
+        self.assertNotEqual(user.password, outdated)
+        self.assertFalse(PBKDF2PasswordHasher().must_update(user.password))
+        self.assertTrue(user.check_password("StrongPass#2026"))
+
+
+class LastLoginBufferTestCase(APITestCase):
+    login_url = "/api/auth/login"
+
+    def setUp(self):
+        self.user = User.objects.create_user(email="owner@example.com", password="StrongPass#2026")
+
+    def login(self):
+        payload = {"email": "owner@example.com", "password": "StrongPass#2026"}
+        return self.client.post(self.login_url, payload, format="json")
+
+    def test_login_writes_last_login_inline_when_interval_is_zero(self):
+        self.assertEqual(self.login().status_code, status.HTTP_200_OK)
+
+        self.user.refresh_from_db()
+        self.assertIsNotNone(self.user.last_login)
+
+    @override_settings(LAST_LOGIN_FLUSH_INTERVAL=3600)
+    def test_logins_are_coalesced_into_one_update(self):
+        buffer = LastLoginBuffer()
+        other = User.objects.create_user(email="other@example.com", password="StrongPass#2026")
+        with mock.patch.object(buffer, "_ensure_thread"):
+            with mock.patch("accounts.serializers.last_login_buffer", buffer):
+                self.assertEqual(self.login().status_code, status.HTTP_200_OK)
+                self.assertEqual(self.login().status_code, status.HTTP_200_OK)
+            buffer.record(other)
+
+        latest = buffer._pending[self.user.pk]
+        self.assertIsNone(User.objects.get(pk=self.user.pk).last_login)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(buffer.flush(), 2)
+
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(User.objects.get(pk=self.user.pk).last_login, latest)
+        self.assertIsNotNone(User.objects.get(pk=other.pk).last_login)
+        self.assertEqual(
+            buffer.stats(), {"pending": 0, "recorded": 3, "written": 2, "flushes": 1, "failures": 0, "dropped": 0}
+        )
+
+    def test_update_never_moves_last_login_backwards(self):
+        newer = timezone.now()
+        User.objects.filter(pk=self.user.pk).update(last_login=newer)
+
+        User.objects.update_last_logins({self.user.pk: newer - timedelta(minutes=5)})
+
+        self.assertEqual(User.objects.get(pk=self.user.pk).last_login, newer)
+
+    @override_settings(LAST_LOGIN_FLUSH_INTERVAL=3600)
+    def test_failed_flush_keeps_timestamps_for_the_next_one(self):
+        buffer = LastLoginBuffer()
+        with mock.patch.object(buffer, "_ensure_thread"):
+            buffer.record(self.user)
+        with mock.patch.object(User.objects, "update_last_logins", side_effect=RuntimeError("database down")):
+            with self.assertLogs("accounts.activity", "ERROR"):
+                self.assertEqual(buffer.flush(), 0)
+
+        self.assertEqual(buffer.flush(), 1)
+        self.assertIsNotNone(User.objects.get(pk=self.user.pk).last_login)
+        self.assertEqual(buffer.failures, 1)
+
+    @override_settings(LAST_LOGIN_FLUSH_INTERVAL=3600, LAST_LOGIN_BATCH_SIZE=2, LAST_LOGIN_MAX_PENDING=3)
+    def test_flush_writes_in_batches_and_sheds_beyond_the_cap(self):
+        buffer = LastLoginBuffer()
+        users = [self.user] + [
+            User.objects.create_user(email=f"user{index}@example.com", password="StrongPass#2026") for index in range(3)
+        ]
+        with mock.patch.object(buffer, "_ensure_thread"), self.assertLogs("accounts.activity", "WARNING"):
+            for user in users:
+                buffer.record(user)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(buffer.flush(), 3)
+
+        self.assertEqual(len(queries), 2)
+        self.assertEqual(buffer.stats()["dropped"], 1)
+        self.assertEqual(User.objects.filter(last_login__isnull=False).count(), 3)
+
+
+class PasswordPolicyTestCase(TestCase):
+    def messages(self, validators, password, user):
+        try:
+            password_validation.validate_password(password, user=user, password_validators=validators)
+        except ValidationError as exc:
+            return exc.messages
+        return []
+
+    def test_policy_rejects_what_djangos_validators_reject(self):
+        django_validators = password_validation.get_password_validators(
+            [
+                {"NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator"},
+                {"NAME": "django.contrib.auth.password_validation.MinimumLengthValidator"},
+                {"NAME": "django.contrib.auth.password_validation.CommonPasswordValidator"},
+                {"NAME": "django.contrib.auth.password_validation.NumericPasswordValidator"},
+            ]
+        )
+        user = User(email="jane.doe@example.com")
+        for password in ("password", "  PassWord1 ", "12345678", "janedoe", "jane.doe@example.com", "Doe", "StrongPass#2026"):
+            with self.subTest(password=password):
+                self.assertEqual(self.messages(password_policy.warm(), password, user), self.messages(django_validators, password, user))
+
+    def test_common_password_list_is_loaded_once(self):
+        with mock.patch.object(PasswordList, "load", wraps=PasswordList.load) as load:
+            with override_settings(AUTH_PASSWORD_VALIDATORS=[{"NAME": "accounts.password_policy.CommonPasswordValidator"}]):
+                first = password_policy.warm()[0]
+            with override_settings(AUTH_PASSWORD_VALIDATORS=[{"NAME": "accounts.password_policy.CommonPasswordValidator"}]):
+                second = password_policy.warm()[0]
+
+        self.assertIsNot(first, second)
+        self.assertIs(first.passwords, second.passwords)
+        self.assertEqual(load.call_count, 0)
+        self.assertIn("password", first.passwords)
+        self.assertNotIn("StrongPass#2026".lower(), first.passwords)
+
+    def test_long_password_skips_the_similarity_matcher(self):
+        user = User(email="jane.doe@example.com")
+        with mock.patch("accounts.password_policy.SequenceMatcher") as matcher:
+            password_policy.validate("Jx7#" + "q" * 4096, user=user)
+
+        matcher.assert_not_called()
+
+    def test_register_and_create_user_use_the_policy(self):
+        with self.assertRaisesMessage(ValidationError, "This password is too common."):
+            User.objects.create_user(email="common@example.com", password="password123")
+
+        response = self.client.post(
+            "/api/auth/register", {"email": "jane.doe@example.com", "password": "jane.doe.example"}, content_type="application/json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.json()["password"], ["The password is too similar to the email."])
+
+
+class SessionFamilyTestCase(APITestCase):
+    refresh_url = "/api/auth/refresh"
+    logout_url = "/api/auth/logout"
+
+    def setUp(self):
+        self.user = User.objects.create_user(email="owner@example.com", password="StrongPass#2026")
+
+    def refresh(self, token: str):
+        return self.client.post(self.refresh_url, {"refresh": token}, format="json")
+
+    def test_rotation_is_one_update_of_one_row(self):
+        token = FamilyRefreshToken.for_user(self.user)
+        family = SessionFamily.objects.get()
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.refresh(str(token))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([query["sql"].split()[0] for query in queries], ["UPDATE"])
+        rotated = FamilyRefreshToken(response.data["refresh"])
+        self.assertEqual((rotated["fam"], rotated["gen"]), (str(family.pk), 1))
+        self.assertNotIn("fam", rotated.access_token.payload)
+        family.refresh_from_db()
+        self.assertEqual(family.generation, 1)
+        self.assertGreaterEqual(family.expires_at, timezone.now() + timedelta(days=6))
+        self.assertFalse(OutstandingToken.objects.exists())
+        self.assertFalse(BlacklistedToken.objects.exists())
+
+    def test_replaying_an_older_generation_revokes_the_family(self):
+        other = FamilyRefreshToken.for_user(self.user)
+        first = str(FamilyRefreshToken.for_user(self.user))
+        second = self.refresh(first).data["refresh"]
+        third = self.refresh(second).data["refresh"]
+
+        self.assertEqual(self.refresh(first).status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(self.refresh(third).status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertIsNotNone(SessionFamily.objects.get(generation=2).revoked_at)
+        self.assertEqual(self.refresh(str(other)).status_code, status.HTTP_200_OK)
+
+    def test_rotation_conditions_stay_on_the_updated_row(self):
+        token = FamilyRefreshToken.for_user(self.user)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.refresh(str(token)).status_code, status.HTTP_200_OK)
+
+        # No self-subquery: the generation check must apply to the row being updated.
+        table = connection.ops.quote_name(SessionFamily._meta.db_table)
+        self.assertNotIn(f"FROM {table}", queries[0]["sql"])
+        self.assertIn(f"{table}.{connection.ops.quote_name('generation')} = ", queries[0]["sql"])
+
+    def test_inactive_user_cannot_rotate(self):
+        token = FamilyRefreshToken.for_user(self.user)
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+
+        self.assertEqual(self.refresh(str(token)).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_logout_revokes_the_family_in_one_write(self):
+        token = FamilyRefreshToken.for_user(self.user)
+        rotated = self.refresh(str(token)).data
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {rotated['access']}")
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.logout_url, {"refresh": rotated["refresh"]}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([query["sql"].split()[0] for query in queries if query["sql"].split()[0] != "SELECT"], ["UPDATE"])
+        self.assertIsNotNone(SessionFamily.objects.get().revoked_at)
+        self.assertEqual(self.refresh(rotated["refresh"]).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_token_from_before_families_is_moved_into_one(self):
+        legacy = RefreshToken.for_user(self.user)
+
+        response = self.refresh(str(legacy))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(BlacklistedToken.objects.filter(token__jti=legacy["jti"]).exists())
+        self.assertEqual(FamilyRefreshToken(response.data["refresh"])["fam"], str(SessionFamily.objects.get().pk))
+        self.assertEqual(self.refresh(str(legacy)).status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+@override_settings(LOGIN_GUARD_EMAIL_FAILURES=3, LOGIN_GUARD_NETWORK_FAILURES=5)
+class LoginGuardTestCase(APITestCase):
+    login_url = "/api/auth/login"
+
+    def setUp(self):
+        failure_windows.reset()
+        login_guard.reset()
+        metrics_registry.reset()
+        shared_windows.reset()
+        User.objects.create_user(email="owner@example.com", password="StrongPass#2026")
+        # Mid-window, so no test sees its failures slide into the previous window.
+        clock = mock.patch("accounts.login_guard.time", mock.Mock(time=lambda: 1_800_000_450.0))
+        clock.start()
+        self.addCleanup(clock.stop)
+
+    def login(self, email: str, password: str = "WrongPass#2026", address: str = "198.51.100.7"):
+        return self.client.post(self.login_url, {"email": email, "password": password}, format="json", REMOTE_ADDR=address)
+
+    def test_refuses_an_email_over_its_threshold_without_hashing(self):
+        for _ in range(3):
+            self.assertEqual(self.login("Owner@Example.com").status_code, status.HTTP_401_UNAUTHORIZED)
+
+        with mock.patch("accounts.serializers.authenticate") as authenticate:
+            refused = self.login("owner@example.com", password="StrongPass#2026", address="192.0.2.1")
+
+        authenticate.assert_not_called()
+        self.assertEqual(refused.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn("Retry-After", refused)
+        self.assertEqual(login_guard.stats()["hashes_avoided"], 1)
+        self.assertEqual(self.login("other@example.com", address="192.0.2.1").status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_unknown_and_existing_emails_are_refused_alike(self):
+        for email in ("owner@example.com", "nobody@example.com"):
+            for _ in range(3):
+                self.login(email, address="192.0.2.1" if email == "owner@example.com" else "203.0.113.1")
+
+        existing = self.login("owner@example.com", address="192.0.2.2")
+        unknown = self.login("nobody@example.com", address="203.0.113.2")
+
+        self.assertEqual((existing.status_code, existing.data), (unknown.status_code, unknown.data))
+        self.assertEqual(existing.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_refuses_a_network_over_its_threshold(self):
+        for index in range(5):
+            self.login(f"user{index}@example.com", address=f"198.51.100.{index + 1}")
+
+        refused = self.login("owner@example.com", password="StrongPass#2026", address="198.51.100.200")
+        elsewhere = self.login("owner@example.com", password="StrongPass#2026", address="198.51.101.1")
+
+        self.assertEqual(refused.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(elsewhere.status_code, status.HTTP_200_OK)
+        self.assertEqual(login_guard.stats()["refused_network"], 1)
+        self.assertEqual(metrics_registry.events.get("login_guard_hashes_avoided"), 1)
+
+    @override_settings(LOGIN_GUARD_ENABLED=False)
+    def test_disabled_guard_counts_nothing(self):
+        for _ in range(4):
+            self.assertEqual(self.login("owner@example.com").status_code, status.HTTP_401_UNAUTHORIZED)
+
+        self.assertEqual(login_guard.stats()["failures"], 0)
+
+
+class CalibrateHashersCommandTestCase(TestCase):
+    def test_writes_recommended_parameters(self):
+        with tempfile.TemporaryDirectory() as directory:
+            output = Path(directory) / "hashers.json"
+            call_command(
+                "calibrate_hashers",
+                "--hashers=pbkdf2_sha256",
+                "--target-ms=5",
+                "--samples=1",
+                "--allow-weaker",
+                f"--output={output}",
+                stdout=io.StringIO(),
+            )
+            config = json.loads(output.read_text())
+
+        self.assertEqual(config["preferred"], "pbkdf2_sha256")
+        self.assertLess(config["hashers"]["pbkdf2_sha256"]["iterations"], PBKDF2PasswordHasher.iterations)
+
+
+class JWTKeyRingTestCase(APITestCase):
+    jwks_url = "/api/auth/.well-known/jwks.json"
+    login_url = "/api/auth/login"
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        for kid in ("2026-a", "2026-b"):
+            call_command("generate_jwt_key", "--algorithm=EdDSA", f"--kid={kid}", f"--directory={directory.name}", stdout=io.StringIO())
+        self.use_keys(active_kid="2026-a")
+        self.addCleanup(key_ring.reset)
+        self.addCleanup(principal_cache.reset)
+        User.objects.create_user(email="owner@example.com", password="StrongPass#2026")
+
+    def use_keys(self, algorithm="EdDSA", active_kid=""):
+        keys_settings = override_settings(JWT_ALGORITHM=algorithm, JWT_KEYS_DIR=self.directory, JWT_ACTIVE_KID=active_kid)
+        keys_settings.enable()
+        self.addCleanup(keys_settings.disable)
+
+    def login(self) -> str:
+        payload = {"email": "owner@example.com", "password": "StrongPass#2026"}
+        return self.client.post(self.login_url, payload, format="json").data["tokens"]["access"]
+
+    def test_tokens_verify_against_published_jwks(self):
+        access = self.login()
+        jwks = json.loads(self.client.get(self.jwks_url).content)
+
+        header = jwt.get_unverified_header(access)
+        jwk = next(key for key in jwks["keys"] if key["kid"] == header["kid"])
+        claims = jwt.decode(access, jwt.PyJWK(jwk).key, algorithms=["EdDSA"])
+
+        self.assertEqual(header, {"alg": "EdDSA", "kid": "2026-a", "typ": "JWT"})
+        self.assertEqual(sorted(key["kid"] for key in jwks["keys"]), ["2026-a", "2026-b"])
+        self.assertEqual(claims["token_type"], "access")
+
+    def test_tokens_of_previous_kid_stay_valid_after_rotation(self):
+        old_access = self.login()
+        self.use_keys(active_kid="2026-b")
+
+        new_access = self.login()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {old_access}")
+        response = self.client.post("/api/auth/logout", {"refresh": "invalid-token"}, format="json")
+
+        self.assertEqual(jwt.get_unverified_header(new_access)["kid"], "2026-b")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_rejects_tokens_with_unknown_kid(self):
+        foreign = jwt.encode({"token_type": "access"}, generate_private_key("EdDSA"), algorithm="EdDSA", headers={"kid": "gone"})
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {foreign}")
+
+        response = self.client.post("/api/auth/logout", {"refresh": "invalid-token"}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_jwks_is_cacheable_and_revalidates_by_etag(self):
+        first = self.client.get(self.jwks_url)
+        revalidated = self.client.get(self.jwks_url, HTTP_IF_NONE_MATCH=first["ETag"])
+
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual(first["Cache-Control"], "public, max-age=300")
+        self.assertEqual(revalidated.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(revalidated.content, b"")
+
+    def test_rs256_keys_sign_and_publish_rsa_jwks(self):
+        call_command("generate_jwt_key", "--algorithm=RS256", "--kid=rsa", f"--directory={self.directory}/rsa", stdout=io.StringIO())
+        keys_settings = override_settings(JWT_ALGORITHM="RS256", JWT_KEYS_DIR=f"{self.directory}/rsa", JWT_ACTIVE_KID="")
+        keys_settings.enable()
+        self.addCleanup(keys_settings.disable)
+
+        access = self.login()
+        jwk = json.loads(self.client.get(self.jwks_url).content)["keys"][0]
+
+        self.assertEqual((jwk["kty"], jwk["kid"]), ("RSA", "rsa"))
+        self.assertEqual(jwt.decode(access, jwt.PyJWK(jwk).key, algorithms=["RS256"])["token_type"], "access")
+
+    def test_hmac_mode_publishes_no_keys(self):
+        self.use_keys(algorithm="HS256")
+
+        self.assertEqual(json.loads(self.client.get(self.jwks_url).content), {"keys": []})
+        self.assertNotIn("kid", jwt.get_unverified_header(self.login()))
+
+
+@unittest.skipUnless(settings.DJANGO_ADMIN_ENABLED, "the admin is disabled (DJANGO_ADMIN_ENABLED=0)")
+class UserAdminChangeListTestCase(TestCase):
+    changelist_url = "/admin/accounts/user/"
+
+    def setUp(self):
+        # Imported here: with the admin disabled, accounts.admin cannot be imported at all.
+        from accounts.admin import UserAdmin
+
+        patcher = mock.patch.object(UserAdmin, "list_per_page", 2)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        admin_user = User.objects.create_superuser(email="admin@example.com", password="StrongPass#2026")
+        self.client.force_login(admin_user)
+        started = timezone.now() - timedelta(days=1)
+        emails = ["alice@example.com", "bob@example.com", "carol@example.com", "xalice@example.com"]
+        User.objects.bulk_create([User(email=email, password="!") for email in emails])
+        for index, email in enumerate(emails):
+            User.objects.filter(email=email).update(created_at=started + timedelta(minutes=index))
+        # Same created_at as carol: the id breaks the tie.
+        User.objects.filter(email="xalice@example.com").update(created_at=started + timedelta(minutes=2))
+
+    def walk_pages(self, url):
+        pages = []
+        while url:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertFalse(any("OFFSET" in query["sql"] for query in queries.captured_queries))
+            changelist = response.context["cl"]
+            pages.append([user.email for user in changelist.result_list])
+            url = changelist.next_page_url and self.changelist_url + changelist.next_page_url
+        return pages
+
+    def test_keyset_pages_follow_created_at_and_id_without_offset(self):
+        expected = list(User.objects.order_by("-created_at", "-id").values_list("email", flat=True))
+
+        pages = self.walk_pages(self.changelist_url)
+
+        self.assertEqual([len(page) for page in pages], [2, 2, 1])
+        self.assertEqual(sum(pages, []), expected)
+
+    def test_search_matches_email_prefix_case_insensitively(self):
+        pages = self.walk_pages(f"{self.changelist_url}?q=%20ALIce")
+
+        self.assertEqual(pages, [["alice@example.com"]])
+
+    def test_large_unfiltered_table_shows_estimated_count(self):
+        with mock.patch("accounts.pagination.estimated_row_count", return_value=5_000_000):
+            response = self.client.get(self.changelist_url)
+
+        self.assertEqual(response.context["cl"].result_count, 5_000_000)
+        self.assertContains(response, "~5000000 users")
+
+    @override_settings(ADMIN_COUNT_LIMIT=2)
+    def test_filtered_count_stops_at_limit(self):
+        response = self.client.get(f"{self.changelist_url}?is_staff__exact=0")
+
+        self.assertContains(response, "2+ users")
+
+    def test_malformed_cursor_is_rejected(self):
+        response = self.client.get(f"{self.changelist_url}?after=not-a-cursor")
+
+        self.assertRedirects(response, f"{self.changelist_url}?e=1", fetch_redirect_response=False)
+
+
+class UserDirectoryAPITestCase(APITestCase):
+    users_url = "/api/users"
+
+    def setUp(self):
+        self.staff = User.objects.create_user(email="staff@example.com", password="StrongPass#2026", is_staff=True)
+        emails = ["alice@example.com", "albert@example.com", "bob@example.com", "carol@example.com"]
+        User.objects.bulk_create([User(email=email, password="!", is_active=email != "bob@example.com") for email in emails])
+        started = timezone.now() - timedelta(days=1)
+        for index, email in enumerate(emails):
+            # albert and alice share a created_at; the id breaks the tie.
+            User.objects.filter(email=email).update(created_at=started + timedelta(minutes=max(index, 1)))
+        self.client.force_authenticate(self.staff)
+
+    def walk(self, url):
+        pages = []
+        while url:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertFalse(any('"password"' in query["sql"] for query in queries.captured_queries))
+            pages.append([row["email"] for row in response.data["results"]])
+            url = response.data["next"]
+        return pages
+
+    def test_pages_follow_created_at_and_id_without_password_hashes(self):
+        expected = list(User.objects.order_by("-created_at", "-id").values_list("email", flat=True))
+
+        pages = self.walk(f"{self.users_url}?page_size=2")
+        first = self.client.get(f"{self.users_url}?page_size=2").data["results"][0]
+
+        self.assertEqual([len(page) for page in pages], [2, 2, 1])
+        self.assertEqual(sum(pages, []), expected)
+        self.assertNotIn("password", first)
+        self.assertEqual(set(first), {"id", "email", "is_active", "is_staff", "date_joined", "last_login", "created_at"})
+
+    def test_filters_by_flags_and_email_prefix(self):
+        self.assertEqual(self.walk(f"{self.users_url}?is_staff=true"), [["staff@example.com"]])
+        self.assertEqual(self.walk(f"{self.users_url}?is_active=false"), [["bob@example.com"]])
+        self.assertEqual(
+            sorted(sum(self.walk(f"{self.users_url}?email=AL&page_size=1"), [])),
+            ["albert@example.com", "alice@example.com"],
+        )
+
+    def test_rejects_malformed_cursor_and_filters(self):
+        self.assertEqual(self.client.get(f"{self.users_url}?cursor=nope").status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.client.get(f"{self.users_url}?is_staff=maybe").status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_requires_staff(self):
+        self.client.force_authenticate(User.objects.get(email="alice@example.com"))
+        self.assertEqual(self.client.get(self.users_url).status_code, status.HTTP_403_FORBIDDEN)
+
+        # A fresh client: force_authenticate(None) logs out through the session app, absent without the admin.
+        anonymous = self.client_class()
+        self.assertEqual(anonymous.get(self.users_url).status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class ImportUsersCommandTestCase(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+
+    def import_users(self, source: Path, *args):
+        call_command("import_users", str(source), "--workers=0", *args, stdout=io.StringIO())
+        with open(f"{source}.rejects.csv", newline="") as handle:
+            return {row["row"]: row["reason"] for row in csv.DictReader(handle)}
+
+    def test_imports_csv_and_reports_rejected_rows(self):
+        User.objects.create_user(email="taken@example.com", password="StrongPass#2026")
+        source = self.directory / "users.csv"
+        source.write_text(
+            "email,password\n"
+            "First@Example.com,StrongPass#2026\n"
+            "first@example.com,StrongPass#2026\n"
+            "taken@example.com,StrongPass#2026\n"
+            "not-an-email,StrongPass#2026\n"
+            "weak@example.com,12345678\n"
+            "second@example.com,AnotherPass#2026\n"
+        )
+
+        rejects = self.import_users(source, "--batch-size=4")
+
+        self.assertEqual(set(rejects), {"2", "3", "4", "5"})
+        self.assertEqual(rejects["2"], "duplicate email in file")
+        self.assertEqual(rejects["3"], "email already exists")
+        imported = User.objects.get(email="first@example.com")
+        self.assertTrue(imported.check_password("StrongPass#2026"))
+        self.assertTrue(User.objects.filter(email="second@example.com").exists())
+        checkpoint = json.loads(Path(f"{source}.checkpoint").read_text())
+        self.assertEqual((checkpoint["rows"], checkpoint["imported"], checkpoint["rejected"]), (6, 2, 4))
+        self.assertTrue(checkpoint["completed"])
+
+    def test_resumes_after_checkpoint_with_prehashed_jsonl(self):
+        encoded = PBKDF2PasswordHasher().encode("StrongPass#2026", "fixedsalt")
+        source = self.directory / "users.jsonl"
+        source.write_text(
+            "\n".join(json.dumps({"email": f"user{index}@example.com", "password": encoded}) for index in range(1, 5))
+            + "\n{not json}\n"
+        )
+        Path(f"{source}.checkpoint").write_text(
+            json.dumps({"source": str(source.resolve()), "rows": 2, "imported": 2, "rejected": 0})
+        )
+        Path(f"{source}.rejects.csv").write_text("row,email,reason\n")
+
+        rejects = self.import_users(source, "--prehashed", "--batch-size=2")
+
+        self.assertEqual(rejects, {"5": "malformed JSON line"})
+        self.assertEqual(
+            sorted(User.objects.values_list("email", flat=True)), ["user3@example.com", "user4@example.com"]
+        )
+        self.assertTrue(User.objects.get(email="user3@example.com").check_password("StrongPass#2026"))
+
+    def test_rejects_malformed_jsonl_rows_and_keeps_going(self):
+        source = self.directory / "users.jsonl"
+        source.write_text(
+            "[1, 2]\n"
+            "42\n"
+            '{"email": 7, "password": "StrongPass#2026"}\n'
+            '{"email": "numeric@example.com", "password": 12345678}\n'
+            # Valid for validate_email() (up to 320 characters), longer than the 254-character column.
+            + json.dumps({"email": "x" * 64 + "@" + ".".join(["d" * 60] * 4) + ".com", "password": "StrongPass#2026"})
+            + "\n"
+            + '{"email": "valid@example.com", "password": "StrongPass#2026"}\n'
+        )
+
+        rejects = self.import_users(source)
+
+        self.assertEqual(
+            rejects,
+            {
+                "1": "not a JSON object",
+                "2": "not a JSON object",
+                "3": "invalid email",
+                "4": "invalid password",
+                "5": "email too long",
+            },
+        )
+        self.assertEqual(list(User.objects.values_list("email", flat=True)), ["valid@example.com"])
+
+
+class PurgeExpiredTokensTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="owner@example.com", password="StrongPass#2026")
+
+    def add_token(self, expires_in: timedelta, blacklisted: bool = False) -> OutstandingToken:
+        token = OutstandingToken.objects.create(
+            user=self.user,
+            jti=uuid.uuid4().hex,
+            token="token",
+            expires_at=timezone.now() + expires_in,
+        )
+        if blacklisted:
+            BlacklistedToken.objects.create(token=token)
+        return token
+
+    def test_purges_expired_tokens_in_batches(self):
+        for index in range(5):
+            self.add_token(timedelta(days=-1), blacklisted=index % 2 == 0)
+        live = self.add_token(timedelta(days=1), blacklisted=True)
+        now = timezone.now()
+        SessionFamily.objects.create(user=self.user, expires_at=now - timedelta(days=1))
+        SessionFamily.objects.create(user=self.user, expires_at=now + timedelta(days=1), revoked_at=now)
+        live_family = SessionFamily.objects.create(user=self.user, expires_at=now + timedelta(days=1))
+
+        report = purge_expired_tokens(batch_size=2, time_budget=30)
+
+        self.assertEqual((report["families"], report["blacklisted"], report["outstanding"]), (2, 3, 5))
+        self.assertEqual(list(SessionFamily.objects.values_list("pk", flat=True)), [live_family.pk])
+        self.assertTrue(report["complete"])
+        self.assertEqual(list(OutstandingToken.objects.values_list("pk", flat=True)), [live.pk])
+        self.assertTrue(BlacklistedToken.objects.filter(token=live).exists())
+        self.assertEqual(report["tables"][OutstandingToken._meta.db_table]["rows"], 1)
+
+    def test_stops_when_time_budget_is_spent(self):
+        self.add_token(timedelta(days=-1), blacklisted=True)
+
+        output = io.StringIO()
+        call_command("purge_expired_tokens", "--time-budget=0", stdout=output)
+
+        self.assertIn("Time budget reached", output.getvalue())
+        self.assertEqual(OutstandingToken.objects.count(), 1)
@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from datetime import datetime
+
+import jwt
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.backends import TokenBackend
+from rest_framework_simplejwt.exceptions import TokenBackendError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import AccessToken as BaseAccessToken
+from rest_framework_simplejwt.tokens import RefreshToken as BaseRefreshToken
+from rest_framework_simplejwt.tokens import Token, TokenError
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+from accounts.keys import key_ring
+from accounts.models import SessionFamily
+from accounts.revocation import revocation_index
+from api.metrics import observe_phase
+
+
+class InstrumentedTokenBackend(TokenBackend):
+    # Reports signing and verification time to the request metrics. With an
+    # asymmetric JWT_ALGORITHM, tokens are signed by key_ring's active key and
+    # carry its kid, and verification picks the public key by that kid, so
+    # tokens signed before a rotation stay valid while their key is published.
+
+    @property
+    def algorithm(self) -> str:
+        return key_ring.algorithm
+
+    @algorithm.setter
+    def algorithm(self, value: str) -> None:
+        # TokenBackend.__init__ assigns SIMPLE_JWT["ALGORITHM"]; JWT_ALGORITHM is read instead.
+        pass
+
+    def encode(self, payload):
+        started = time.perf_counter()
+        try:
+            if not key_ring.asymmetric:
+                return super().encode(payload)
+            kid, key = key_ring.signing_key()
+            claims = payload.copy()
+            if self.audience is not None:
+                claims["aud"] = self.audience
+            if self.issuer is not None:
+                claims["iss"] = self.issuer
+            return jwt.encode(claims, key, algorithm=self.algorithm, headers={"kid": kid}, json_encoder=self.json_encoder)
+        finally:
+            observe_phase("jwt_sign", time.perf_counter() - started)
+
+    def get_verifying_key(self, token):
+        if not key_ring.asymmetric:
+            return super().get_verifying_key(token)
+        try:
+            kid = jwt.get_unverified_header(token).get("kid")
+        except jwt.InvalidTokenError as exc:
+            raise TokenBackendError(_("Token is invalid")) from exc
+        key = key_ring.verifying_key(kid)
+        if key is None:
+            raise TokenBackendError(_("Token is invalid"))
+        return key
+
+    def decode(self, token, verify=True):
+        started = time.perf_counter()
+        try:
+            return super().decode(token, verify)
+        finally:
+            observe_phase("jwt_verify", time.perf_counter() - started)
+
+
+FAMILY_CLAIM = "fam"
+GENERATION_CLAIM = "gen"
+
+token_backend = InstrumentedTokenBackend(
+    api_settings.ALGORITHM,
+    api_settings.SIGNING_KEY,
+    api_settings.VERIFYING_KEY,
+    api_settings.AUDIENCE,
+    api_settings.ISSUER,
+    api_settings.JWK_URL,
+    api_settings.LEEWAY,
+    api_settings.JSON_ENCODER,
+)
+
+
+async def asign(token: Token) -> str:
+    # HMAC signing costs microseconds, less than a thread hop; asymmetric
+    # signatures are moved off the event loop.
+    if token.token_backend.algorithm.startswith("HS"):
+        return str(token)
+    return await asyncio.to_thread(str, token)
+
+
+class AccessToken(BaseAccessToken):
+    _token_backend = token_backend
+
+
+class RefreshToken(BaseRefreshToken):
+    # Issued tokens name their SessionFamily row and its generation, and that
+    # row is all the server keeps: rotate() advances it, revoke() ends it.
+    # Tokens issued before session families carry neither claim; they still go
+    # through the blacklist tables and are moved into a family on refresh.
+    _token_backend = token_backend
+    access_token_class = AccessToken
+    no_copy_claims = (*BaseRefreshToken.no_copy_claims, FAMILY_CLAIM, GENERATION_CLAIM)
+
+    def __init__(self, token=None, verify: bool = True, check_blacklist: bool = True) -> None:
+        # Async callers decode synchronously and then run acheck_blacklist().
+        self.defer_blacklist_check = not check_blacklist
+        super().__init__(token, verify)
+
+    @property
+    def family_id(self) -> str | None:
+        return self.payload.get(FAMILY_CLAIM)
+
+    def check_blacklist(self) -> None:
+        # A family token's state is checked by the rotating UPDATE itself.
+        if self.defer_blacklist_check or self.family_id is not None:
+            return
+        if revocation_index.is_revoked(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError(_("Token is blacklisted"))
+
+    async def acheck_blacklist(self) -> None:
+        if self.family_id is not None:
+            return
+        if await revocation_index.ais_revoked(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError(_("Token is blacklisted"))
+
+    def blacklist(self):
+        result = super().blacklist()
+        revocation_index.add(self.payload[api_settings.JTI_CLAIM])
+        return result
+
+    def _outstanding_defaults(self, encoded: str) -> dict:
+        return {
+            "user_id": self.payload.get(api_settings.USER_ID_CLAIM),
+            "created_at": self.current_time,
+            "token": encoded,
+            "expires_at": datetime_from_epoch(self.payload["exp"]),
+        }
+
+    async def ablacklist(self, encoded: str) -> None:
+        # `encoded` is the token as received, which saves re-signing it for the
+        # outstanding row and a user lookup for its foreign key.
+        jti = self.payload[api_settings.JTI_CLAIM]
+        outstanding, _created = await OutstandingToken.objects.aget_or_create(
+            jti=jti,
+            defaults=self._outstanding_defaults(encoded),
+        )
+        await BlacklistedToken.objects.aget_or_create(token=outstanding)
+        revocation_index.add(jti)
+
+    def _new_family(self, user) -> SessionFamily:
+        family = SessionFamily(user=user, expires_at=datetime_from_epoch(self.payload["exp"]))
+        self.payload[FAMILY_CLAIM] = str(family.pk)
+        self.payload[GENERATION_CLAIM] = family.generation
+        return family
+
+    @classmethod
+    def for_user(cls, user) -> RefreshToken:
+        # Token.for_user builds the claims without BlacklistMixin's OutstandingToken insert.
+        token = Token.for_user.__func__(cls, user)
+        token._new_family(user).save(force_insert=True)
+        return token
+
+    @classmethod
+    async def afor_user(cls, user) -> tuple[RefreshToken, str]:
+        token = Token.for_user.__func__(cls, user)
+        await token._new_family(user).asave(force_insert=True)
+        return token, await asign(token)
+
+    def _next_generation(self) -> tuple[int, datetime]:
+        generation = self.payload[GENERATION_CLAIM]
+        self.set_jti()
+        self.set_exp()
+        self.set_iat()
+        self.payload[GENERATION_CLAIM] = generation + 1
+        return generation, datetime_from_epoch(self.payload["exp"])
+
+    # Turns this token into the family's next one. The UPDATE matches nothing
+    # when the family is revoked, expired or its user inactive, or when a newer
+    # generation exists: then this token is a replay, so the family is revoked.
+    def rotate(self) -> None:
+        generation, expires_at = self._next_generation()
+        if not SessionFamily.objects.rotate(self.family_id, generation, expires_at):
+            SessionFamily.objects.revoke(self.family_id, generation__gt=generation)
+            raise TokenError(_("Token is blacklisted"))
+
+    async def arotate(self) -> None:
+        generation, expires_at = self._next_generation()
+        if not await SessionFamily.objects.arotate(self.family_id, generation, expires_at):
+            await SessionFamily.objects.arevoke(self.family_id, generation__gt=generation)
+            raise TokenError(_("Token is blacklisted"))
+
+    def revoke(self) -> None:
+        if self.family_id is None:
+            self.blacklist()
+        else:
+            SessionFamily.objects.revoke(self.family_id)
+
+    async def arevoke(self, encoded: str) -> None:
+        if self.family_id is None:
+            await self.ablacklist(encoded)
+        else:
+            await SessionFamily.objects.arevoke(self.family_id)
@@ -1,12 +1,25 @@
+from django.conf import settings
 from django.urls import path
 
-from accounts.views import LoginAPIView, LogoutAPIView, RefreshAPIView, RegisterAPIView
+from accounts.async_views import AsyncLoginAPIView, AsyncLogoutAPIView, AsyncRefreshAPIView, AsyncRegisterAPIView
+from accounts.views import JWKSAPIView, LoginAPIView, LogoutAPIView, RefreshAPIView, RegisterAPIView
 
 app_name = "accounts"
 
+if settings.API_VIEW_MODE == "async":
+    RegisterView, LoginView, RefreshView, LogoutView = (
+        AsyncRegisterAPIView,
+        AsyncLoginAPIView,
+        AsyncRefreshAPIView,
+        AsyncLogoutAPIView,
+    )
+else:
+    RegisterView, LoginView, RefreshView, LogoutView = RegisterAPIView, LoginAPIView, RefreshAPIView, LogoutAPIView
+
 urlpatterns = [
-    path("register", RegisterAPIView.as_view(), name="register"),
-    path("login", LoginAPIView.as_view(), name="login"),
-    path("refresh", RefreshAPIView.as_view(), name="refresh"),
-    path("logout", LogoutAPIView.as_view(), name="logout"),
+    path("register", RegisterView.as_view(), name="register"),
+    path("login", LoginView.as_view(), name="login"),
+    path("refresh", RefreshView.as_view(), name="refresh"),
+    path("logout", LogoutView.as_view(), name="logout"),
+    path(".well-known/jwks.json", JWKSAPIView.as_view(), name="jwks"),
 ]
@@ -1,10 +1,22 @@
 from __future__ import annotations
 
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.http import parse_etags
 from rest_framework import permissions, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from accounts.serializers import LoginSerializer, LogoutSerializer, RefreshTokenSerializer, RegisterSerializer
+from accounts.keys import key_ring
+from accounts.models import User
+from accounts.pagination import KeysetPagination
+from accounts.serializers import (
+    LoginSerializer,
+    LogoutSerializer,
+    RefreshTokenSerializer,
+    RegisterSerializer,
+    UserDirectoryFilterSerializer,
+)
 from accounts.services import build_auth_response
 
 
@@ -50,3 +62,39 @@ class LogoutAPIView(APIView):
         serializer.is_valid(raise_exception=True)
         serializer.save()
         return Response({"detail": "Logout successful."}, status=status.HTTP_200_OK)
+
+
+class JWKSAPIView(APIView):
+    # Public keys for verifying our access tokens without calling back into
+    # this service. The body only changes with the key set, so clients and
+    # proxies may cache it for JWKS_MAX_AGE seconds and revalidate by ETag.
+    authentication_classes = ()
+    permission_classes = [permissions.AllowAny]
+    throttle_classes = ()
+
+    def get(self, request, *args, **kwargs):
+        body, etag = key_ring.jwks()
+        if etag in parse_etags(request.headers.get("If-None-Match", "")) or request.headers.get("If-None-Match") == "*":
+            response = HttpResponse(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = HttpResponse(body, content_type="application/json")
+        response["ETag"] = etag
+        response["Cache-Control"] = f"public, max-age={getattr(settings, 'JWKS_MAX_AGE', 300)}"
+        return response
+
+
+class UserDirectoryAPIView(APIView):
+    # Staff-only account listing. Rows are projected with .values(), so
+    # password hashes are never loaded, and pages are keyset-paginated.
+    permission_classes = [permissions.IsAdminUser]
+    pagination_class = KeysetPagination
+    fields = ("id", "email", "is_active", "is_staff", "date_joined", "last_login", "created_at")
+
+    def get(self, request, *args, **kwargs):
+        filters = UserDirectoryFilterSerializer(data=request.query_params)
+        filters.is_valid(raise_exception=True)
+        queryset = filters.filter(User.objects.values(*self.fields))
+
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        return paginator.get_paginated_response(page)
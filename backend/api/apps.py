@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
+
+    def ready(self):
+        # Registers the connection_created hook before any connection is opened.
+        from api import checks, metrics  # noqa: F401
+
+        checks.register()
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from django.utils import timezone
+from django.utils.decorators import classonlymethod
+from rest_framework import exceptions, permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from api.health import health_prober
+
+
+class AsyncAPIView(APIView):
+    # APIView with an async dispatch for `async def` handlers. Authentication
+    # uses an authenticator's `aauthenticate()` when it has one, so a cached
+    # principal is resolved without leaving the event loop; permissions and
+    # throttles run inline since they only touch in-process state.
+
+    @classonlymethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+        assert cls.view_is_async, f"{cls.__name__} must define async handlers."
+        return view
+
+    async def perform_authentication_async(self, request):
+        for authenticator in request.authenticators:
+            try:
+                if hasattr(authenticator, "aauthenticate"):
+                    user_auth_tuple = await authenticator.aauthenticate(request)
+                else:
+                    user_auth_tuple = await sync_to_async(authenticator.authenticate)(request)
+            except exceptions.APIException:
+                request._not_authenticated()
+                raise
+
+            if user_auth_tuple is not None:
+                request._authenticator = authenticator
+                request.user, request.auth = user_auth_tuple
+                return
+
+        request._not_authenticated()
+
+    async def initial_async(self, request, *args, **kwargs):
+        self.format_kwarg = self.get_format_suffix(**kwargs)
+
+        neg = self.perform_content_negotiation(request)
+        request.accepted_renderer, request.accepted_media_type = neg
+
+        version, scheme = self.determine_version(request, *args, **kwargs)
+        request.version, request.versioning_scheme = version, scheme
+
+        await self.perform_authentication_async(request)
+        self.check_permissions(request)
+        self.check_throttles(request)
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await self.initial_async(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+
+            response = handler(request, *args, **kwargs)
+            if hasattr(response, "__await__"):
+                response = await response
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.detach_rendered(self.response)
+
+    @staticmethod
+    def detach_rendered(response):
+        # Django's async handler renders template responses through a
+        # thread-sensitive sync_to_async hop; rendering JSON here and returning
+        # a plain HttpResponse keeps the whole request on the event loop.
+        if not isinstance(response, Response):
+            return response
+        response.render()
+        plain = HttpResponse(response.rendered_content, status=response.status_code)
+        for header, value in response.items():
+            plain[header] = value
+        plain.cookies = response.cookies
+        plain.data = response.data
+        return plain
+
+
+class AsyncHealthCheckAPIView(AsyncAPIView):
+    permission_classes = [permissions.AllowAny]
+
+    async def get(self, request, *args, **kwargs):
+        payload = {
+            "status": "ok",
+            "service": "backend",
+            "timestamp": timezone.now().isoformat(),
+        }
+        return Response(payload, status=status.HTTP_200_OK)
+
+
+class AsyncLivenessAPIView(AsyncAPIView):
+    authentication_classes = ()
+    permission_classes = [permissions.AllowAny]
+    throttle_classes = ()
+
+    async def get(self, request, *args, **kwargs):
+        payload = {
+            "status": "ok",
+            "service": "backend",
+            "timestamp": timezone.now().isoformat(),
+        }
+        return Response(payload, status=status.HTTP_200_OK)
+
+
+class AsyncReadinessAPIView(AsyncAPIView):
+    authentication_classes = ()
+    permission_classes = [permissions.AllowAny]
+    throttle_classes = ()
+
+    async def get(self, request, *args, **kwargs):
+        ready, payload = health_prober.readiness()
+        return Response(payload, status=status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE)
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+from django.apps import apps
+from django.conf import settings
+from django.core import checks
+from django.core.checks.security import base as security_base, csrf as security_csrf
+from django.urls import NoReverseMatch, reverse
+from django.utils.module_loading import import_string
+
+PATH_SCOPED_MIDDLEWARE = "api.middleware.PathScopedMiddleware"
+# Django checks these against MIDDLEWARE, which PathScopedMiddleware ends before
+# the middleware they look for; they are run against each scoped chain instead.
+SCOPED_CHECK_IDS = {"admin.E408", "admin.E409", "admin.E410", "security.W002", "security.W003"}
+
+ADMIN_MIDDLEWARE = [
+    (
+        "django.contrib.auth.middleware.AuthenticationMiddleware",
+        lambda: checks.Error(
+            "'django.contrib.auth.middleware.AuthenticationMiddleware' must "
+            "be in MIDDLEWARE in order to use the admin application.",
+            id="admin.E408",
+        ),
+    ),
+    (
+        "django.contrib.messages.middleware.MessageMiddleware",
+        lambda: checks.Error(
+            "'django.contrib.messages.middleware.MessageMiddleware' must "
+            "be in MIDDLEWARE in order to use the admin application.",
+            id="admin.E409",
+        ),
+    ),
+    (
+        "django.contrib.sessions.middleware.SessionMiddleware",
+        lambda: checks.Error(
+            "'django.contrib.sessions.middleware.SessionMiddleware' must "
+            "be in MIDDLEWARE in order to use the admin application.",
+            hint=(
+                "Insert 'django.contrib.sessions.middleware.SessionMiddleware' "
+                "before 'django.contrib.auth.middleware.AuthenticationMiddleware'."
+            ),
+            id="admin.E410",
+        ),
+    ),
+]
+
+
+def scoped_chains() -> list[tuple[str, list[str]]]:
+    # MIDDLEWARE as each request sees it: PathScopedMiddleware replaced by the
+    # SCOPED_MIDDLEWARE chain it continues with.
+    middleware = list(settings.MIDDLEWARE)
+    if PATH_SCOPED_MIDDLEWARE not in middleware:
+        return []
+    index = middleware.index(PATH_SCOPED_MIDDLEWARE)
+    return [
+        (prefix, middleware[:index] + list(paths) + middleware[index + 1 :])
+        for prefix, paths in getattr(settings, "SCOPED_MIDDLEWARE", [])
+    ]
+
+
+def _contains_subclass(class_path: str, paths: list[str]) -> bool:
+    cls = import_string(class_path)
+    for path in paths:
+        try:
+            candidate = import_string(path)
+        except ImportError:
+            continue  # reported by the middleware loader
+        if isinstance(candidate, type) and issubclass(candidate, cls):
+            return True
+    return False
+
+
+def _scoped(message: checks.CheckMessage, prefix: str) -> checks.CheckMessage:
+    return type(message)(message.msg, hint=message.hint, obj=f"SCOPED_MIDDLEWARE[{prefix!r}]", id=message.id)
+
+
+def check_scoped_security_middleware(app_configs=None, **kwargs) -> list[checks.CheckMessage]:
+    # Every chain serves pages, so every chain sets X-Frame-Options. CSRF
+    # protection is needed where a session cookie authenticates; the JWT-only
+    # /api/ chain carries no session.
+    messages = []
+    for prefix, chain in scoped_chains():
+        if "django.middleware.clickjacking.XFrameOptionsMiddleware" not in chain:
+            messages.append(_scoped(security_base.W002, prefix))
+        uses_sessions = _contains_subclass("django.contrib.sessions.middleware.SessionMiddleware", chain)
+        if uses_sessions and "django.middleware.csrf.CsrfViewMiddleware" not in chain:
+            messages.append(_scoped(security_csrf.W003, prefix))
+    return messages
+
+
+def check_scoped_admin_middleware(app_configs=None, **kwargs) -> list[checks.CheckMessage]:
+    # The admin's middleware must be in the chain that serves the admin's URLs.
+    if not apps.is_installed("django.contrib.admin"):
+        return []
+    try:
+        admin_path = reverse("admin:index")
+    except NoReverseMatch:
+        return []
+    for prefix, chain in scoped_chains():
+        if admin_path.startswith(prefix):
+            return [_scoped(error(), prefix) for path, error in ADMIN_MIDDLEWARE if not _contains_subclass(path, chain)]
+    return []
+
+
+def _without_scoped_ids(check):
+    def check_unscoped(app_configs=None, **kwargs):
+        return [message for message in check(app_configs=app_configs, **kwargs) if message.id not in SCOPED_CHECK_IDS]
+
+    return check_unscoped
+
+
+def register() -> None:
+    # Without PathScopedMiddleware, Django's own checks see the whole chain.
+    if PATH_SCOPED_MIDDLEWARE not in settings.MIDDLEWARE:
+        return
+    registry = checks.registry.registry
+    registry.deployment_checks.discard(security_base.check_xframe_options_middleware)
+    registry.deployment_checks.discard(security_csrf.check_csrf_middleware)
+    registry.register(check_scoped_security_middleware, checks.Tags.security, deploy=True)
+    if apps.is_installed("django.contrib.admin"):
+        from django.contrib.admin.checks import check_dependencies
+
+        registry.registered_checks.discard(check_dependencies)
+        registry.register(_without_scoped_ids(check_dependencies), checks.Tags.admin)
+        registry.register(check_scoped_admin_middleware, checks.Tags.admin)
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+
+def probe_databases() -> dict:
+    # Runs on the prober thread with its own connections, so a dead request
+    # connection is caught the same way a new request would see it.
+    details = {}
+    for alias in connections:
+        connection = connections[alias]
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+        details[alias] = {"vendor": connection.vendor, "pool": pool_stats(alias)}
+        connection.close_if_unusable_or_obsolete()
+    return details
+
+
+def pool_stats(alias: str) -> dict | None:
+    pool = getattr(connections[alias], "pool", None)
+    if pool is None:
+        return {"conn_max_age": connections[alias].settings_dict.get("CONN_MAX_AGE", 0)}
+    return dict(pool.get_stats())
+
+
+def open_pools() -> dict:
+    # alias -> psycopg pool stats for every database using OPTIONS["pool"].
+    # Pools are shared by all threads of a process, so this is process-wide.
+    pools = {}
+    for alias in connections:
+        pool = getattr(connections[alias], "pool", None)
+        if pool is not None:
+            pools[alias] = dict(pool.get_stats())
+    return pools
+
+
+class HealthProber:
+    # Runs the readiness probes from HEALTH_READINESS_PROBES on a background
+    # thread every HEALTH_PROBE_INTERVAL seconds and keeps the last result.
+    # Readiness requests only read that result, so no amount of probe traffic
+    # reaches the database. A result older than three intervals (e.g. a probe
+    # hung on a dead socket) counts as not ready.
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._thread_pid: int | None = None
+        self._wake = threading.Event()
+        self.snapshot: dict | None = None
+
+    @property
+    def interval(self) -> float:
+        return getattr(settings, "HEALTH_PROBE_INTERVAL", 5.0)
+
+    def ensure_started(self) -> None:
+        if self._thread_pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread_pid == os.getpid() and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name="health-prober", daemon=True)
+            self._thread_pid = os.getpid()
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            try:
+                self.probe_now()
+            except Exception:
+                logger.exception("Health probe round failed")
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+    def probe_now(self) -> dict:
+        results = {}
+        for path in getattr(settings, "HEALTH_READINESS_PROBES", ["api.health.probe_databases"]):
+            name = path.rsplit(".", 1)[-1].removeprefix("probe_")
+            started = time.perf_counter()
+            try:
+                details = import_string(path)()
+                result = {"ok": True, "details": details}
+            except Exception as exc:
+                result = {"ok": False, "error": f"{type(exc).__name__}: {exc}"}
+            result["latency_ms"] = round((time.perf_counter() - started) * 1000, 2)
+            results[name] = result
+
+        snapshot = {
+            "ready": all(result["ok"] for result in results.values()),
+            "checked_at": timezone.now().isoformat(),
+            "monotonic": time.monotonic(),
+            "probes": results,
+        }
+        self.snapshot = snapshot
+        return snapshot
+
+    def readiness(self) -> tuple[bool, dict]:
+        self.ensure_started()
+        snapshot = self.snapshot
+        if snapshot is None:
+            return False, {"status": "starting", "probes": {}}
+
+        age = time.monotonic() - snapshot["monotonic"]
+        stale = age > self.interval * 3
+        ready = snapshot["ready"] and not stale
+        payload = {
+            "status": "ready" if ready else "unavailable",
+            "checked_at": snapshot["checked_at"],
+            "age_seconds": round(age, 3),
+            "stale": stale,
+            "probes": snapshot["probes"],
+        }
+        return ready, payload
+
+
+health_prober = HealthProber()
@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+import time
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+from api.startup import unapplied_migrations
+
+
+class Command(BaseCommand):
+    help = (
+        "Run migrate only when a migration file on disk is not recorded as applied; "
+        "otherwise exit without loading the migration graph."
+    )
+    # The checks are part of `migrate`, which runs them when it is actually needed.
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        pending, digest = unapplied_migrations(options["database"])
+        if not pending:
+            elapsed = (time.perf_counter() - started) * 1000
+            self.stdout.write(f"Migrations up to date (fingerprint {digest}); skipped migrate in {elapsed:.0f} ms.")
+            return
+
+        names = ", ".join(f"{app}.{name}" for app, name in sorted(pending)[:5])
+        more = f" and {len(pending) - 5} more" if len(pending) > 5 else ""
+        self.stdout.write(f"{len(pending)} unapplied migrations ({names}{more}); running migrate.")
+        call_command("migrate", database=options["database"], interactive=False, verbosity=options["verbosity"])
@@ -0,0 +1,405 @@
+from __future__ import annotations
+
+import atexit
+import contextvars
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db.backends.signals import connection_created
+
+from api.health import open_pools
+from api.utils import shared_memory_path
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX hosts fall back to per-process locking
+    fcntl = None
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+UNMATCHED_VIEW = "unmatched"
+# Counters of exited workers, folded into one file so the directory holds one file per live worker.
+EXITED_SNAPSHOT = "exited.json"
+# psycopg pool stat -> (metric, type, help). Counters psycopg has not bumped yet are absent and read as 0.
+POOL_METRICS = {
+    "pool_max": ("goplan_db_pool_max_size", "gauge", "Configured maximum connections per worker pool."),
+    "pool_size": ("goplan_db_pool_size", "gauge", "Connections currently open in the pool."),
+    "pool_available": ("goplan_db_pool_available", "gauge", "Idle connections ready to be handed out."),
+    "requests_waiting": ("goplan_db_pool_requests_waiting", "gauge", "Requests currently waiting for a connection."),
+    "requests_num": ("goplan_db_pool_requests_total", "counter", "Connections requested from the pool."),
+    "requests_queued": ("goplan_db_pool_requests_queued_total", "counter", "Requests that had to wait for a connection."),
+    "requests_errors": ("goplan_db_pool_timeouts_total", "counter", "Requests that gave up waiting for a connection."),
+}
+
+_current: contextvars.ContextVar[RequestSample | None] = contextvars.ContextVar("request_metrics", default=None)
+
+
+class RequestSample:
+    __slots__ = ("view", "queries", "query_seconds", "phases")
+
+    def __init__(self):
+        self.view = UNMATCHED_VIEW
+        self.queries = 0
+        self.query_seconds = 0.0
+        self.phases: dict[str, list] = {}
+
+
+def _time_query(execute, sql, params, many, context):
+    sample = _current.get()
+    if sample is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        sample.queries += 1
+        sample.query_seconds += time.perf_counter() - started
+
+
+def _instrument_connection(sender, connection, **kwargs):
+    # Installed once per connection object rather than per request: database
+    # connections are thread-local, and async views run their queries on
+    # sync_to_async threads that still see the request's context variable.
+    if _time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_time_query)
+
+
+connection_created.connect(_instrument_connection)
+
+
+def observe_phase(phase: str, seconds: float) -> None:
+    # Attributes time spent in a named phase (password hashing, JWT signing, ...)
+    # to the request being handled; a no-op outside the metrics middleware.
+    sample = _current.get()
+    if sample is None:
+        return
+    totals = sample.phases.get(phase)
+    if totals is None:
+        sample.phases[phase] = [1, seconds]
+    else:
+        totals[0] += 1
+        totals[1] += seconds
+
+
+def _merge(target: dict, other: dict) -> None:
+    for section, values in other.items():
+        merged = target.setdefault(section, {})
+        for key, value in values.items():
+            if isinstance(value, list):
+                current = merged.setdefault(key, [0] * len(value))
+                merged[key] = [left + right for left, right in zip(current, value)]
+            else:
+                merged[key] = merged.get(key, 0) + value
+
+
+def _read_snapshot(path: str) -> dict | None:
+    try:
+        with open(path) as handle:
+            return json.load(handle)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_snapshot(path: str, data: dict) -> None:
+    temporary = f"{path}.tmp"
+    with open(temporary, "w") as handle:
+        json.dump(data, handle)
+    os.replace(temporary, path)
+
+
+def _alive(pid: str) -> bool:
+    try:
+        os.kill(int(pid), 0)
+    except (ValueError, ProcessLookupError):
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class MetricsRegistry:
+    # Cumulative per-process counters. Each worker writes a snapshot to
+    # METRICS_DIR/<pid>.json at most every METRICS_FLUSH_INTERVAL seconds (and
+    # at exit); /api/metrics sums all snapshots, so the scrape covers every
+    # worker on the host whichever one answers it. The snapshot of an exited
+    # worker is folded into EXITED_SNAPSHOT and deleted (by gunicorn's
+    # child_exit, the next scrape, or a new worker that got the same pid), so
+    # counters never go backwards and the directory does not grow with restarts.
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._fold_lock = threading.Lock()
+        self._flushed_pid: int | None = None
+        self.reset()
+        atexit.register(self.flush)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.requests: dict[str, int] = {}
+            self.durations: dict[str, list] = {}
+            self.queries: dict[str, list] = {}
+            self.phases: dict[str, list] = {}
+            self.events: dict[str, int] = {}
+            self._last_flush = time.monotonic()
+
+    @property
+    def directory(self) -> str:
+        return getattr(settings, "METRICS_DIR", "") or shared_memory_path("goplan-metrics")
+
+    def record(self, sample: RequestSample, method: str, status_code: int, seconds: float) -> None:
+        view = sample.view
+        bucket = next((index for index, bound in enumerate(DURATION_BUCKETS) if seconds <= bound), len(DURATION_BUCKETS))
+        with self._lock:
+            key = f"{view}|{method}|{status_code}"
+            self.requests[key] = self.requests.get(key, 0) + 1
+
+            histogram = self.durations.get(view)
+            if histogram is None:
+                histogram = self.durations[view] = [0] * (len(DURATION_BUCKETS) + 1) + [0.0]
+            histogram[bucket] += 1
+            histogram[-1] += seconds
+
+            queries = self.queries.setdefault(view, [0, 0.0])
+            queries[0] += sample.queries
+            queries[1] += sample.query_seconds
+
+            for phase, (count, phase_seconds) in sample.phases.items():
+                totals = self.phases.setdefault(f"{view}|{phase}", [0, 0.0])
+                totals[0] += count
+                totals[1] += phase_seconds
+
+            due = time.monotonic() - self._last_flush >= getattr(settings, "METRICS_FLUSH_INTERVAL", 1.0)
+        if due:
+            self.flush()
+
+    def count_event(self, event: str, amount: int = 1) -> None:
+        # Counters that are not per view, such as logins refused before hashing;
+        # written out with the next flush.
+        with self._lock:
+            self.events[event] = self.events.get(event, 0) + amount
+
+    def snapshot(self) -> dict:
+        pools = {
+            f"{alias}|{stat}": value
+            for alias, stats in open_pools().items()
+            for stat, value in stats.items()
+            if stat in POOL_METRICS or stat == "requests_wait_ms"
+        }
+        with self._lock:
+            return json.loads(
+                json.dumps(
+                    {
+                        "requests": self.requests,
+                        "durations": self.durations,
+                        "queries": self.queries,
+                        "phases": self.phases,
+                        "events": self.events,
+                        "pools": pools,
+                    }
+                )
+            )
+
+    @contextmanager
+    def _directory_locked(self):
+        # Serializes folding and scraping across the host's workers.
+        with self._fold_lock:
+            if fcntl is None:
+                yield
+                return
+            fd = os.open(os.path.join(self.directory, ".lock"), os.O_RDWR | os.O_CREAT, 0o600)
+            try:
+                fcntl.lockf(fd, fcntl.LOCK_EX)
+                yield
+            finally:
+                os.close(fd)
+
+    def _fold(self, pid) -> None:
+        # Caller holds _directory_locked().
+        path = os.path.join(self.directory, f"{pid}.json")
+        snapshot = _read_snapshot(path)
+        if snapshot is not None:
+            # Pool gauges describe connections that only existed while the worker did.
+            snapshot.pop("pools", None)
+            exited = os.path.join(self.directory, EXITED_SNAPSHOT)
+            merged = _read_snapshot(exited) or {}
+            _merge(merged, snapshot)
+            _write_snapshot(exited, merged)
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+    def mark_process_dead(self, pid) -> None:
+        try:
+            with self._directory_locked():
+                self._fold(pid)
+        except OSError:
+            return
+
+    def flush(self) -> None:
+        directory = self.directory
+        pid = os.getpid()
+        try:
+            os.makedirs(directory, exist_ok=True)
+            if self._flushed_pid != pid:
+                # A file under our pid before our first flush was left by an exited worker.
+                self.mark_process_dead(pid)
+                self._flushed_pid = pid
+            _write_snapshot(os.path.join(directory, f"{pid}.json"), self.snapshot())
+        except OSError:
+            return
+        self._last_flush = time.monotonic()
+
+    def collect(self) -> dict:
+        # This worker's live counters plus the latest snapshot of every other
+        # live worker and the folded counters of exited ones.
+        merged = self.snapshot()
+        own = f"{os.getpid()}.json"
+        try:
+            with self._directory_locked():
+                names = [EXITED_SNAPSHOT]
+                for name in os.listdir(self.directory):
+                    if not name.endswith(".json") or name in (own, EXITED_SNAPSHOT):
+                        continue
+                    pid = name.removesuffix(".json")
+                    if _alive(pid):
+                        names.append(name)
+                    else:
+                        self._fold(pid)
+                for name in names:
+                    other = _read_snapshot(os.path.join(self.directory, name))
+                    if other is not None:
+                        _merge(merged, other)
+        except OSError:
+            pass
+        return merged
+
+    def render(self) -> str:
+        data = self.collect()
+        lines = [
+            "# HELP goplan_http_requests_total Requests handled, by view, method and status.",
+            "# TYPE goplan_http_requests_total counter",
+        ]
+        for key, count in sorted(data["requests"].items()):
+            view, method, status_code = key.split("|")
+            lines.append(f'goplan_http_requests_total{{view="{view}",method="{method}",status="{status_code}"}} {count}')
+
+        lines += [
+            "# HELP goplan_http_request_duration_seconds Request latency measured by the metrics middleware.",
+            "# TYPE goplan_http_request_duration_seconds histogram",
+        ]
+        for view, histogram in sorted(data["durations"].items()):
+            cumulative = 0
+            for bound, count in zip((*DURATION_BUCKETS, "+Inf"), histogram[:-1]):
+                cumulative += count
+                lines.append(f'goplan_http_request_duration_seconds_bucket{{view="{view}",le="{bound}"}} {cumulative}')
+            lines.append(f'goplan_http_request_duration_seconds_sum{{view="{view}"}} {histogram[-1]:.6f}')
+            lines.append(f'goplan_http_request_duration_seconds_count{{view="{view}"}} {cumulative}')
+
+        lines += [
+            "# HELP goplan_db_queries_total Database queries executed while handling requests.",
+            "# TYPE goplan_db_queries_total counter",
+        ]
+        lines += [f'goplan_db_queries_total{{view="{view}"}} {count}' for view, (count, _) in sorted(data["queries"].items())]
+        lines += [
+            "# HELP goplan_db_query_seconds_total Time spent executing database queries.",
+            "# TYPE goplan_db_query_seconds_total counter",
+        ]
+        lines += [
+            f'goplan_db_query_seconds_total{{view="{view}"}} {seconds:.6f}'
+            for view, (_, seconds) in sorted(data["queries"].items())
+        ]
+
+        lines += [
+            "# HELP goplan_phase_seconds_total Time spent in password hashing and JWT signing/verification.",
+            "# TYPE goplan_phase_seconds_total counter",
+        ]
+        phases = sorted(data["phases"].items())
+        for key, (_, seconds) in phases:
+            view, phase = key.split("|")
+            lines.append(f'goplan_phase_seconds_total{{view="{view}",phase="{phase}"}} {seconds:.6f}')
+        lines += [
+            "# HELP goplan_phase_calls_total Number of timed phase calls.",
+            "# TYPE goplan_phase_calls_total counter",
+        ]
+        for key, (count, _) in phases:
+            view, phase = key.split("|")
+            lines.append(f'goplan_phase_calls_total{{view="{view}",phase="{phase}"}} {count}')
+
+        lines += [
+            "# HELP goplan_events_total Events counted outside the per-view metrics.",
+            "# TYPE goplan_events_total counter",
+        ]
+        lines += [f'goplan_events_total{{event="{event}"}} {count}' for event, count in sorted(data.get("events", {}).items())]
+
+        pools = data.get("pools", {})
+        aliases = sorted({key.split("|")[0] for key in pools})
+        for stat, (metric, kind, description) in POOL_METRICS.items():
+            lines += [f"# HELP {metric} {description}", f"# TYPE {metric} {kind}"]
+            lines += [f'{metric}{{alias="{alias}"}} {pools.get(f"{alias}|{stat}", 0)}' for alias in aliases]
+        lines += [
+            "# HELP goplan_db_pool_wait_seconds_total Time requests spent waiting for a pooled connection.",
+            "# TYPE goplan_db_pool_wait_seconds_total counter",
+        ]
+        lines += [
+            f'goplan_db_pool_wait_seconds_total{{alias="{alias}"}} {pools.get(f"{alias}|requests_wait_ms", 0) / 1000:.3f}'
+            for alias in aliases
+        ]
+        return "\n".join(lines) + "\n"
+
+
+metrics_registry = MetricsRegistry()
+
+
+class RequestMetricsMiddleware:
+    # Records latency, status, query count/time and timed phases per view.
+    # Kept first in MIDDLEWARE so the latency covers the whole stack.
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, "METRICS_ENABLED", True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        sample, token, started = self._start(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        self._finish(sample, request, response, started)
+        return response
+
+    async def __acall__(self, request):
+        sample, token, started = self._start(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        self._finish(sample, request, response, started)
+        return response
+
+    @staticmethod
+    def _start(request):
+        sample = RequestSample()
+        request.metrics_sample = sample
+        return sample, _current.set(sample), time.perf_counter()
+
+    @staticmethod
+    def _finish(sample: RequestSample, request, response, started: float) -> None:
+        metrics_registry.record(sample, request.method, response.status_code, time.perf_counter() - started)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_class = getattr(view_func, "view_class", None)
+        request.metrics_sample.view = view_class.__name__ if view_class else view_func.__name__
+        return None
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.handlers.base import BaseHandler
+from django.core.handlers.exception import convert_exception_to_response
+from django.utils.module_loading import import_string
+
+# Only for BaseHandler.adapt_method_mode(), which keeps no state.
+_adapter = BaseHandler()
+
+
+class MiddlewareScope:
+    __slots__ = ("prefix", "handler", "view_hooks", "template_response_hooks", "exception_hooks")
+
+    def __init__(self, prefix: str):
+        self.prefix = prefix
+        self.handler = None
+        self.view_hooks: list = []
+        self.template_response_hooks: list = []
+        self.exception_hooks: list = []
+
+
+class PathScopedMiddleware:
+    # The tail of MIDDLEWARE, chosen per request: the first SCOPED_MIDDLEWARE
+    # entry whose prefix starts request.path_info supplies the chain ("" matches
+    # everything). JWT-only /api/ routes skip sessions, CSRF, auth and messages,
+    # which only the admin needs. Each chain is built the way BaseHandler builds
+    # MIDDLEWARE, and the process_view/process_exception/process_template_response
+    # hooks of the chosen chain are run from this middleware's own hooks, which
+    # the outer handler adapts; the inner hooks are called synchronously.
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+        # Under ASGI an async process_view keeps /api/ requests, whose chain has
+        # no view hooks, from hopping to a thread just to find that out.
+        self.process_view = self._aprocess_view if self.is_async else self._process_view
+        self.scopes = [self._build(prefix, paths) for prefix, paths in getattr(settings, "SCOPED_MIDDLEWARE", [])]
+
+    def _build(self, prefix: str, paths: list[str]) -> MiddlewareScope:
+        scope = MiddlewareScope(prefix)
+        handler, handler_is_async = self.get_response, self.is_async
+        for path in reversed(paths):
+            middleware = import_string(path)
+            can_sync = getattr(middleware, "sync_capable", True)
+            can_async = getattr(middleware, "async_capable", False)
+            if not can_sync and not can_async:
+                raise RuntimeError(f"Middleware {path} must have at least one of sync_capable/async_capable set to True.")
+            middleware_is_async = can_async if handler_is_async or not can_sync else False
+            try:
+                adapted = _adapter.adapt_method_mode(
+                    middleware_is_async, handler, handler_is_async, debug=settings.DEBUG, name=path
+                )
+                instance = middleware(adapted)
+            except MiddlewareNotUsed:
+                continue
+            if hasattr(instance, "process_view"):
+                scope.view_hooks.insert(0, instance.process_view)
+            if hasattr(instance, "process_template_response"):
+                scope.template_response_hooks.append(instance.process_template_response)
+            if hasattr(instance, "process_exception"):
+                scope.exception_hooks.append(instance.process_exception)
+            handler, handler_is_async = convert_exception_to_response(instance), middleware_is_async
+        scope.handler = _adapter.adapt_method_mode(self.is_async, handler, handler_is_async)
+        return scope
+
+    def scope_for(self, request) -> MiddlewareScope | None:
+        path = request.path_info
+        return next((scope for scope in self.scopes if path.startswith(scope.prefix)), None)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        scope = self.scope_for(request)
+        return scope.handler(request) if scope else self.get_response(request)
+
+    async def __acall__(self, request):
+        scope = self.scope_for(request)
+        return await (scope.handler(request) if scope else self.get_response(request))
+
+    def _process_view(self, request, view_func, view_args, view_kwargs):
+        scope = self.scope_for(request)
+        for hook in scope.view_hooks if scope else ():
+            response = hook(request, view_func, view_args, view_kwargs)
+            if response is not None:
+                return response
+        return None
+
+    async def _aprocess_view(self, request, view_func, view_args, view_kwargs):
+        scope = self.scope_for(request)
+        if scope is None or not scope.view_hooks:
+            return None
+        return await sync_to_async(self._process_view)(request, view_func, view_args, view_kwargs)
+
+    def process_template_response(self, request, response):
+        scope = self.scope_for(request)
+        for hook in scope.template_response_hooks if scope else ():
+            response = hook(request, response)
+        return response
+
+    def process_exception(self, request, exception):
+        scope = self.scope_for(request)
+        for hook in scope.exception_hooks if scope else ():
+            response = hook(request, exception)
+            if response is not None:
+                return response
+        return None
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import contextvars
+import random
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from api.throttling import SharedWindowTable
+
+# Keys written within DB_REPLICA_STICKY_SECONDS, shared by every worker on the host.
+recent_writes = SharedWindowTable("goplan-recent-writes", "DB_STICKY_SHARED_PATH", "DB_STICKY_SHARED_SLOTS")
+
+# Large enough that recording a write never counts as over a limit.
+_UNLIMITED = 2**32 - 1
+
+
+class RoutingState:
+    __slots__ = ("pinned",)
+
+    def __init__(self):
+        self.pinned = False
+
+
+_state: contextvars.ContextVar[RoutingState | None] = contextvars.ContextVar("replica_routing", default=None)
+
+
+def _current_state() -> RoutingState:
+    state = _state.get()
+    if state is None:
+        # Outside a request (management commands, shell) the state lives for the thread.
+        state = RoutingState()
+        _state.set(state)
+    return state
+
+
+def _sticky_seconds() -> float:
+    return getattr(settings, "DB_REPLICA_STICKY_SECONDS", 5.0)
+
+
+def _replicated(model) -> bool:
+    return bool(getattr(settings, "DB_REPLICA_ALIASES", ())) and model._meta.label_lower in getattr(
+        settings, "DB_REPLICA_MODELS", ()
+    )
+
+
+def _user_keys(user) -> list[str]:
+    keys = [f"user:{user.pk}"]
+    if user.email:
+        keys.append(f"email:{user.email}")
+    return keys
+
+
+def record_write(user) -> None:
+    # Pins the rest of this request to the primary and makes the next
+    # DB_REPLICA_STICKY_SECONDS of reads for this user, from any worker, do the same.
+    _current_state().pinned = True
+    now = time.time()
+    for key in _user_keys(user):
+        recent_writes.hit(key, _UNLIMITED, _sticky_seconds(), now)
+
+
+def use_primary_if_written(*, email: str | None = None, user_id=None) -> None:
+    # Called before a replica-eligible lookup whose target is known only by
+    # email or id. Reads stay on the primary while the replica may lag a write.
+    if not getattr(settings, "DB_REPLICA_ALIASES", ()):
+        return
+    state = _current_state()
+    if state.pinned:
+        return
+    keys = ([f"email:{email}"] if email else []) + ([f"user:{user_id}"] if user_id is not None else [])
+    now = time.time()
+    if any(recent_writes.seen(key, _sticky_seconds(), now) for key in keys):
+        state.pinned = True
+
+
+class PrimaryReplicaRouter:
+    # Reads of the models in DB_REPLICA_MODELS (accounts.user by default) go
+    # to a random alias from DB_REPLICA_ALIASES; everything else, including
+    # the token blacklist, reads from the primary so a revocation is never
+    # missed. Writes always go to the primary and, for users, are recorded in
+    # recent_writes for read-your-writes stickiness.
+
+    def db_for_read(self, model, **hints):
+        if not _replicated(model) or _current_state().pinned:
+            return "default"
+        return random.choice(settings.DB_REPLICA_ALIASES)
+
+    def db_for_write(self, model, **hints):
+        # QuerySet.update() and bulk writes pass no instance and are not recorded.
+        instance = hints.get("instance")
+        if instance is not None and _replicated(model):
+            record_write(instance)
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in getattr(settings, "DB_REPLICA_ALIASES", ())
+
+
+class ReplicaRoutingMiddleware:
+    # Gives every request its own routing state so pinning never leaks into
+    # the next request handled by the same thread.
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = _state.set(RoutingState())
+        try:
+            return self.get_response(request)
+        finally:
+            _state.reset(token)
+
+    async def __acall__(self, request):
+        token = _state.set(RoutingState())
+        try:
+            return await self.get_response(request)
+        finally:
+            _state.reset(token)
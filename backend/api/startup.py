@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import hashlib
+import importlib.util
+import pkgutil
+
+from django.apps import apps
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.migrations.loader import MigrationLoader
+from django.db.migrations.recorder import MigrationRecorder
+
+
+def disk_migrations() -> set[tuple[str, str]]:
+    # (app_label, name) of every migration file, found the way MigrationLoader
+    # finds them but without importing the modules or building the graph.
+    found = set()
+    for app_config in apps.get_app_configs():
+        module_name, _ = MigrationLoader.migrations_module(app_config.label)
+        if module_name is None:
+            continue
+        try:
+            spec = importlib.util.find_spec(module_name)
+        except ModuleNotFoundError:
+            continue
+        if spec is None or not spec.submodule_search_locations:
+            continue
+        for module in pkgutil.iter_modules(spec.submodule_search_locations):
+            if not module.ispkg and module.name[0] not in "_~":
+                found.add((app_config.label, module.name))
+    return found
+
+
+def fingerprint(migrations: set[tuple[str, str]]) -> str:
+    digest = hashlib.sha256("\n".join(f"{app}.{name}" for app, name in sorted(migrations)).encode())
+    return digest.hexdigest()[:16]
+
+
+def unapplied_migrations(using: str = DEFAULT_DB_ALIAS) -> tuple[set[tuple[str, str]], str]:
+    # Migration files with no django_migrations row, plus the fingerprint of
+    # the files on disk. Costs two small queries. A squashed migration whose
+    # replaced migrations were applied one by one may be reported as pending,
+    # which only costs a regular `migrate`.
+    on_disk = disk_migrations()
+    recorder = MigrationRecorder(connections[using])
+    applied = set(recorder.applied_migrations()) if recorder.has_table() else set()
+    return on_disk - applied, fingerprint(on_disk)
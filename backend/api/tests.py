@@ -0,0 +1,612 @@
+from __future__ import annotations
+
+import io
+import json
+import multiprocessing
+import os
+import runpy
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import checks
+from django.core.management import call_command
+from django.db import connections
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from rest_framework import permissions, status
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory, APITestCase
+from rest_framework.views import APIView
+
+from api.checks import SCOPED_CHECK_IDS
+from api.health import health_prober
+from api.metrics import metrics_registry
+from api.routers import recent_writes
+from api.startup import disk_migrations, unapplied_migrations
+from api.throttling import SharedScopedRateThrottle, SharedWindowTable, shared_windows
+
+
+def setUpModule():
+    # Throttle counters and metrics snapshots are host-wide files; give the test run its own.
+    # last_login is written inline so no flush thread writes into a test transaction.
+    directory = tempfile.TemporaryDirectory()
+    shared_settings = override_settings(
+        THROTTLE_SHARED_PATH=str(Path(directory.name) / "throttle"),
+        METRICS_DIR=str(Path(directory.name) / "metrics"),
+        LOGIN_GUARD_SHARED_PATH=str(Path(directory.name) / "login-failures"),
+        AUTH_PRINCIPAL_SHARED_PATH=str(Path(directory.name) / "principal-changes"),
+        LAST_LOGIN_FLUSH_INTERVAL=0,
+        DB_STICKY_SHARED_PATH=str(Path(directory.name) / "recent-writes"),
+    )
+    shared_settings.enable()
+    unittest.addModuleCleanup(directory.cleanup)
+    unittest.addModuleCleanup(shared_settings.disable)
+
+
+def probe_broken():
+    raise ConnectionError("connection refused")
+
+
+def hit_from_child(key: str, attempts: int, results) -> None:
+    allowed = sum(shared_windows.hit(key, 10, 60, 30.0)[0] for _ in range(attempts))
+    results.put(allowed)
+
+
+class SharedWindowTableTestCase(SimpleTestCase):
+    def setUp(self):
+        shared_windows.reset()
+
+    def test_limits_within_window_and_reports_retry_after(self):
+        results = [shared_windows.hit("login:a", 3, 60, 10.0) for _ in range(4)]
+
+        self.assertEqual([allowed for allowed, _ in results], [True, True, True, False])
+        self.assertEqual(results[-1][1], 50.0)
+        self.assertTrue(shared_windows.hit("login:b", 3, 60, 10.0)[0])
+
+    def test_previous_window_is_weighted_by_overlap(self):
+        for _ in range(4):
+            shared_windows.hit("login:a", 4, 60, 10.0)
+
+        # 45s into the next window, 25% of the previous window's 4 requests still count.
+        allowed = [shared_windows.hit("login:a", 4, 60, 105.0)[0] for _ in range(4)]
+
+        self.assertEqual(allowed, [True, True, True, False])
+        self.assertTrue(shared_windows.hit("login:a", 4, 60, 200.0)[0])
+
+    def test_seen_covers_current_and_previous_window_without_counting(self):
+        shared_windows.hit("write:a", 1, 60, 10.0)
+
+        self.assertTrue(shared_windows.seen("write:a", 60, 50.0))
+        self.assertTrue(shared_windows.seen("write:a", 60, 100.0))
+        self.assertFalse(shared_windows.seen("write:a", 60, 130.0))
+        self.assertFalse(shared_windows.seen("write:b", 60, 50.0))
+        self.assertFalse(shared_windows.hit("write:a", 1, 60, 50.0)[0])
+
+    def test_hit_without_counting_only_reports(self):
+        shared_windows.hit("login:a", 2, 60, 10.0)
+
+        self.assertEqual(shared_windows.hit("login:a", 2, 60, 20.0, count=False), (True, None))
+        self.assertTrue(shared_windows.hit("login:a", 2, 60, 20.0)[0])
+        self.assertEqual(shared_windows.hit("login:a", 2, 60, 30.0, count=False), (False, 30.0))
+
+    def test_slot_placement_is_keyed_by_the_secret_key(self):
+        placements = []
+        for secret in ("first-deployment-secret-key", "second-deployment-secret-key"):
+            with override_settings(SECRET_KEY=secret):
+                table = SharedWindowTable("goplan-placement", "THROTTLE_SHARED_PATH", "THROTTLE_SHARED_SLOTS")
+                table._open()
+                self.addCleanup(table._close)
+                placements.append(table._locate("login-failures:email:owner@example.com"))
+
+        self.assertNotEqual(placements[0], placements[1])
+
+    def test_limit_is_shared_across_processes(self):
+        context = multiprocessing.get_context("fork")
+        results = context.Queue()
+        children = [context.Process(target=hit_from_child, args=("scope:x", 8, results)) for _ in range(3)]
+        for child in children:
+            child.start()
+        for child in children:
+            child.join(timeout=30)
+
+        self.assertEqual(sum(results.get(timeout=5) for _ in children), 10)
+
+
+class ScopedThrottleView(APIView):
+    permission_classes = [permissions.AllowAny]
+    throttle_classes = [SharedScopedRateThrottle]
+    throttle_scope = "auth_register"
+
+    def get(self, request, *args, **kwargs):
+        return Response({"detail": "ok"})
+
+
+class SharedScopedRateThrottleTestCase(SimpleTestCase):
+    def setUp(self):
+        shared_windows.reset()
+
+    def test_uses_configured_scope_rate(self):
+        factory = APIRequestFactory()
+        view = ScopedThrottleView.as_view()
+
+        responses = [view(factory.get("/", REMOTE_ADDR="10.0.0.1")) for _ in range(11)]
+
+        self.assertEqual([response.status_code for response in responses[:10]], [status.HTTP_200_OK] * 10)
+        self.assertEqual(responses[10].status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn("Retry-After", responses[10])
+        self.assertEqual(view(factory.get("/", REMOTE_ADDR="10.0.0.2")).status_code, status.HTTP_200_OK)
+
+
+@mock.patch.object(health_prober, "ensure_started")
+class HealthProbeAPITestCase(APITestCase):
+    live_url = "/api/health/live"
+    ready_url = "/api/health/ready"
+
+    def setUp(self):
+        health_prober.snapshot = None
+
+    def test_live_never_touches_dependencies(self, _ensure_started):
+        with self.assertNumQueries(0):
+            response = self.client.get(self.live_url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["status"], "ok")
+
+    def test_ready_is_unavailable_until_first_probe(self, _ensure_started):
+        response = self.client.get(self.ready_url)
+
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response.data["status"], "starting")
+
+    def test_ready_serves_cached_probe_without_queries(self, _ensure_started):
+        health_prober.probe_now()
+
+        with self.assertNumQueries(0):
+            responses = [self.client.get(self.ready_url) for _ in range(20)]
+
+        self.assertEqual({response.status_code for response in responses}, {status.HTTP_200_OK})
+        probe = responses[-1].data["probes"]["databases"]
+        self.assertTrue(probe["ok"])
+        self.assertIn("latency_ms", probe)
+        self.assertIn("pool", probe["details"]["default"])
+
+    @override_settings(HEALTH_READINESS_PROBES=["api.health.probe_databases", "api.tests.probe_broken"])
+    def test_ready_reports_failed_probe(self, _ensure_started):
+        health_prober.probe_now()
+
+        response = self.client.get(self.ready_url)
+
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertFalse(response.data["probes"]["broken"]["ok"])
+        self.assertIn("connection refused", response.data["probes"]["broken"]["error"])
+
+    def test_stale_result_is_not_ready(self, _ensure_started):
+        health_prober.probe_now()
+        health_prober.snapshot["monotonic"] -= health_prober.interval * 4
+
+        response = self.client.get(self.ready_url)
+
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertTrue(response.data["stale"])
+
+
+@override_settings(METRICS_AUTH_TOKEN="scrape-token")
+class MetricsAPITestCase(APITestCase):
+    metrics_url = "/api/metrics"
+
+    def setUp(self):
+        metrics_registry.reset()
+        shutil.rmtree(metrics_registry.directory, ignore_errors=True)
+
+    def scrape(self) -> str:
+        return self.client.get(self.metrics_url, HTTP_AUTHORIZATION="Bearer scrape-token").content.decode()
+
+    def test_records_per_view_latency_queries_and_phases(self):
+        get_user_model().objects.create_user(email="owner@example.com", password="StrongPass#2026")
+        payload = {"email": "owner@example.com", "password": "StrongPass#2026"}
+        self.client.post("/api/auth/login", payload, format="json")
+
+        body = self.scrape()
+
+        self.assertIn('goplan_http_requests_total{view="LoginAPIView",method="POST",status="200"} 1', body)
+        self.assertIn('goplan_http_request_duration_seconds_count{view="LoginAPIView"} 1', body)
+        self.assertIn('goplan_phase_calls_total{view="LoginAPIView",phase="password_hashing"} 1', body)
+        self.assertIn('goplan_phase_seconds_total{view="LoginAPIView",phase="jwt_sign"}', body)
+        queries = next(line for line in body.splitlines() if line.startswith('goplan_db_queries_total{view="LoginAPIView"}'))
+        self.assertGreater(int(queries.rsplit(" ", 1)[1]), 0)
+
+    def test_sums_snapshots_of_other_workers(self):
+        self.client.get("/api/health/live")
+        directory = Path(metrics_registry.directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        other = {
+            "requests": {"LivenessAPIView|GET|200": 4},
+            "durations": {"LivenessAPIView": [4] + [0] * 11 + [0.004]},
+            "queries": {"LivenessAPIView": [0, 0.0]},
+            "phases": {},
+        }
+        (directory / "999999.json").write_text(json.dumps(other))
+
+        body = self.scrape()
+
+        self.assertIn('goplan_http_requests_total{view="LivenessAPIView",method="GET",status="200"} 5', body)
+        self.assertIn('goplan_http_request_duration_seconds_bucket{view="LivenessAPIView",le="+Inf"} 5', body)
+
+    def test_exports_pool_stats_of_live_workers_only(self):
+        directory = Path(metrics_registry.directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        pools = {"default|pool_size": 3, "default|requests_waiting": 2, "default|requests_wait_ms": 500}
+        (directory / f"{os.getppid()}.json").write_text(json.dumps({"pools": pools}))
+        (directory / "999999.json").write_text(json.dumps({"pools": pools}))
+        local = {"default": {"pool_max": 10, "pool_size": 4, "pool_available": 1, "requests_wait_ms": 1500}}
+
+        with mock.patch("api.metrics.open_pools", return_value=local):
+            body = self.scrape()
+
+        self.assertIn('goplan_db_pool_size{alias="default"} 7', body)
+        self.assertIn('goplan_db_pool_available{alias="default"} 1', body)
+        self.assertIn('goplan_db_pool_requests_waiting{alias="default"} 2', body)
+        self.assertIn('goplan_db_pool_timeouts_total{alias="default"} 0', body)
+        self.assertIn('goplan_db_pool_wait_seconds_total{alias="default"} 2.000', body)
+
+    def test_folds_snapshots_of_exited_workers(self):
+        directory = Path(metrics_registry.directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        for pid in ("999998", "999999"):
+            snapshot = {"requests": {"LivenessAPIView|GET|200": 2}, "pools": {"default|pool_size": 3}}
+            (directory / f"{pid}.json").write_text(json.dumps(snapshot))
+
+        first = self.scrape()
+        (directory / "999999.json").write_text(json.dumps({"requests": {"LivenessAPIView|GET|200": 1}}))
+        second = self.scrape()
+
+        self.assertIn('goplan_http_requests_total{view="LivenessAPIView",method="GET",status="200"} 4', first)
+        self.assertIn('goplan_http_requests_total{view="LivenessAPIView",method="GET",status="200"} 5', second)
+        self.assertEqual(sorted(path.name for path in directory.glob("*.json")), ["exited.json"])
+
+    def test_requires_configured_bearer_token(self):
+        denied = self.client.get(self.metrics_url)
+        allowed = self.client.get(self.metrics_url, HTTP_AUTHORIZATION="Bearer scrape-token")
+
+        self.assertEqual(denied.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(allowed.status_code, status.HTTP_200_OK)
+        self.assertTrue(allowed["Content-Type"].startswith("text/plain; version=0.0.4"))
+
+    @override_settings(METRICS_AUTH_TOKEN="")
+    def test_without_token_serves_staff_only(self):
+        staff = get_user_model().objects.create_user(email="staff@example.com", password="StrongPass#2026")
+        staff.is_staff = True
+        staff.save()
+
+        anonymous = self.client.get(self.metrics_url)
+        self.client.force_authenticate(staff)
+        allowed = self.client.get(self.metrics_url)
+
+        self.assertEqual(anonymous.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(allowed.status_code, status.HTTP_200_OK)
+
+
+class PathScopedMiddlewareTestCase(TestCase):
+    def assert_security_headers(self, response):
+        self.assertEqual(response["X-Content-Type-Options"], "nosniff")
+        self.assertEqual(response["Referrer-Policy"], "same-origin")
+        self.assertEqual(response["Cross-Origin-Opener-Policy"], "same-origin")
+        self.assertEqual(response["X-Frame-Options"], "DENY")
+
+    def test_api_keeps_security_and_cors_headers_without_session_machinery(self):
+        origin = settings.CORS_ALLOWED_ORIGINS[0]
+
+        response = self.client.get("/api/health/live", HTTP_ORIGIN=origin, secure=True)
+        preflight = self.client.options(
+            "/api/auth/login", HTTP_ORIGIN=origin, HTTP_ACCESS_CONTROL_REQUEST_METHOD="POST", secure=True
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assert_security_headers(response)
+        self.assertEqual(response["Access-Control-Allow-Origin"], origin)
+        self.assertNotIn("Cookie", response.get("Vary", ""))
+        self.assertFalse(hasattr(response.wsgi_request, "session"))
+        self.assertEqual(preflight.status_code, status.HTTP_200_OK)
+        self.assertEqual(preflight["Access-Control-Allow-Origin"], origin)
+        self.assertIn("POST", preflight["Access-Control-Allow-Methods"])
+
+    async def test_async_api_requests_get_the_same_headers(self):
+        response = await self.async_client.get("/api/health/live", secure=True)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assert_security_headers(response)
+
+    @unittest.skipUnless(settings.DJANGO_ADMIN_ENABLED, "the admin is disabled (DJANGO_ADMIN_ENABLED=0)")
+    def test_admin_keeps_sessions_and_csrf(self):
+        client = self.client_class(enforce_csrf_checks=True)
+
+        login_page = client.get("/admin/login/", secure=True)
+        forged = client.post("/admin/login/", {"username": "a", "password": "b"}, secure=True)
+
+        self.assertEqual(login_page.status_code, status.HTTP_200_OK)
+        self.assert_security_headers(login_page)
+        self.assertIn("csrftoken", login_page.cookies)
+        self.assertTrue(hasattr(login_page.wsgi_request, "session"))
+        self.assertEqual(forged.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class PathScopedMiddlewareChecksTestCase(SimpleTestCase):
+    def run_checks(self, *tags, deploy=False):
+        return [(message.id, message.obj) for message in checks.run_checks(tags=tags, include_deployment_checks=deploy)]
+
+    def scoped(self, prefix: str, without: str) -> list:
+        return [
+            (scope, [path for path in paths if path != without] if scope == prefix else paths)
+            for scope, paths in settings.SCOPED_MIDDLEWARE
+        ]
+
+    def test_configured_chains_pass_the_middleware_checks(self):
+        messages = self.run_checks(checks.Tags.admin, checks.Tags.security, deploy=True)
+
+        self.assertEqual([message for message in messages if message[0] in SCOPED_CHECK_IDS], [])
+
+    def test_each_chain_needs_x_frame_options(self):
+        scoped = self.scoped("/api/", "django.middleware.clickjacking.XFrameOptionsMiddleware")
+        with override_settings(SCOPED_MIDDLEWARE=scoped):
+            messages = self.run_checks(checks.Tags.security, deploy=True)
+
+        self.assertIn(("security.W002", "SCOPED_MIDDLEWARE['/api/']"), messages)
+
+    @unittest.skipUnless(settings.DJANGO_ADMIN_ENABLED, "the admin is disabled (DJANGO_ADMIN_ENABLED=0)")
+    def test_session_chain_needs_csrf_protection(self):
+        with override_settings(SCOPED_MIDDLEWARE=self.scoped("", "django.middleware.csrf.CsrfViewMiddleware")):
+            messages = self.run_checks(checks.Tags.security, deploy=True)
+
+        self.assertIn(("security.W003", "SCOPED_MIDDLEWARE['']"), messages)
+        self.assertNotIn(("security.W003", "SCOPED_MIDDLEWARE['/api/']"), messages)
+
+    @unittest.skipUnless(settings.DJANGO_ADMIN_ENABLED, "the admin is disabled (DJANGO_ADMIN_ENABLED=0)")
+    def test_admin_chain_needs_the_admin_middleware(self):
+        scoped = self.scoped("", "django.contrib.messages.middleware.MessageMiddleware")
+        with override_settings(SCOPED_MIDDLEWARE=scoped):
+            messages = self.run_checks(checks.Tags.admin)
+
+        self.assertEqual(messages, [("admin.E409", "SCOPED_MIDDLEWARE['']")])
+
+
+class AdminDisabledTestCase(SimpleTestCase):
+    # INSTALLED_APPS and the URLconf are fixed at startup, so API-only mode runs in its own process.
+    PROBE = """
+import json
+import django
+django.setup()
+from django.apps import apps
+from django.core import checks
+from django.core.management import call_command
+from django.urls import Resolver404, resolve
+
+def resolves(path):
+    try:
+        resolve(path)
+    except Resolver404:
+        return False
+    return True
+
+call_command("check")
+print(json.dumps({
+    "apps": [app for app in ("admin", "sessions", "messages", "staticfiles") if apps.is_installed(f"django.contrib.{app}")],
+    "admin": resolves("/admin/"),
+    "api": resolves("/api/health/live"),
+}))
+"""
+
+    def test_api_only_mode_drops_admin_apps_and_urls(self):
+        environ = {**os.environ, "DJANGO_ADMIN_ENABLED": "0"}
+        completed = subprocess.run(
+            [sys.executable, "-c", self.PROBE], cwd=settings.BASE_DIR, env=environ, capture_output=True, text=True
+        )
+
+        self.assertEqual(completed.returncode, 0, completed.stderr)
+        self.assertEqual(json.loads(completed.stdout.splitlines()[-1]), {"apps": [], "admin": False, "api": True})
+
+
+class GunicornConfigTestCase(SimpleTestCase):
+    def load(self, cpus: int, **environ):
+        environ = {"API_VIEW_MODE": "sync", **environ}
+        with mock.patch.dict(os.environ, environ), mock.patch("os.sched_getaffinity", return_value=set(range(cpus))):
+            os.environ.pop("PASSWORD_HASHING_WORKERS", None)
+            # No readable cgroup quota, so the patched affinity mask decides.
+            with mock.patch("builtins.open", side_effect=OSError):
+                config = runpy.run_path(str(Path(settings.BASE_DIR) / "configs" / "gunicorn.py"))
+            return config, os.environ["PASSWORD_HASHING_WORKERS"]
+
+    def test_one_worker_per_cpu_with_cpus_split_between_hashing_pools(self):
+        config, hashing_workers = self.load(8)
+
+        self.assertEqual(config["workers"], 8)
+        self.assertEqual(hashing_workers, "1")
+        self.assertEqual(config["worker_class"], "gthread")
+        self.assertTrue(config["preload_app"])
+        self.assertEqual((config["max_requests"], config["max_requests_jitter"]), (5000, 500))
+
+    def test_explicit_worker_count_gets_larger_hashing_pools(self):
+        config, hashing_workers = self.load(8, GUNICORN_WORKERS="2")
+
+        self.assertEqual(config["workers"], 2)
+        self.assertEqual(hashing_workers, "4")
+
+    def test_async_mode_serves_the_asgi_application(self):
+        with mock.patch("importlib.util.find_spec", return_value=mock.sentinel.spec):
+            config, _ = self.load(1, API_VIEW_MODE="async")
+
+        self.assertEqual(config["workers"], 2)
+        self.assertEqual(config["wsgi_app"], "configs.asgi:application")
+        self.assertEqual(config["worker_class"], "uvicorn_worker.UvicornWorker")
+
+    def test_async_mode_without_uvicorn_worker_fails_clearly(self):
+        with mock.patch("importlib.util.find_spec", return_value=None):
+            with self.assertRaisesMessage(RuntimeError, "needs the uvicorn-worker package"):
+                self.load(1, API_VIEW_MODE="async")
+
+    def test_child_exit_folds_the_workers_metrics_snapshot(self):
+        config, _ = self.load(1)
+        with mock.patch.object(metrics_registry, "mark_process_dead") as mark_process_dead:
+            config["child_exit"](None, mock.Mock(pid=4242))
+
+        mark_process_dead.assert_called_once_with(4242)
+
+
+class DatabaseConnectionModeTestCase(SimpleTestCase):
+    def database(self, mode: str, **environ) -> dict:
+        environ = {
+            "DJANGO_SECRET_KEY": "test",
+            "DJANGO_ALLOWED_HOSTS": "localhost",
+            "CORS_ALLOWED_ORIGINS": "http://localhost",
+            "CSRF_TRUSTED_ORIGINS": "http://localhost",
+            "DB_ENGINE": "postgresql",
+            "DB_NAME": "goplan",
+            "DB_USER": "goplan",
+            "DB_PASSWORD": "secret",
+            "DB_HOST": "db",
+            "DB_PORT": "5432",
+            "DB_REPLICA_HOSTS": "",
+            "DB_CONN_MODE": mode,
+            **environ,
+        }
+        with mock.patch.dict(os.environ, environ):
+            config = runpy.run_path(str(Path(settings.BASE_DIR) / "configs" / "settings.py"))
+        return config["DATABASES"]["default"]
+
+    def test_direct_mode_opens_a_connection_per_request(self):
+        database = self.database("direct")
+
+        self.assertNotIn("CONN_MAX_AGE", database)
+        self.assertNotIn("OPTIONS", database)
+
+    def test_persistent_mode_reuses_health_checked_connections(self):
+        database = self.database("persistent", DB_CONN_MAX_AGE="120")
+
+        self.assertEqual(database["CONN_MAX_AGE"], 120)
+        self.assertTrue(database["CONN_HEALTH_CHECKS"])
+        self.assertNotIn("OPTIONS", database)
+        self.assertNotIn("DISABLE_SERVER_SIDE_CURSORS", database)
+
+    def test_pool_mode_configures_a_psycopg_pool(self):
+        database = self.database("pool", DB_POOL_MIN_SIZE="4", DB_POOL_MAX_SIZE="16", DB_POOL_TIMEOUT="5")
+
+        self.assertNotIn("CONN_MAX_AGE", database)
+        self.assertEqual(
+            database["OPTIONS"],
+            {"pool": {"min_size": 4, "max_size": 16, "timeout": 5.0, "max_idle": 600.0}},
+        )
+
+    def test_pgbouncer_mode_disables_server_side_cursors(self):
+        database = self.database("pgbouncer")
+
+        self.assertEqual(database["CONN_MAX_AGE"], 60)
+        self.assertTrue(database["CONN_HEALTH_CHECKS"])
+        self.assertTrue(database["DISABLE_SERVER_SIDE_CURSORS"])
+        self.assertNotIn("OPTIONS", database)
+
+
+class MigrateIfNeededCommandTestCase(TestCase):
+    def run_command(self):
+        stdout = io.StringIO()
+        with mock.patch("api.management.commands.migrate_if_needed.call_command") as migrate:
+            call_command("migrate_if_needed", stdout=stdout)
+        return stdout.getvalue(), migrate
+
+    def test_lists_migration_files_of_every_app(self):
+        migrations = disk_migrations()
+
+        self.assertIn(("accounts", "0004_user_admin_indexes"), migrations)
+        self.assertIn(("token_blacklist", "0001_initial"), migrations)
+        self.assertFalse(any(name.startswith("_") for _, name in migrations))
+
+    def test_skips_migrate_when_every_migration_is_applied(self):
+        output, migrate = self.run_command()
+
+        self.assertIn("Migrations up to date", output)
+        self.assertIn(unapplied_migrations()[1], output)
+        migrate.assert_not_called()
+
+    def test_runs_migrate_when_a_migration_is_unapplied(self):
+        with mock.patch("api.startup.disk_migrations", return_value=disk_migrations() | {("accounts", "9999_next")}):
+            output, migrate = self.run_command()
+
+        self.assertIn("1 unapplied migrations (accounts.9999_next)", output)
+        migrate.assert_called_once_with("migrate", database="default", interactive=False, verbosity=1)
+
+
+@override_settings(DB_REPLICA_ALIASES=["replica"], DB_REPLICA_STICKY_SECONDS=60)
+class ReplicaRoutingTestCase(TransactionTestCase):
+    # "replica" is a separate, never-updated SQLite database: a replica with
+    # unbounded lag. Anything it serves proves the read was routed there. The
+    # alias only exists while this class runs, so it joins `databases` in
+    # setUpClass rather than being declared up front for the runner.
+    payload = {"email": "owner@example.com", "password": "StrongPass#2026"}
+
+    @classmethod
+    def setUpClass(cls):
+        cls.replica_directory = tempfile.TemporaryDirectory()
+        name = str(Path(cls.replica_directory.name) / "replica.sqlite3")
+        configured = connections.configure_settings(
+            {"default": {}, "replica": {"ENGINE": "django.db.backends.sqlite3", "NAME": name}}
+        )
+        connections.settings["replica"] = configured["replica"]
+        call_command("migrate", database="replica", verbosity=0)
+        cls.databases = {"default", "replica"}
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections["replica"].close()
+        del connections["replica"]
+        del connections.settings["replica"]
+        cls.replica_directory.cleanup()
+
+    def setUp(self):
+        recent_writes.reset()
+
+    def register(self):
+        response = self.client.post("/api/auth/register", self.payload, content_type="application/json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return response.json()["tokens"]
+
+    def test_reads_after_registration_stick_to_primary(self):
+        tokens = self.register()
+
+        login = self.client.post("/api/auth/login", self.payload, content_type="application/json")
+        logout = self.client.post(
+            "/api/auth/logout",
+            {"refresh": tokens["refresh"]},
+            content_type="application/json",
+            HTTP_AUTHORIZATION=f"Bearer {tokens['access']}",
+        )
+
+        self.assertEqual(login.status_code, status.HTTP_200_OK)
+        self.assertEqual(logout.status_code, status.HTTP_200_OK)
+
+    def test_user_reads_go_to_replica_once_the_window_has_passed(self):
+        self.register()
+        recent_writes.reset()
+
+        login = self.client.post("/api/auth/login", self.payload, content_type="application/json")
+
+        self.assertEqual(login.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_token_blacklist_is_read_from_primary(self):
+        tokens = self.register()
+        self.client.post(
+            "/api/auth/logout",
+            {"refresh": tokens["refresh"]},
+            content_type="application/json",
+            HTTP_AUTHORIZATION=f"Bearer {tokens['access']}",
+        )
+        recent_writes.reset()
+
+        refresh = self.client.post("/api/auth/refresh", {"refresh": tokens["refresh"]}, content_type="application/json")
+
+        self.assertEqual(refresh.status_code, status.HTTP_401_UNAUTHORIZED)
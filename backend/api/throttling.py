@@ -0,0 +1,242 @@
+from __future__ import annotations
+
+import hashlib
+import mmap
+import os
+import struct
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.utils.crypto import salted_hmac
+from rest_framework.throttling import AnonRateThrottle, ScopedRateThrottle, SimpleRateThrottle, UserRateThrottle
+
+from api.utils import shared_memory_path
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX hosts fall back to per-process locking
+    fcntl = None
+
+MAGIC = b"GPTHRT01"
+HEADER = struct.Struct("<8sI")
+# fingerprint, window start, expiry (end of the following window), current count, previous count
+SLOT = struct.Struct("<QddII")
+STRIPE_SLOTS = 256
+PROBE_LIMIT = 8
+
+
+class SharedWindowTable:
+    # Fixed-size open-addressing table of sliding-window counters in a
+    # memory-mapped file. Every worker on the host maps the same file, so a
+    # limit holds per host instead of per process. The table is split into
+    # stripes of STRIPE_SLOTS slots; a check locks one stripe with a byte-range
+    # lock (plus a thread lock) and touches at most PROBE_LIMIT slots, so its
+    # cost does not depend on how many requests are in the window. Keys are
+    # placed by a blake2b keyed with a SECRET_KEY-derived secret: callers
+    # choose keys (emails, addresses), and with a public hash they could pick
+    # ones that share a victim's probe run and keep evicting its counter.
+
+    def __init__(
+        self,
+        name: str = "goplan-throttle",
+        path_setting: str = "THROTTLE_SHARED_PATH",
+        slots_setting: str = "THROTTLE_SHARED_SLOTS",
+    ):
+        self.name = name
+        self.path_setting = path_setting
+        self.slots_setting = slots_setting
+        self._lock = threading.Lock()
+        self._mapping: mmap.mmap | None = None
+        self._fd: int | None = None
+        self._owner: tuple | None = None
+        self._stripe_locks: list[threading.Lock] = []
+        self._hash_key = b""
+        self.slots = 0
+
+    @property
+    def path(self) -> str:
+        return getattr(settings, self.path_setting, "") or shared_memory_path(self.name)
+
+    @property
+    def configured_slots(self) -> int:
+        requested = getattr(settings, self.slots_setting, 65536)
+        return max(requested // STRIPE_SLOTS, 1) * STRIPE_SLOTS
+
+    def _open(self) -> None:
+        # Re-opened after fork() or when the configured path changes.
+        owner = (os.getpid(), self.path, self.configured_slots)
+        if self._owner == owner:
+            return
+        with self._lock:
+            if self._owner == owner:
+                return
+            self._close()
+            slots = owner[2]
+            size = HEADER.size + slots * SLOT.size
+            fd = os.open(owner[1], os.O_RDWR | os.O_CREAT, 0o600)
+            self._lockf(fd, fcntl.LOCK_EX if fcntl else None, slots // STRIPE_SLOTS)
+            try:
+                current = os.fstat(fd).st_size
+                header = os.pread(fd, HEADER.size, 0) if current >= HEADER.size else b""
+                if current != size or header != HEADER.pack(MAGIC, slots):
+                    os.ftruncate(fd, 0)
+                    os.ftruncate(fd, size)
+                    os.pwrite(fd, HEADER.pack(MAGIC, slots), 0)
+            finally:
+                self._lockf(fd, fcntl.LOCK_UN if fcntl else None, slots // STRIPE_SLOTS)
+            self._fd = fd
+            self._mapping = mmap.mmap(fd, size)
+            self.slots = slots
+            self._stripe_locks = [threading.Lock() for _ in range(slots // STRIPE_SLOTS)]
+            self._hash_key = salted_hmac(f"api.throttling.{self.name}", "slot-placement", algorithm="sha256").digest()
+            self._owner = owner
+
+    def _close(self) -> None:
+        if self._mapping is not None:
+            self._mapping.close()
+        if self._fd is not None:
+            os.close(self._fd)
+        self._mapping = self._fd = self._owner = None
+
+    @staticmethod
+    def _lockf(fd: int, operation, offset: int) -> None:
+        if operation is not None:
+            fcntl.lockf(fd, operation, 1, offset)
+
+    @contextmanager
+    def _locked(self, stripe: int):
+        with self._stripe_locks[stripe]:
+            self._lockf(self._fd, fcntl.LOCK_EX if fcntl else None, stripe)
+            try:
+                yield
+            finally:
+                self._lockf(self._fd, fcntl.LOCK_UN if fcntl else None, stripe)
+
+    def _slot_offset(self, index: int) -> int:
+        return HEADER.size + index * SLOT.size
+
+    def _find(self, fingerprint: int, home: int, now: float) -> tuple[int, tuple]:
+        base = home - home % STRIPE_SLOTS
+        mapping = self._mapping
+        reusable, oldest, oldest_start = None, None, None
+        for step in range(PROBE_LIMIT):
+            index = base + (home - base + step) % STRIPE_SLOTS
+            slot = SLOT.unpack_from(mapping, self._slot_offset(index))
+            if slot[0] == fingerprint:
+                return index, slot
+            if reusable is None and (slot[0] == 0 or slot[2] <= now):
+                reusable = index
+            if oldest_start is None or slot[1] < oldest_start:
+                oldest, oldest_start = index, slot[1]
+        # A full probe run evicts the least recently windowed key.
+        return (reusable if reusable is not None else oldest), (fingerprint, 0.0, 0.0, 0, 0)
+
+    def _locate(self, key: str) -> tuple[int, int]:
+        digest = hashlib.blake2b(key.encode(), digest_size=8, key=self._hash_key).digest()
+        fingerprint = int.from_bytes(digest, "little") or 1
+        return fingerprint, fingerprint % self.slots
+
+    def hit(self, key: str, limit: int, duration: float, now: float, count: bool = True) -> tuple[bool, float | None]:
+        # With count=False, reports whether a hit would be allowed without recording one.
+        self._open()
+        fingerprint, home = self._locate(key)
+        window = now - now % duration
+
+        with self._locked(home // STRIPE_SLOTS):
+            index, (_fp, start, _expires, current, previous) = self._find(fingerprint, home, now)
+            if start == window - duration:
+                current, previous = 0, current
+            elif start != window:
+                current, previous = 0, 0
+
+            elapsed = now - window
+            allowed = previous * (duration - elapsed) / duration + current + 1 <= limit
+            if allowed and count:
+                current += 1
+            if count:
+                SLOT.pack_into(
+                    self._mapping,
+                    self._slot_offset(index),
+                    fingerprint,
+                    window,
+                    window + 2 * duration,
+                    current,
+                    previous,
+                )
+        if allowed:
+            return True, None
+        return False, self._retry_after(limit, duration, elapsed, current, previous)
+
+    @staticmethod
+    def _retry_after(limit: int, duration: float, elapsed: float, current: int, previous: int) -> float:
+        # Time until previous * (1 - t / duration) + current + 1 <= limit.
+        remaining = duration - elapsed
+        if current + 1 > limit or not previous:
+            return remaining
+        needed = duration * (1 - (limit - current - 1) / previous)
+        return max(min(needed - elapsed, remaining), 0.0)
+
+    def seen(self, key: str, duration: float, now: float) -> bool:
+        # Whether `key` was hit in the current or the previous window, without counting a hit.
+        self._open()
+        fingerprint, home = self._locate(key)
+        window = now - now % duration
+        with self._locked(home // STRIPE_SLOTS):
+            _index, (_fp, start, _expires, current, previous) = self._find(fingerprint, home, now)
+        if start == window:
+            return bool(current or previous)
+        return start == window - duration and bool(current)
+
+    def stamp(self, key: str, now: float) -> tuple[float, int]:
+        # The window and count of the key's latest hit, without counting one:
+        # every later hit changes it, whatever the duration.
+        self._open()
+        fingerprint, home = self._locate(key)
+        with self._locked(home // STRIPE_SLOTS):
+            _index, (_fp, start, _expires, current, _previous) = self._find(fingerprint, home, now)
+        return start, current
+
+    def reset(self) -> None:
+        self._open()
+        with self._lock:
+            for stripe in range(self.slots // STRIPE_SLOTS):
+                with self._locked(stripe):
+                    start = self._slot_offset(stripe * STRIPE_SLOTS)
+                    length = STRIPE_SLOTS * SLOT.size
+                    self._mapping[start : start + length] = bytes(length)
+
+
+shared_windows = SharedWindowTable()
+
+
+class SharedWindowThrottleMixin(SimpleRateThrottle):
+    # Replaces the cached timestamp history with an O(1) sliding-window counter
+    # in shared_windows. Cache keys and rate parsing are DRF's, so every scope
+    # in DEFAULT_THROTTLE_RATES works unchanged.
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        self.allowed, self.retry_after = shared_windows.hit(self.key, self.num_requests, self.duration, self.timer())
+        return self.allowed
+
+    def wait(self):
+        return self.retry_after
+
+
+class SharedAnonRateThrottle(AnonRateThrottle, SharedWindowThrottleMixin):
+    pass
+
+
+class SharedUserRateThrottle(UserRateThrottle, SharedWindowThrottleMixin):
+    pass
+
+
+class SharedScopedRateThrottle(ScopedRateThrottle, SharedWindowThrottleMixin):
+    pass
@@ -1,10 +1,23 @@
+from django.conf import settings
 from django.urls import include, path
 
-from api.views import HealthCheckAPIView
+from accounts.views import UserDirectoryAPIView
+from api.async_views import AsyncHealthCheckAPIView, AsyncLivenessAPIView, AsyncReadinessAPIView
+from api.views import HealthCheckAPIView, LivenessAPIView, MetricsAPIView, ReadinessAPIView
+
+if settings.API_VIEW_MODE == "async":
+    HealthView, LivenessView, ReadinessView = AsyncHealthCheckAPIView, AsyncLivenessAPIView, AsyncReadinessAPIView
+else:
+    HealthView, LivenessView, ReadinessView = HealthCheckAPIView, LivenessAPIView, ReadinessAPIView
 
 
 # -------- API Routes --------
 urlpatterns = [
-    path("health", HealthCheckAPIView.as_view(), name="health"),
+    path("health", HealthView.as_view(), name="health"),
+    # Load balancer probes: live never touches dependencies, ready serves the background prober's last result
+    path("health/live", LivenessView.as_view(), name="health-live"),
+    path("health/ready", ReadinessView.as_view(), name="health-ready"),
+    path("metrics", MetricsAPIView.as_view(), name="metrics"),
+    path("users", UserDirectoryAPIView.as_view(), name="users"),
     path("auth/", include("accounts.urls")),
 ]
@@ -0,0 +1,10 @@
+from __future__ import annotations
+
+import os
+import tempfile
+
+
+def shared_memory_path(name: str) -> str:
+    # Files every worker on the host can map; tmpfs when the host has one.
+    base = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(base, name)
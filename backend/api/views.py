@@ -1,10 +1,16 @@
 from __future__ import annotations
 
+from django.conf import settings
+from django.http import HttpResponse
 from django.utils import timezone
+from django.utils.crypto import constant_time_compare
 from rest_framework import permissions, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from api.health import health_prober
+from api.metrics import metrics_registry
+
 
 class HealthCheckAPIView(APIView):
     permission_classes = [permissions.AllowAny]
@@ -16,3 +22,57 @@ class HealthCheckAPIView(APIView):
             "timestamp": timezone.now().isoformat(),
         }
         return Response(payload, status=status.HTTP_200_OK)
+
+
+class LivenessAPIView(APIView):
+    # Answers from the worker alone; dependency failures belong to readiness.
+    authentication_classes = ()
+    permission_classes = [permissions.AllowAny]
+    throttle_classes = ()
+
+    def get(self, request, *args, **kwargs):
+        payload = {
+            "status": "ok",
+            "service": "backend",
+            "timestamp": timezone.now().isoformat(),
+        }
+        return Response(payload, status=status.HTTP_200_OK)
+
+
+class ReadinessAPIView(APIView):
+    authentication_classes = ()
+    permission_classes = [permissions.AllowAny]
+    throttle_classes = ()
+
+    def get(self, request, *args, **kwargs):
+        ready, payload = health_prober.readiness()
+        return Response(payload, status=status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE)
+
+
+class MetricsAPIView(APIView):
+    # Prometheus text exposition of api.metrics, summed over all workers on the host.
+    # Served to scrapers presenting METRICS_AUTH_TOKEN and to staff users; anonymously
+    # only while DEBUG is on and no token is configured.
+    permission_classes = [permissions.AllowAny]
+    throttle_classes = ()
+
+    def get_authenticators(self):
+        # The scrape token is not a JWT; only requests that do not carry it are authenticated.
+        token = getattr(settings, "METRICS_AUTH_TOKEN", "")
+        if token and self.has_scrape_token(self.request, token):
+            return []
+        return super().get_authenticators()
+
+    @staticmethod
+    def has_scrape_token(request, token: str) -> bool:
+        return constant_time_compare(request.headers.get("Authorization", ""), f"Bearer {token}")
+
+    def get(self, request, *args, **kwargs):
+        token = getattr(settings, "METRICS_AUTH_TOKEN", "")
+        if token:
+            allowed = self.has_scrape_token(request, token) or request.user.is_staff
+        else:
+            allowed = settings.DEBUG or request.user.is_staff
+        if not allowed:
+            return HttpResponse(status=status.HTTP_403_FORBIDDEN)
+        return HttpResponse(metrics_registry.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import os
+from contextlib import contextmanager
+
+
+def setup(**environ: str) -> None:
+    # Benchmarks run as `python -m benchmarks.<name>` from backend/ with the
+    # same environment as manage.py; `environ` overrides are applied before
+    # settings are imported.
+    os.environ.update(environ)
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "configs.settings")
+
+    import django
+
+    django.setup()
+
+    # Rate limits would turn a load test into a throttling test.
+    from rest_framework.views import APIView
+
+    APIView.throttle_classes = ()
+
+
+@contextmanager
+def test_database():
+    # Creates and migrates a throwaway test database (test_<DB_NAME>) so runs
+    # never touch real data.
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    setup_test_environment()
+    old_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    try:
+        yield connection
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import Counter
+
+from benchmarks import setup, test_database
+
+PASSWORD = "Benchmark#Pass-2026"
+ENDPOINTS = ("health", "login", "refresh", "register")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Drive configs.asgi in-process with concurrent requests and compare sync and async views."
+    )
+    parser.add_argument("--mode", choices=("sync", "async", "both"), default="both")
+    parser.add_argument("--endpoint", choices=ENDPOINTS, action="append", help="Repeatable (default: all).")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=500, help="Requests per endpoint.")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON.")
+    return parser.parse_args(argv)
+
+
+async def call(application, path: str, body: dict | None = None) -> tuple[int, bytes]:
+    payload = json.dumps(body).encode() if body is not None else b""
+    headers = [
+        (b"host", b"localhost"),
+        (b"content-type", b"application/json"),
+        (b"content-length", str(len(payload)).encode()),
+    ]
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST" if body is not None else "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "headers": headers,
+        "client": ("127.0.0.1", 50000),
+        "server": ("localhost", 80),
+    }
+    received = False
+
+    async def receive():
+        nonlocal received
+        if received:
+            await asyncio.Event().wait()
+        received = True
+        return {"type": "http.request", "body": payload, "more_body": False}
+
+    status_code, chunks = 0, []
+
+    async def send(message):
+        nonlocal status_code
+        if message["type"] == "http.response.start":
+            status_code = message["status"]
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    await application(scope, receive, send)
+    return status_code, b"".join(chunks)
+
+
+def make_request(endpoint: str, index: int, user_email: str, refresh_tokens: list[str]):
+    if endpoint == "health":
+        return "/api/health", None
+    if endpoint == "login":
+        return "/api/auth/login", {"email": user_email, "password": PASSWORD}
+    if endpoint == "refresh":
+        return "/api/auth/refresh", {"refresh": refresh_tokens[index]}
+    return "/api/auth/register", {"email": f"bench-{index}@example.com", "password": PASSWORD}
+
+
+async def run_endpoint(application, endpoint: str, total: int, concurrency: int, user_email: str, refresh_tokens):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, statuses = [], Counter()
+
+    async def one(index: int):
+        path, body = make_request(endpoint, index, user_email, refresh_tokens)
+        async with semaphore:
+            started = time.perf_counter()
+            status_code, _body = await call(application, path, body)
+            latencies.append(time.perf_counter() - started)
+        statuses[status_code] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(index) for index in range(total)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "endpoint": endpoint,
+        "requests": total,
+        "failures": sum(count for code, count in statuses.items() if code >= 400),
+        "statuses": {str(code): count for code, count in sorted(statuses.items())},
+        "seconds": round(elapsed, 3),
+        "throughput": round(total / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 2),
+        "p99_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000, 2),
+    }
+
+
+def run_mode(args) -> list[dict]:
+    setup()
+
+    from django.conf import settings
+    from django.core.asgi import get_asgi_application
+
+    from accounts.models import User
+    from accounts.services import build_auth_response
+
+    endpoints = args.endpoint or list(ENDPOINTS)
+    results = []
+    with test_database():
+        application = get_asgi_application()
+        user = User.objects.create_user(email="bench-login@example.com", password=PASSWORD)
+        refresh_tokens = []
+        if "refresh" in endpoints:
+            refresh_tokens = [build_auth_response(user)["tokens"]["refresh"] for _ in range(args.requests)]
+
+        for endpoint in endpoints:
+            result = asyncio.run(
+                run_endpoint(application, endpoint, args.requests, args.concurrency, user.email, refresh_tokens)
+            )
+            results.append({"mode": settings.API_VIEW_MODE, "concurrency": args.concurrency, **result})
+    return results
+
+
+def print_table(results: list[dict]) -> None:
+    # Login and register are bounded by PASSWORD_HASHING_WORKERS; 503s there
+    # mean the hashing pool shed load, not that the view failed.
+    print(f"{'mode':<6} {'endpoint':<9} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9}  statuses")
+    for row in results:
+        statuses = " ".join(f"{code}x{count}" for code, count in row["statuses"].items())
+        print(
+            f"{row['mode']:<6} {row['endpoint']:<9} {row['throughput']:>9} {row['p50_ms']:>9} "
+            f"{row['p99_ms']:>9}  {statuses}"
+        )
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    argv = list(sys.argv[1:] if argv is None else argv)
+
+    if args.mode != "both":
+        os.environ["API_VIEW_MODE"] = args.mode
+        results = run_mode(args)
+    else:
+        # URL routing is fixed at import time, so each mode runs in its own interpreter.
+        results = []
+        for mode in ("sync", "async"):
+            command = [sys.executable, "-m", "benchmarks.asgi_concurrency", *argv, "--mode", mode, "--json"]
+            output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+            results.extend(json.loads(output))
+
+    if args.json:
+        print(json.dumps(results))
+    else:
+        print_table(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import sys
+
+from benchmarks import runner, setup, test_database
+
+PASSWORD = "Benchmark#Pass-2026"
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Time and allocation baseline for the auth hot paths.")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.2, help="Minimum seconds per round.")
+    parser.add_argument("--filter", default="", help="Only run benchmarks whose name contains this text.")
+    parser.add_argument("--output", default="", help="Results file (default: benchmarks/results/auth-<timestamp>.json).")
+    parser.add_argument("--compare", default="", help="Previous results file to compare against.")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Allowed median slowdown before failing.")
+    return parser.parse_args(argv)
+
+
+def build_benchmarks() -> dict:
+    # name -> (fn, setup); setup runs untimed before every call.
+    from django.contrib.auth.password_validation import validate_password
+    from rest_framework.test import APIRequestFactory
+
+    from accounts.managers import UserManager
+    from accounts.models import User
+    from accounts.serializers import LoginSerializer, LogoutSerializer, RefreshTokenSerializer, RegisterSerializer
+    from accounts.services import build_auth_response
+    from accounts.tokens import AccessToken, RefreshToken
+
+    user = User.objects.create_user(email="bench-owner@example.com", password=PASSWORD)
+    access = str(RefreshToken.for_user(user).access_token)
+    request = APIRequestFactory().post("/")
+    request.user = user
+    counter = itertools.count()
+
+    def is_valid(serializer_class, data, context=None):
+        serializer = serializer_class(data=data, context=context or {})
+        assert serializer.is_valid(), serializer.errors
+
+    def fresh_refresh():
+        return (str(RefreshToken.for_user(user)),)
+
+    return {
+        "build_auth_response": (build_auth_response, lambda: (user,)),
+        "refresh_token_for_user": (RefreshToken.for_user, lambda: (user,)),
+        "access_token_decode": (AccessToken, lambda: (access,)),
+        "register_serializer_is_valid": (
+            lambda email: is_valid(RegisterSerializer, {"email": email, "password": PASSWORD}),
+            lambda: (f"Bench-{next(counter)}@Example.com",),
+        ),
+        "login_serializer_is_valid": (
+            lambda: is_valid(LoginSerializer, {"email": "Bench-Owner@example.com", "password": PASSWORD}, {"request": request}),
+            None,
+        ),
+        "refresh_serializer_is_valid": (
+            lambda refresh: is_valid(RefreshTokenSerializer, {"refresh": refresh}),
+            fresh_refresh,
+        ),
+        "logout_serializer_is_valid": (
+            lambda refresh: is_valid(LogoutSerializer, {"refresh": refresh}, {"request": request}),
+            fresh_refresh,
+        ),
+        "normalize_email_value": (UserManager.normalize_email_value, lambda: ("  Someone.Else@Example.COM ",)),
+        "validate_password": (validate_password, lambda: (PASSWORD, User(email="someone@example.com"))),
+    }
+
+
+def print_results(results: dict) -> None:
+    print(f"{'benchmark':<30} {'median µs':>12} {'min µs':>12} {'±':>9} {'net blocks':>11} {'peak KiB':>9}")
+    for name, row in results["benchmarks"].items():
+        print(
+            f"{name:<30} {row['median_us']:>12.1f} {row['min_us']:>12.1f} {row['stdev_us']:>9.1f} "
+            f"{row['alloc_net_blocks']:>11} {row['alloc_peak_kib']:>9}"
+        )
+
+
+def print_comparison(rows: list[dict]) -> None:
+    print(f"\n{'benchmark':<30} {'before µs':>12} {'after µs':>12} {'change':>8}  blocks")
+    for row in rows:
+        flag = "  REGRESSION" if row["regressed"] else ""
+        print(
+            f"{row['name']:<30} {row['before_us']:>12.1f} {row['after_us']:>12.1f} {row['change']:>+8.1%}  "
+            f"{row['blocks_before']} -> {row['blocks_after']}{flag}"
+        )
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    setup()
+
+    results = {"suite": "auth_hot_paths", "benchmarks": {}}
+    with test_database():
+        results["environment"] = runner.environment()
+        for name, (fn, prepare) in build_benchmarks().items():
+            if args.filter and args.filter not in name:
+                continue
+            results["benchmarks"][name] = runner.measure(fn, prepare, rounds=args.rounds, min_time=args.min_time)
+
+    path = runner.save(results, args.output, prefix="auth")
+    print_results(results)
+    print(f"\nSaved {path}")
+
+    if not args.compare:
+        return 0
+    with open(args.compare) as handle:
+        rows = runner.compare(json.load(handle), results, args.threshold)
+    print_comparison(rows)
+    return 1 if any(row["regressed"] for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+from benchmarks import runner, setup
+
+# How each mode prepares the database and serves requests. `legacy` is the
+# compose command; `fast` skips a no-op migrate, the admin apps and the
+# system checks that `migrate_if_needed` would have run had anything changed.
+MODES = {
+    "legacy": {
+        "migrate": ["manage.py", "migrate", "--noinput"],
+        "serve": ["manage.py", "runserver", "--noreload"],
+        "environ": {},
+    },
+    "fast": {
+        "migrate": ["manage.py", "migrate_if_needed"],
+        "serve": ["manage.py", "runserver", "--noreload", "--skip-checks"],
+        "environ": {"DJANGO_ADMIN_ENABLED": "0"},
+    },
+}
+IMPORT_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+# What a worker imports before it can route its first request.
+IMPORT_PROBE = "import django; django.setup(); from django.urls import get_resolver; get_resolver().url_patterns"
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description=(
+            "Container start to first 200 from /api/health, per startup mode, plus where import time goes. "
+            "The legacy mode runs migrate, so point DB_* at a disposable database."
+        )
+    )
+    parser.add_argument("--mode", choices=tuple(MODES), action="append", help="Repeatable (default: all).")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=15, help="Import-time rows to print per mode.")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Seconds to wait for the first 200.")
+    parser.add_argument("--output", default="", help="Results file (default: benchmarks/results/cold-start-<timestamp>.json).")
+    return parser.parse_args(argv)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def health_ok(port: int) -> bool:
+    # Host and X-Forwarded-Proto satisfy ALLOWED_HOSTS and SECURE_SSL_REDIRECT when DEBUG is off.
+    request = urllib.request.Request(
+        f"http://127.0.0.1:{port}/api/health", headers={"Host": "localhost", "X-Forwarded-Proto": "https"}
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=1) as response:
+            return response.status == 200
+    except (urllib.error.URLError, ConnectionError, TimeoutError):
+        return False
+
+
+def start_once(mode: str, timeout: float) -> dict:
+    spec = MODES[mode]
+    environ = {**os.environ, **spec["environ"]}
+    port = free_port()
+
+    started = time.perf_counter()
+    subprocess.run([sys.executable, *spec["migrate"]], check=True, env=environ, stdout=subprocess.DEVNULL)
+    migrated = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, *spec["serve"], f"127.0.0.1:{port}"],
+        env=environ,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        while not health_ok(port):
+            if server.poll() is not None:
+                raise RuntimeError(f"{mode}: server exited with {server.returncode} before serving /api/health")
+            if time.perf_counter() - started > timeout:
+                raise RuntimeError(f"{mode}: no 200 from /api/health within {timeout:.0f}s")
+            time.sleep(0.005)
+        ready = time.perf_counter()
+    finally:
+        server.terminate()
+        server.wait()
+    return {"migrate_ms": (migrated - started) * 1000, "serve_ms": (ready - migrated) * 1000, "total_ms": (ready - started) * 1000}
+
+
+def import_profile(mode: str) -> dict:
+    # `python -X importtime` self times, summed per module and per top-level
+    # package (django.contrib.* apps are kept apart since they are optional).
+    environ = {**os.environ, **MODES[mode]["environ"]}
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", IMPORT_PROBE], check=True, env=environ, capture_output=True, text=True
+    ).stderr
+    modules, packages = {}, {}
+    for line in stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match is None:
+            continue
+        self_us, name = int(match[1]), match[4]
+        parts = name.split(".")
+        package = ".".join(parts[:3]) if parts[:2] == ["django", "contrib"] else parts[0]
+        modules[name] = self_us / 1000
+        packages[package] = packages.get(package, 0.0) + self_us / 1000
+    return {
+        "total_ms": round(sum(modules.values()), 1),
+        "modules": len(modules),
+        "packages": {name: round(ms, 1) for name, ms in sorted(packages.items(), key=lambda item: -item[1])},
+        "slowest": {name: round(ms, 1) for name, ms in sorted(modules.items(), key=lambda item: -item[1])[:50]},
+    }
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    setup()
+
+    results = {"suite": "cold_start", "environment": runner.environment(), "benchmarks": {}, "imports": {}}
+    for mode in args.mode or list(MODES):
+        runs = [start_once(mode, args.timeout) for _ in range(args.runs)]
+        results["benchmarks"][mode] = {
+            key: round(statistics.median(run[key] for run in runs), 1) for key in ("migrate_ms", "serve_ms", "total_ms")
+        }
+        results["imports"][mode] = import_profile(mode)
+
+    path = runner.save(results, args.output, prefix="cold-start")
+    print(f"{'mode':<8} {'migrate ms':>11} {'serve ms':>10} {'total ms':>10} {'import ms':>10} {'modules':>8}")
+    for mode, row in results["benchmarks"].items():
+        imports = results["imports"][mode]
+        print(
+            f"{mode:<8} {row['migrate_ms']:>11.1f} {row['serve_ms']:>10.1f} {row['total_ms']:>10.1f} "
+            f"{imports['total_ms']:>10.1f} {imports['modules']:>8}"
+        )
+    for mode, imports in results["imports"].items():
+        print(f"\nImport time by package ({mode}):")
+        for name, ms in list(imports["packages"].items())[: args.top]:
+            print(f"  {name:<40} {ms:>8.1f} ms")
+    print(f"\nSaved {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
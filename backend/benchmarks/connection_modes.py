@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+MODES = ("direct", "persistent", "pool", "pgbouncer")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Requests per second for each DB_CONN_MODE against the configured PostgreSQL server."
+    )
+    parser.add_argument("--conn-mode", choices=MODES, action="append", help="Repeatable (default: direct, persistent, pool).")
+    parser.add_argument("--endpoint", choices=("health", "refresh"), action="append", help="Repeatable (default: refresh).")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=1000, help="Requests per endpoint.")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON.")
+    return parser.parse_args(argv)
+
+
+def run_conn_mode(conn_mode: str, args) -> list[dict]:
+    # Settings are read once at import, so every mode gets its own interpreter
+    # running the in-process ASGI driver with sync views.
+    command = [
+        sys.executable,
+        "-m",
+        "benchmarks.asgi_concurrency",
+        "--mode",
+        "sync",
+        "--concurrency",
+        str(args.concurrency),
+        "--requests",
+        str(args.requests),
+        "--json",
+    ]
+    for endpoint in args.endpoint or ["refresh"]:
+        command += ["--endpoint", endpoint]
+    environ = {**os.environ, "DB_CONN_MODE": conn_mode}
+    output = subprocess.run(command, check=True, capture_output=True, text=True, env=environ).stdout
+    return [{"conn_mode": conn_mode, **row} for row in json.loads(output)]
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    if os.environ.get("DB_ENGINE", "postgresql") != "postgresql":
+        sys.exit("DB_CONN_MODE only applies to PostgreSQL; unset DB_ENGINE.")
+
+    results = []
+    for conn_mode in args.conn_mode or ["direct", "persistent", "pool"]:
+        results.extend(run_conn_mode(conn_mode, args))
+
+    if args.json:
+        print(json.dumps(results))
+        return
+    print(f"{'conn mode':<11} {'endpoint':<9} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9}  statuses")
+    for row in results:
+        statuses = " ".join(f"{code}x{count}" for code, count in row["statuses"].items())
+        print(
+            f"{row['conn_mode']:<11} {row['endpoint']:<9} {row['throughput']:>9} {row['p50_ms']:>9} "
+            f"{row['p99_ms']:>9}  {statuses}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import sys
+import time
+
+from benchmarks import runner, setup, test_database
+
+PASSWORD = "Benchmark#Pass-2026"
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description=(
+            "A credential-stuffing run against LoginSerializer with the failed-login guard off and on: "
+            "password hashes computed, hashes avoided, CPU time, and refusal latency for existing versus "
+            "unknown emails. Uses the configured PASSWORD_HASHERS, since hashing is the cost being avoided."
+        )
+    )
+    parser.add_argument("--attempts", type=int, default=200, help="Wrong-password logins per mode.")
+    parser.add_argument("--emails", type=int, default=10, help="Targeted emails; half of them have accounts.")
+    parser.add_argument("--networks", type=int, default=50, help="Distinct /24 networks the attempts come from.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="", help="Results file (default: benchmarks/results/stuffing-<timestamp>.json).")
+    return parser.parse_args(argv)
+
+
+def attack(args, emails: list[str], existing: set[str]) -> dict:
+    from rest_framework.exceptions import AuthenticationFailed, Throttled
+    from rest_framework.test import APIRequestFactory
+
+    from accounts.login_guard import login_guard
+    from accounts.serializers import LoginSerializer
+
+    factory = APIRequestFactory()
+    generator = random.Random(args.seed)
+    outcomes = {"rejected": 0, "refused": 0}
+    refusal_ms = {"existing": [], "unknown": []}
+
+    cpu_started, wall_started = time.process_time(), time.perf_counter()
+    for _ in range(args.attempts):
+        email = generator.choice(emails)
+        address = f"10.{generator.randrange(args.networks)}.0.{generator.randrange(1, 255)}"
+        request = factory.post("/api/auth/login", REMOTE_ADDR=address)
+        serializer = LoginSerializer(data={"email": email, "password": "Wrong#Guess-1"}, context={"request": request})
+        started = time.perf_counter()
+        try:
+            serializer.is_valid(raise_exception=True)
+        except Throttled:
+            outcomes["refused"] += 1
+            refusal_ms["existing" if email in existing else "unknown"].append((time.perf_counter() - started) * 1000)
+        except AuthenticationFailed:
+            outcomes["rejected"] += 1
+    cpu, wall = time.process_time() - cpu_started, time.perf_counter() - wall_started
+
+    stats = login_guard.stats()
+    return {
+        **outcomes,
+        "hashes": outcomes["rejected"],
+        "hashes_avoided": stats["hashes_avoided"] if stats["enabled"] else 0,
+        "cpu_seconds": round(cpu, 3),
+        "wall_seconds": round(wall, 3),
+        "cpu_ms_per_attempt": round(cpu / args.attempts * 1000, 3),
+        "refusal_median_ms": {
+            kind: round(statistics.median(samples), 4) if samples else None for kind, samples in refusal_ms.items()
+        },
+    }
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    setup()
+
+    from django.test import override_settings
+
+    from accounts.login_guard import failure_windows, login_guard
+    from accounts.models import User
+
+    emails = [f"target-{index}@example.com" for index in range(args.emails)]
+    existing = set(emails[::2])
+    results = {"suite": "credential_stuffing", "config": vars(args), "modes": {}}
+    with test_database():
+        results["environment"] = runner.environment()
+        for email in existing:
+            User.objects.create_user(email=email, password=PASSWORD)
+        for mode, enabled in (("guard_off", False), ("guard_on", True)):
+            failure_windows.reset()
+            login_guard.reset()
+            # Hash inline, so the hashing shows up in this process's CPU time.
+            with override_settings(LOGIN_GUARD_ENABLED=enabled, PASSWORD_HASHING_WORKERS=0):
+                results["modes"][mode] = attack(args, emails, existing)
+
+    path = runner.save(results, args.output, prefix="stuffing")
+    print(f"{'mode':<10} {'hashes':>7} {'avoided':>8} {'cpu s':>8} {'ms/attempt':>11}  refusal median ms (existing / unknown)")
+    for mode, row in results["modes"].items():
+        medians = row["refusal_median_ms"]
+        print(
+            f"{mode:<10} {row['hashes']:>7} {row['hashes_avoided']:>8} {row['cpu_seconds']:>8} "
+            f"{row['cpu_ms_per_attempt']:>11}  {medians['existing']} / {medians['unknown']}"
+        )
+    print(f"\nSaved {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import asyncio
+import json
+
+# Host and X-Forwarded-Proto satisfy ALLOWED_HOSTS and SECURE_SSL_REDIRECT when DEBUG is off.
+DEFAULT_HEADERS = {"Host": "localhost", "X-Forwarded-Proto": "https"}
+
+
+async def fetch(
+    host: str, port: int, method: str, path: str, body: dict | None = None, headers: dict | None = None
+) -> tuple[int, bytes]:
+    # Minimal HTTP/1.1 client on asyncio streams: one connection per request,
+    # closed by the server, so no client-side pooling skews the comparison.
+    payload = json.dumps(body).encode() if body is not None else b""
+    lines = [f"{method} {path} HTTP/1.1", "Connection: close", f"Content-Length: {len(payload)}"]
+    if body is not None:
+        lines.append("Content-Type: application/json")
+    lines += [f"{name}: {value}" for name, value in {**DEFAULT_HEADERS, **(headers or {})}.items()]
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode() + payload)
+        await writer.drain()
+        response = await reader.read()
+    finally:
+        writer.close()
+    head, _, content = response.partition(b"\r\n\r\n")
+    status_line = head.split(b"\r\n", 1)[0]
+    status_code = int(status_line.split()[1]) if status_line else 0
+    if b"transfer-encoding: chunked" in head.lower():
+        content = _dechunk(content)
+    return status_code, content
+
+
+def _dechunk(data: bytes) -> bytes:
+    chunks = []
+    while data:
+        size_line, _, data = data.partition(b"\r\n")
+        size = int(size_line.split(b";")[0] or b"0", 16)
+        if size == 0:
+            break
+        chunks.append(data[:size])
+        data = data[size + 2 :]
+    return b"".join(chunks)
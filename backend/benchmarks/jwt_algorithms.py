@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import argparse
+import io
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks import runner, setup
+
+ALGORITHMS = ("HS256", "RS256", "EdDSA")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Access-token signing and verification cost per JWT_ALGORITHM.")
+    parser.add_argument("--algorithm", choices=ALGORITHMS, action="append", help="Repeatable (default: all).")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.2, help="Minimum seconds per round.")
+    parser.add_argument("--output", default="", help="Results file (default: benchmarks/results/jwt-<timestamp>.json).")
+    return parser.parse_args(argv)
+
+
+def measure_algorithm(algorithm: str, directory: str, rounds: int, min_time: float) -> dict:
+    import jwt
+    from django.core.management import call_command
+    from django.test import override_settings
+
+    from accounts.keys import key_ring
+    from accounts.tokens import token_backend
+
+    if algorithm != "HS256":
+        call_command(
+            "generate_jwt_key", f"--algorithm={algorithm}", "--kid=bench", f"--directory={directory}", stdout=io.StringIO()
+        )
+    with override_settings(JWT_ALGORITHM=algorithm, JWT_KEYS_DIR=directory, JWT_ACTIVE_KID=""):
+        key_ring.reset()
+        payload = {"token_type": "access", "exp": int(time.time()) + 900, "jti": "0" * 32, "user_id": "bench"}
+        token = token_backend.encode(payload)
+        rows = {
+            "sign": runner.measure(token_backend.encode, lambda: (payload,), rounds=rounds, min_time=min_time),
+            "verify": runner.measure(token_backend.decode, lambda: (token,), rounds=rounds, min_time=min_time),
+        }
+        if algorithm != "HS256":
+            # What every call would cost if the PEM were parsed per token instead of once per process.
+            pem = Path(directory, "bench.pem").read_bytes()
+            rows["sign_pem_per_call"] = runner.measure(
+                lambda: jwt.encode(payload, pem, algorithm=algorithm), rounds=rounds, min_time=min_time
+            )
+        rows["token_bytes"] = len(token)
+    key_ring.reset()
+    return rows
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    setup()
+
+    results = {"suite": "jwt_algorithms", "environment": runner.environment(), "benchmarks": {}}
+    for algorithm in args.algorithm or ALGORITHMS:
+        with tempfile.TemporaryDirectory() as directory:
+            rows = measure_algorithm(algorithm, directory, args.rounds, args.min_time)
+        token_bytes = rows.pop("token_bytes")
+        for operation, row in rows.items():
+            results["benchmarks"][f"{algorithm}:{operation}"] = {**row, "token_bytes": token_bytes}
+
+    path = runner.save(results, args.output, prefix="jwt")
+    print(f"{'benchmark':<26} {'median µs':>12} {'min µs':>12} {'±':>9} {'token bytes':>12}")
+    for name, row in results["benchmarks"].items():
+        print(f"{name:<26} {row['median_us']:>12.1f} {row['min_us']:>12.1f} {row['stdev_us']:>9.1f} {row['token_bytes']:>12}")
+    print(f"\nSaved {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
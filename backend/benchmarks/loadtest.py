@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import base64
+import json
+import random
+import sys
+import time
+import uuid
+from collections import Counter, defaultdict
+from urllib.parse import urlsplit
+
+from benchmarks import runner
+from benchmarks.http_client import fetch
+
+PASSWORD = "Loadtest#Pass-2026"
+ENDPOINTS = ("register", "login", "refresh", "logout")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description=(
+            "Open-loop load test of the auth flow against a running server. Each session logs in (registering "
+            "its user first if needed), refreshes once per access-token lifetime and logs out. Rate limits "
+            "apply as configured; serve with DJANGO_SETTINGS_MODULE=benchmarks.server_settings to lift them."
+        )
+    )
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="Server base URL.")
+    parser.add_argument(
+        "--arrival-rate",
+        type=float,
+        action="append",
+        help="New sessions per second (Poisson arrivals); repeat to step through rates (default: 1).",
+    )
+    parser.add_argument("--duration", type=float, default=60.0, help="Seconds of arrivals per rate step.")
+    parser.add_argument("--users", type=int, default=1000, help="Virtual users; each registers once, then only logs in.")
+    parser.add_argument("--session-length", type=float, default=3600.0, help="Seconds a session stays logged in.")
+    parser.add_argument("--refresh-every", type=float, default=0.0, help="Seconds between refreshes (default: access-token lifetime).")
+    parser.add_argument(
+        "--time-scale",
+        type=float,
+        default=60.0,
+        help="Divides session length and refresh interval, so an hour-long session takes a minute (default: 60).",
+    )
+    parser.add_argument("--timeout", type=float, default=30.0, help="Seconds before a request counts as a timeout.")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--output", default="", help="Results file (default: benchmarks/results/loadtest-<timestamp>.json).")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON instead of a table.")
+    return parser.parse_args(argv)
+
+
+def token_lifetime(access: str) -> float:
+    # exp - iat from the unverified payload; only used to pace refreshes.
+    payload = access.split(".")[1]
+    claims = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+    return float(claims["exp"] - claims["iat"])
+
+
+def percentile(ordered: list[float], fraction: float) -> float:
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] if ordered else 0.0
+
+
+class VirtualUser:
+    __slots__ = ("email", "registered")
+
+    def __init__(self, email: str):
+        self.email = email
+        self.registered = False
+
+
+class LoadTest:
+    def __init__(self, args):
+        self.args = args
+        target = urlsplit(args.url)
+        self.host, self.port = target.hostname or "127.0.0.1", target.port or 80
+        run_id = uuid.uuid4().hex[:8]
+        self.users = [VirtualUser(f"loadtest-{run_id}-{index}@example.com") for index in range(args.users)]
+        self.refresh_every = args.refresh_every
+        self.reset()
+
+    def reset(self) -> None:
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.statuses: dict[str, Counter] = defaultdict(Counter)
+        self.sessions = Counter()
+        self.active = 0
+        self.peak_active = 0
+
+    async def call(self, endpoint: str, method: str, path: str, body=None, access: str | None = None):
+        headers = {"Authorization": f"Bearer {access}"} if access else None
+        started = time.perf_counter()
+        try:
+            status, content = await asyncio.wait_for(
+                fetch(self.host, self.port, method, path, body, headers), self.args.timeout
+            )
+            outcome = str(status)
+        except asyncio.TimeoutError:
+            status, content, outcome = 0, b"", "timeout"
+        except (OSError, ValueError, IndexError):
+            status, content, outcome = 0, b"", "connection_error"
+        self.latencies[endpoint].append(time.perf_counter() - started)
+        self.statuses[endpoint][outcome] += 1
+        return status, content
+
+    async def session(self, user: VirtualUser) -> str:
+        credentials = {"email": user.email, "password": PASSWORD}
+        if not user.registered:
+            status, _ = await self.call("register", "POST", "/api/auth/register", credentials)
+            if status not in (201, 400):
+                return "register_failed"
+            # 400 means a concurrent session of the same user registered it first.
+            user.registered = True
+
+        status, content = await self.call("login", "POST", "/api/auth/login", credentials)
+        if status != 200:
+            return "login_failed"
+        tokens = json.loads(content)["tokens"]
+        if not self.refresh_every:
+            self.refresh_every = token_lifetime(tokens["access"])
+
+        scale = self.args.time_scale
+        loop = asyncio.get_running_loop()
+        ends_at = loop.time() + self.args.session_length / scale
+        while loop.time() + self.refresh_every / scale < ends_at:
+            await asyncio.sleep(self.refresh_every / scale)
+            status, content = await self.call("refresh", "POST", "/api/auth/refresh", {"refresh": tokens["refresh"]})
+            if status != 200:
+                return "refresh_failed"
+            tokens.update(json.loads(content))
+        await asyncio.sleep(max(0.0, ends_at - loop.time()))
+
+        status, _ = await self.call("logout", "POST", "/api/auth/logout", {"refresh": tokens["refresh"]}, tokens["access"])
+        return "completed" if status == 200 else "logout_failed"
+
+    async def tracked_session(self, user: VirtualUser) -> None:
+        self.active += 1
+        self.peak_active = max(self.peak_active, self.active)
+        try:
+            self.sessions[await self.session(user)] += 1
+        except Exception:
+            self.sessions["client_error"] += 1
+        finally:
+            self.active -= 1
+
+    async def step(self, rate: float) -> dict:
+        # Open loop: sessions arrive at `rate` whatever the server's latency,
+        # so a slow server accumulates sessions instead of hiding its backlog.
+        self.reset()
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        deadline = started + self.args.duration
+        tasks = set()
+        while True:
+            await asyncio.sleep(random.expovariate(rate))
+            if loop.time() >= deadline:
+                break
+            task = asyncio.create_task(self.tracked_session(random.choice(self.users)))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+            self.sessions["started"] += 1
+        while tasks:
+            await asyncio.gather(*list(tasks))
+        elapsed = loop.time() - started
+        return {
+            "arrival_rate": rate,
+            "seconds": round(elapsed, 3),
+            "peak_sessions": self.peak_active,
+            "sessions": dict(self.sessions),
+            "endpoints": {endpoint: self.summary(endpoint, elapsed) for endpoint in ENDPOINTS if endpoint in self.latencies},
+        }
+
+    def summary(self, endpoint: str, elapsed: float) -> dict:
+        ordered = sorted(self.latencies[endpoint])
+        statuses = self.statuses[endpoint]
+        ok = sum(count for outcome, count in statuses.items() if outcome.isdigit() and int(outcome) < 400)
+        return {
+            "requests": len(ordered),
+            "ok": ok,
+            "errors": len(ordered) - ok,
+            "throughput": round(len(ordered) / elapsed, 2),
+            "p50_ms": round(percentile(ordered, 0.50) * 1000, 2),
+            "p95_ms": round(percentile(ordered, 0.95) * 1000, 2),
+            "p99_ms": round(percentile(ordered, 0.99) * 1000, 2),
+            "max_ms": round(ordered[-1] * 1000, 2),
+            "statuses": dict(sorted(statuses.items())),
+        }
+
+
+async def run(args) -> list[dict]:
+    load_test = LoadTest(args)
+    return [await load_test.step(rate) for rate in args.arrival_rate or [1.0]]
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    random.seed(args.seed)
+
+    results = {
+        "suite": "loadtest",
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "json")},
+        "steps": asyncio.run(run(args)),
+    }
+    path = runner.save(results, args.output, prefix="loadtest")
+
+    if args.json:
+        print(json.dumps(results))
+        return 0
+    print(f"{'rate/s':>7} {'endpoint':<9} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}  statuses")
+    for step in results["steps"]:
+        for endpoint, row in step["endpoints"].items():
+            statuses = " ".join(f"{outcome}x{count}" for outcome, count in row["statuses"].items())
+            print(
+                f"{step['arrival_rate']:>7g} {endpoint:<9} {row['throughput']:>8} {row['p50_ms']:>9} "
+                f"{row['p95_ms']:>9} {row['p99_ms']:>9}  {statuses}"
+            )
+        sessions = " ".join(f"{outcome}={count}" for outcome, count in step["sessions"].items())
+        print(f"{'':>7} sessions: {sessions}, peak concurrent {step['peak_sessions']}")
+    print(f"\nSaved {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks import setup, test_database
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Per-request cost of RequestMetricsMiddleware.")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--queries", type=int, default=3, help="Queries issued by the database-bound view.")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON.")
+    return parser.parse_args(argv)
+
+
+def per_request_us(handler, request_factory, total: int) -> float:
+    for _ in range(min(total // 10, 200)):
+        handler(request_factory())
+    started = time.perf_counter()
+    for _ in range(total):
+        handler(request_factory())
+    return (time.perf_counter() - started) / total * 1_000_000
+
+
+def instrument(view):
+    from api.metrics import RequestMetricsMiddleware
+
+    # Mirrors BaseHandler: process_view runs inside the middleware call.
+    def get_response(request):
+        middleware.process_view(request, view, (), {})
+        return view(request)
+
+    middleware = RequestMetricsMiddleware(get_response)
+    return middleware
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    directory = tempfile.TemporaryDirectory()
+    setup(METRICS_DIR=str(Path(directory.name) / "metrics"))
+
+    from django.db import connection
+    from django.test import RequestFactory
+
+    from api.views import LivenessAPIView
+
+    def database_view(request):
+        with connection.cursor() as cursor:
+            for _ in range(args.queries):
+                cursor.execute("SELECT 1")
+                cursor.fetchone()
+        return LivenessAPIView.as_view()(request)
+
+    views = {"liveness": LivenessAPIView.as_view(), f"{args.queries}_queries": database_view}
+    factory = RequestFactory()
+
+    def make_request():
+        return factory.get("/api/health/live")
+
+    results = []
+    with test_database():
+        for name, view in views.items():
+            instrumented = instrument(view)
+            baseline = per_request_us(view, make_request, args.requests)
+            measured = per_request_us(instrumented, make_request, args.requests)
+            results.append(
+                {
+                    "view": name,
+                    "baseline_us": round(baseline, 2),
+                    "with_metrics_us": round(measured, 2),
+                    "overhead_us": round(measured - baseline, 2),
+                }
+            )
+    directory.cleanup()
+
+    if args.json:
+        print(json.dumps(results))
+        return
+    print(f"{'view':<12} {'baseline µs':>12} {'metrics µs':>11} {'overhead µs':>12}")
+    for row in results:
+        print(f"{row['view']:<12} {row['baseline_us']:>12} {row['with_metrics_us']:>11} {row['overhead_us']:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import argparse
+import sys
+
+from benchmarks import runner, setup
+
+# MIDDLEWARE before PathScopedMiddleware: every request ran the admin's stack.
+FLAT_MIDDLEWARE = [
+    "api.metrics.RequestMetricsMiddleware",
+    "api.routers.ReplicaRoutingMiddleware",
+    "corsheaders.middleware.CorsMiddleware",
+    "django.middleware.security.SecurityMiddleware",
+    "django.contrib.sessions.middleware.SessionMiddleware",
+    "django.middleware.common.CommonMiddleware",
+    "django.middleware.csrf.CsrfViewMiddleware",
+    "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "django.contrib.messages.middleware.MessageMiddleware",
+    "django.middleware.clickjacking.XFrameOptionsMiddleware",
+]
+PATHS = ("/api/health/live", "/api/auth/.well-known/jwks.json")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Per-request middleware cost on /api/: flat MIDDLEWARE versus PathScopedMiddleware."
+    )
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.5, help="Minimum seconds per round.")
+    parser.add_argument("--output", default="", help="Results file (default: benchmarks/results/middleware-<timestamp>.json).")
+    return parser.parse_args(argv)
+
+
+def build_handler(middleware: list[str]):
+    from django.core.handlers.wsgi import WSGIHandler
+    from django.test import override_settings
+
+    with override_settings(MIDDLEWARE=middleware):
+        return WSGIHandler()
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    setup()
+
+    from django.conf import settings
+    from django.test import RequestFactory
+
+    factory = RequestFactory()
+    origin = settings.CORS_ALLOWED_ORIGINS[0]
+    stacks = {"flat": build_handler(FLAT_MIDDLEWARE), "scoped": build_handler(settings.MIDDLEWARE)}
+    results = {"suite": "middleware_stack", "environment": runner.environment(), "benchmarks": {}}
+    for path in PATHS:
+        headers = {}
+        for name, handler in stacks.items():
+            # Live probe and JWKS never touch the database, so the difference is the middleware.
+            def request(path=path):
+                return (factory.get(path, HTTP_ORIGIN=origin, secure=True),)
+
+            response = handler.get_response(request()[0])
+            headers[name] = sorted((key, value) for key, value in response.items() if key != "Date")
+            row = runner.measure(handler.get_response, request, rounds=args.rounds, min_time=args.min_time)
+            results["benchmarks"][f"{name}:{path}"] = {**row, "status": response.status_code}
+        if headers["flat"] != headers["scoped"]:
+            print(f"Response headers differ on {path}:\n  flat   {headers['flat']}\n  scoped {headers['scoped']}")
+
+    saved_to = runner.save(results, args.output, prefix="middleware")
+    print(f"{'benchmark':<44} {'median µs':>12} {'min µs':>12} {'±':>9}")
+    for name, row in results["benchmarks"].items():
+        print(f"{name:<44} {row['median_us']:>12.1f} {row['min_us']:>12.1f} {row['stdev_us']:>9.1f}")
+    for path in PATHS:
+        saved = results["benchmarks"][f"flat:{path}"]["median_us"] - results["benchmarks"][f"scoped:{path}"]["median_us"]
+        print(f"Saved per request on {path}: {saved:.1f} µs")
+    print(f"\nSaved {saved_to}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
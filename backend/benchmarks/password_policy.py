@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import argparse
+import json
+import subprocess
+import sys
+import time
+
+from benchmarks import runner, setup
+
+DJANGO_VALIDATORS = [
+    {"NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator"},
+    {"NAME": "django.contrib.auth.password_validation.MinimumLengthValidator"},
+    {"NAME": "django.contrib.auth.password_validation.CommonPasswordValidator"},
+    {"NAME": "django.contrib.auth.password_validation.NumericPasswordValidator"},
+]
+EMAIL = "jane.doe.benchmark@example.com"
+PASSWORDS = {
+    "typical": "Benchmark#Pass-2026",
+    # Close in length to the email, so the similarity check cannot be skipped.
+    "email_length": "Qv8#mZt2-Lp0@wRk5.Yh3-Nd7xE",
+    "long": "Bench#" + "x7Kq" * 256,
+}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description=(
+            "Password validation latency: Django's validators versus accounts.password_policy, on the first "
+            "call in a fresh worker (cold) and once warmed up."
+        )
+    )
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.5, help="Minimum seconds per round.")
+    parser.add_argument("--cold-runs", type=int, default=5, help="Fresh processes per policy for the first call.")
+    parser.add_argument("--probe", choices=("django", "policy"), help=argparse.SUPPRESS)
+    parser.add_argument("--output", default="", help="Results file (default: benchmarks/results/password-policy-<timestamp>.json).")
+    return parser.parse_args(argv)
+
+
+def validators(policy: str):
+    from django.test import override_settings
+
+    # override_settings drops Django's cached validator instances, so the
+    # django policy starts from nothing, as it did before the app-ready warm-up.
+    return override_settings(AUTH_PASSWORD_VALIDATORS=DJANGO_VALIDATORS) if policy == "django" else override_settings()
+
+
+def probe(policy: str) -> None:
+    # One fresh worker: settings and apps are loaded (as in a forked worker), then the first validation.
+    setup()
+
+    from accounts.models import User
+    from accounts.password_policy import password_policy
+
+    with validators(policy):
+        started = time.perf_counter()
+        password_policy.validate(PASSWORDS["typical"], user=User(email=EMAIL))
+        print(json.dumps({"first_call_ms": (time.perf_counter() - started) * 1000}))
+
+
+def cold(policy: str, runs: int) -> dict:
+    samples = []
+    for _ in range(runs):
+        completed = subprocess.run(
+            [sys.executable, "-m", "benchmarks.password_policy", "--probe", policy], capture_output=True, text=True, check=True
+        )
+        samples.append(json.loads(completed.stdout.splitlines()[-1])["first_call_ms"])
+    samples.sort()
+    return {"runs": runs, "median_ms": round(samples[len(samples) // 2], 3), "min_ms": round(samples[0], 3)}
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    if args.probe:
+        probe(args.probe)
+        return 0
+    setup()
+
+    from accounts.models import User
+    from accounts.password_policy import password_policy
+
+    results = {"suite": "password_policy", "environment": runner.environment(), "cold": {}, "warm": {}}
+    user = User(email=EMAIL)
+    for policy in ("django", "policy"):
+        results["cold"][policy] = cold(policy, args.cold_runs)
+        with validators(policy):
+            password_policy.warm()
+            for name, password in PASSWORDS.items():
+                row = runner.measure(
+                    password_policy.validate, lambda password=password: (password, user), rounds=args.rounds, min_time=args.min_time
+                )
+                results["warm"][f"{policy}:{name}"] = row
+
+    path = runner.save(results, args.output, prefix="password-policy")
+    print(f"{'cold start':<26} {'median ms':>12} {'min ms':>12}")
+    for policy, row in results["cold"].items():
+        print(f"{policy:<26} {row['median_ms']:>12.3f} {row['min_ms']:>12.3f}")
+    print(f"\n{'warm':<26} {'median µs':>12} {'min µs':>12} {'±':>9}")
+    for name, row in results["warm"].items():
+        print(f"{name:<26} {row['median_us']:>12.1f} {row['min_us']:>12.1f} {row['stdev_us']:>9.1f}")
+    print(f"\nSaved {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
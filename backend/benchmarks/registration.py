@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import argparse
+import itertools
+import sys
+
+from benchmarks import runner, setup, test_database
+
+PASSWORD = "Benchmark#Pass-2026"
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Queries and latency of registration: exists() + create_user() versus one INSERT ... ON CONFLICT."
+    )
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.5, help="Minimum seconds per round.")
+    parser.add_argument(
+        "--real-hasher",
+        action="store_true",
+        help="Keep the configured PASSWORD_HASHERS; by default MD5 is used so hashing does not hide the database work.",
+    )
+    parser.add_argument("--output", default="", help="Results file (default: benchmarks/results/registration-<timestamp>.json).")
+    return parser.parse_args(argv)
+
+
+def build_flows() -> dict:
+    from django.contrib.auth.password_validation import validate_password
+    from django.db import IntegrityError, transaction
+    from rest_framework import serializers
+
+    from accounts.models import User
+    from accounts.serializers import RegisterSerializer
+
+    def legacy(email: str):
+        # The flow before the lower(email) constraint: normalize + exists() in
+        # validate_email, validate the password, then create_user() normalizes
+        # and validates again inside a savepoint that maps IntegrityError.
+        email = User.objects.normalize_email_value(email)
+        if User.objects.filter(email=email).exists():
+            raise serializers.ValidationError({"email": ["A user with this email already exists."]})
+        validate_password(PASSWORD, user=User(email=email))
+        try:
+            with transaction.atomic():
+                return User.objects.create_user(email=email, password=PASSWORD)
+        except IntegrityError as exc:
+            raise serializers.ValidationError({"email": ["A user with this email already exists."]}) from exc
+
+    def single_insert(email: str):
+        serializer = RegisterSerializer(data={"email": email, "password": PASSWORD})
+        serializer.is_valid(raise_exception=True)
+        return serializer.save()
+
+    return {"exists_then_create_user": legacy, "insert_on_conflict": single_insert}
+
+
+def count_queries(fn, email: str) -> int:
+    from django.db import connection, reset_queries
+    from django.test.utils import CaptureQueriesContext
+
+    # A full query log (9000 entries) would make the captured slice empty.
+    reset_queries()
+    with CaptureQueriesContext(connection) as captured:
+        fn(email)
+    return len(captured.captured_queries)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    setup()
+
+    from django.test import override_settings
+
+    overrides = {} if args.real_hasher else {
+        "PASSWORD_HASHERS": ["django.contrib.auth.hashers.MD5PasswordHasher"],
+        "PASSWORD_HASHING_WORKERS": 0,
+    }
+    results = {"suite": "registration", "benchmarks": {}}
+    counter = itertools.count()
+    with override_settings(**overrides), test_database():
+        results["environment"] = runner.environment()
+        for name, fn in build_flows().items():
+            row = runner.measure(fn, lambda: (f"Bench-{next(counter)}@Example.com",), rounds=args.rounds, min_time=args.min_time)
+            row["queries"] = count_queries(fn, f"Bench-{next(counter)}@Example.com")
+            results["benchmarks"][name] = row
+
+    path = runner.save(results, args.output, prefix="registration")
+    print(f"{'flow':<26} {'queries':>8} {'median µs':>12} {'min µs':>12} {'±':>9}")
+    for name, row in results["benchmarks"].items():
+        print(f"{name:<26} {row['queries']:>8} {row['median_us']:>12.1f} {row['min_us']:>12.1f} {row['stdev_us']:>9.1f}")
+    print(f"\nSaved {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
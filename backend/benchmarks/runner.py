@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+import tracemalloc
+from pathlib import Path
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+
+def _run(fn, setup, number: int) -> float:
+    # Only the call itself is timed; setup() prepares fresh arguments (e.g. an
+    # unused refresh token) for every call.
+    total = 0.0
+    for _ in range(number):
+        args = setup() if setup else ()
+        started = time.perf_counter()
+        fn(*args)
+        total += time.perf_counter() - started
+    return total
+
+
+def _allocations(fn, setup, calls: int) -> dict:
+    # Net blocks still allocated after the calls (what a call leaves behind in
+    # caches, querysets, ...) and the peak of traced memory during them.
+    argument_sets = [setup() if setup else () for _ in range(calls)]
+    ignore = (tracemalloc.Filter(False, tracemalloc.__file__),)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot().filter_traces(ignore)
+        baseline, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        for args in argument_sets:
+            fn(*args)
+        _, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot().filter_traces(ignore)
+    finally:
+        tracemalloc.stop()
+    blocks = sum(stat.count_diff for stat in after.compare_to(before, "filename"))
+    return {
+        "alloc_net_blocks": round(blocks / calls, 1),
+        "alloc_peak_kib": round(max(peak - baseline, 0) / 1024, 1),
+    }
+
+
+def measure(fn, setup=None, rounds: int = 5, min_time: float = 0.2, max_number: int = 100_000) -> dict:
+    _run(fn, setup, 1)
+    number = 1
+    while True:
+        elapsed = _run(fn, setup, number)
+        if elapsed >= min_time or number >= max_number:
+            break
+        number = min(max_number, number * 2 if elapsed <= 0 else max(number * 2, int(number * min_time / elapsed)))
+
+    per_call = [_run(fn, setup, number) / number * 1_000_000 for _ in range(rounds)]
+    return {
+        "number": number,
+        "rounds": rounds,
+        "min_us": round(min(per_call), 3),
+        "median_us": round(statistics.median(per_call), 3),
+        "stdev_us": round(statistics.pstdev(per_call), 3),
+        **_allocations(fn, setup, min(number, 20)),
+    }
+
+
+def environment() -> dict:
+    import django
+    from django.conf import settings
+    from django.db import connection
+
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = ""
+    return {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "commit": commit,
+        "host": platform.node(),
+        "cpu_count": os.cpu_count(),
+        "python": platform.python_version(),
+        "django": django.get_version(),
+        "database": connection.vendor,
+        "password_hasher": settings.PASSWORD_HASHERS[0].rsplit(".", 1)[-1],
+    }
+
+
+def save(results: dict, output: str = "", prefix: str = "run") -> Path:
+    path = Path(output) if output else RESULTS_DIR / f"{prefix}-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(results, indent=2) + "\n")
+    return path
+
+
+def compare(previous: dict, current: dict, threshold: float) -> list[dict]:
+    # A benchmark regresses when its median grows by more than `threshold`
+    # (a fraction) and by more than three standard deviations of both runs.
+    rows = []
+    for name, result in current["benchmarks"].items():
+        before = previous["benchmarks"].get(name)
+        if before is None:
+            continue
+        change = result["median_us"] / before["median_us"] - 1 if before["median_us"] else 0.0
+        noise = 3 * max(result["stdev_us"], before["stdev_us"])
+        regressed = change > threshold and result["median_us"] - before["median_us"] > noise
+        rows.append(
+            {
+                "name": name,
+                "before_us": before["median_us"],
+                "after_us": result["median_us"],
+                "change": round(change, 4),
+                "blocks_before": before["alloc_net_blocks"],
+                "blocks_after": result["alloc_net_blocks"],
+                "regressed": regressed,
+            }
+        )
+    return rows
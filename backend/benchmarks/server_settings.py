@@ -0,0 +1,6 @@
+# Settings for servers started by the benchmarks: the project settings with rate
+# limits off, since a load test should measure the server rather than the throttle.
+from configs.settings import *  # noqa: F401,F403
+from configs.settings import REST_FRAMEWORK
+
+REST_FRAMEWORK = {**REST_FRAMEWORK, 'DEFAULT_THROTTLE_CLASSES': ()}
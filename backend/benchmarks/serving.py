@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+from collections import Counter
+
+from benchmarks.http_client import fetch
+
+PASSWORD = "Benchmark#Pass-2026"
+SERVERS = {
+    "runserver": lambda port: ["manage.py", "runserver", "--noreload", f"127.0.0.1:{port}"],
+    "gunicorn": lambda port: ["-m", "gunicorn", "-c", "configs/gunicorn.py", "--bind", f"127.0.0.1:{port}"],
+}
+ENDPOINTS = ("health", "login")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description=(
+            "Requests per second and latency of runserver versus gunicorn (configs/gunicorn.py) over real HTTP. "
+            "Registers a user, so point DB_* at a disposable, migrated database."
+        )
+    )
+    parser.add_argument("--server", choices=tuple(SERVERS), action="append", help="Repeatable (default: all).")
+    parser.add_argument("--endpoint", choices=ENDPOINTS, action="append", help="Repeatable (default: all).")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=1000, help="Requests per endpoint.")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON.")
+    return parser.parse_args(argv)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def wait_until_serving(port: int, server: subprocess.Popen, timeout: float = 60.0) -> None:
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"server exited with {server.returncode}")
+        try:
+            if (await fetch("127.0.0.1", port, "GET", "/api/health"))[0] == 200:
+                return
+        except OSError:
+            pass
+        await asyncio.sleep(0.05)
+    raise RuntimeError(f"no 200 from /api/health within {timeout:.0f}s")
+
+
+async def run_endpoint(port: int, endpoint: str, total: int, concurrency: int, email: str) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, statuses = [], Counter()
+
+    async def one():
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                if endpoint == "health":
+                    status_code, _ = await fetch("127.0.0.1", port, "GET", "/api/health")
+                else:
+                    body = {"email": email, "password": PASSWORD}
+                    status_code, _ = await fetch("127.0.0.1", port, "POST", "/api/auth/login", body)
+            except OSError:
+                status_code = 0
+            latencies.append(time.perf_counter() - started)
+        statuses[status_code] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "endpoint": endpoint,
+        "requests": total,
+        "failures": sum(count for code, count in statuses.items() if code == 0 or code >= 400),
+        "statuses": {str(code): count for code, count in sorted(statuses.items())},
+        "seconds": round(elapsed, 3),
+        "throughput": round(total / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 2),
+        "p99_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000, 2),
+    }
+
+
+async def run_server(name: str, args) -> list[dict]:
+    port = free_port()
+    environ = {**os.environ, "DJANGO_SETTINGS_MODULE": "benchmarks.server_settings"}
+    server = subprocess.Popen(
+        [sys.executable, *SERVERS[name](port)], env=environ, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        await wait_until_serving(port, server)
+        email = f"bench-{uuid.uuid4().hex[:12]}@example.com"
+        status_code, _ = await fetch("127.0.0.1", port, "POST", "/api/auth/register", {"email": email, "password": PASSWORD})
+        if status_code != 201:
+            raise RuntimeError(f"registering the benchmark user returned {status_code}")
+        results = []
+        for endpoint in args.endpoint or list(ENDPOINTS):
+            row = await run_endpoint(port, endpoint, args.requests, args.concurrency, email)
+            results.append({"server": name, "concurrency": args.concurrency, **row})
+    finally:
+        # SIGTERM is a graceful stop for both; the time it takes is part of the result.
+        stopping = time.perf_counter()
+        server.send_signal(signal.SIGTERM)
+        server.wait()
+        stop_ms = round((time.perf_counter() - stopping) * 1000, 1)
+    return [{**row, "stop_ms": stop_ms} for row in results]
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    results = []
+    for name in args.server or list(SERVERS):
+        results.extend(asyncio.run(run_server(name, args)))
+
+    if args.json:
+        print(json.dumps(results))
+        return
+    # Login is bounded by password hashing; gunicorn splits the CPUs between the
+    # workers' hashing pools, runserver hashes in one process.
+    print(f"{'server':<10} {'endpoint':<9} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'stop ms':>9}  statuses")
+    for row in results:
+        statuses = " ".join(f"{code}x{count}" for code, count in row["statuses"].items())
+        print(
+            f"{row['server']:<10} {row['endpoint']:<9} {row['throughput']:>9} {row['p50_ms']:>9} "
+            f"{row['p99_ms']:>9} {row['stop_ms']:>9}  {statuses}"
+        )
+
+
+if __name__ == "__main__":
+    main()
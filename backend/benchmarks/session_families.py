@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import argparse
+import sys
+
+from benchmarks import runner, setup, test_database
+
+PASSWORD = "Benchmark#Pass-2026"
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description=(
+            "Refresh latency and storage growth: an OutstandingToken row per issued token plus a BlacklistedToken "
+            "row per rotation, versus one SessionFamily row per login session."
+        )
+    )
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.5, help="Minimum seconds per round.")
+    parser.add_argument("--sessions", type=int, default=50, help="Login sessions simulated for the storage comparison.")
+    parser.add_argument(
+        "--refreshes",
+        type=int,
+        default=96,
+        help="Rotations per session (default: a day of 15-minute access tokens; a week is 672).",
+    )
+    parser.add_argument("--output", default="", help="Results file (default: benchmarks/results/session-families-<timestamp>.json).")
+    return parser.parse_args(argv)
+
+
+def build_flows() -> dict:
+    from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+    from rest_framework_simplejwt.settings import api_settings
+    from rest_framework_simplejwt.tokens import RefreshToken as BaseRefreshToken
+    from rest_framework_simplejwt.tokens import TokenError
+
+    from accounts.revocation import revocation_index
+    from accounts.serializers import RefreshTokenSerializer
+    from accounts.tokens import AccessToken, RefreshToken, token_backend
+
+    class BlacklistRefreshToken(BaseRefreshToken):
+        # The refresh token before session families: outstanding row on issue,
+        # revocation index lookup on decode, blacklist row on rotation.
+        _token_backend = token_backend
+        access_token_class = AccessToken
+
+        def check_blacklist(self):
+            if revocation_index.is_revoked(self.payload[api_settings.JTI_CLAIM]):
+                raise TokenError("Token is blacklisted")
+
+        def blacklist(self):
+            result = super().blacklist()
+            revocation_index.add(self.payload[api_settings.JTI_CLAIM])
+            return result
+
+    class BlacklistRefreshSerializer(TokenRefreshSerializer):
+        token_class = BlacklistRefreshToken
+
+    def rotate(serializer_class, refresh: str) -> str:
+        serializer = serializer_class(data={"refresh": refresh})
+        serializer.is_valid(raise_exception=True)
+        return serializer.validated_data["refresh"]
+
+    return {
+        "blacklist_tables": (BlacklistRefreshToken.for_user, lambda refresh: rotate(BlacklistRefreshSerializer, refresh)),
+        "session_family": (RefreshToken.for_user, lambda refresh: rotate(RefreshTokenSerializer, refresh)),
+    }
+
+
+def table_bytes(connection, table: str) -> int | None:
+    # Table plus indexes; SQLite needs the dbstat virtual table, which most builds include.
+    from django.db import DatabaseError
+
+    queries = {
+        "postgresql": "SELECT pg_total_relation_size(%s::regclass)",
+        "sqlite": "SELECT SUM(pgsize) FROM dbstat WHERE name IN (SELECT name FROM sqlite_master WHERE tbl_name = %s)",
+    }
+    if connection.vendor not in queries:
+        return None
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(queries[connection.vendor], [table])
+            return cursor.fetchone()[0]
+    except DatabaseError:
+        return None
+
+
+def storage(models, using: str = "default") -> dict:
+    from django.db import connections
+
+    connection = connections[using]
+    return {
+        model._meta.db_table: {
+            "rows": model.objects.using(using).count(),
+            "bytes": table_bytes(connection, model._meta.db_table),
+        }
+        for model in models
+    }
+
+
+def reset(models, using: str = "default") -> None:
+    # TRUNCATE rather than DELETE, so dead rows of one flow do not count against the next.
+    from django.db import connections
+
+    connection = connections[using]
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            tables = ", ".join(connection.ops.quote_name(model._meta.db_table) for model in models)
+            cursor.execute(f"TRUNCATE {tables} CASCADE")
+        return
+    for model in models:
+        model.objects.using(using).all().delete()
+
+
+def grow(issue, rotate, user, sessions: int, refreshes: int) -> None:
+    for _ in range(sessions):
+        refresh = str(issue(user))
+        for _ in range(refreshes):
+            refresh = rotate(refresh)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    setup()
+
+    from django.db import connection
+    from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+    from accounts.models import SessionFamily, User
+
+    results = {"suite": "session_families", "config": vars(args), "benchmarks": {}, "storage": {}}
+    with test_database():
+        results["environment"] = runner.environment()
+        user = User.objects.create_user(email="bench-owner@example.com", password=PASSWORD)
+        models = (OutstandingToken, BlacklistedToken, SessionFamily)
+        for name, (issue, rotate) in build_flows().items():
+            # Each call rotates a just-issued token; a rotation costs the same at any generation.
+            results["benchmarks"][name] = runner.measure(
+                rotate, lambda issue=issue: (str(issue(user)),), rounds=args.rounds, min_time=args.min_time
+            )
+
+            reset(models)
+            grow(issue, rotate, user, args.sessions, args.refreshes)
+            if connection.vendor == "postgresql":
+                with connection.cursor() as cursor:
+                    cursor.execute("ANALYZE")
+            tables = storage(models)
+            results["storage"][name] = {
+                "tables": tables,
+                "rows": sum(table["rows"] for table in tables.values()),
+                "bytes": sum(table["bytes"] or 0 for table in tables.values()) or None,
+            }
+
+    path = runner.save(results, args.output, prefix="session-families")
+    print(f"{'refresh':<20} {'median µs':>12} {'min µs':>12} {'±':>9}")
+    for name, row in results["benchmarks"].items():
+        print(f"{name:<20} {row['median_us']:>12.1f} {row['min_us']:>12.1f} {row['stdev_us']:>9.1f}")
+    print(f"\nAfter {args.sessions} sessions x {args.refreshes} refreshes:")
+    print(f"{'storage':<20} {'rows':>10} {'bytes':>12}")
+    for name, row in results["storage"].items():
+        size = row["bytes"] if row["bytes"] is not None else "n/a"
+        print(f"{name:<20} {row['rows']:>10} {size:>12}")
+    print(f"\nSaved {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
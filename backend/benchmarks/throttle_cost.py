@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks import setup
+
+HISTORY_SIZES = (10, 100, 1000, 5000)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Per-check cost of DRF's cache-backed ScopedRateThrottle against SharedScopedRateThrottle."
+    )
+    parser.add_argument("--checks", type=int, default=2000, help="Timed checks per history size.")
+    parser.add_argument("--history", type=int, action="append", help="Requests already in the window (repeatable).")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON.")
+    return parser.parse_args(argv)
+
+
+def measure(throttle_class, view, request, history: int, checks: int) -> float:
+    # Fill the window with `history` requests, then time `checks` more.
+    throttle_class.cache.clear()
+    for _ in range(history):
+        throttle_class().allow_request(request, view)
+    started = time.perf_counter()
+    for _ in range(checks):
+        throttle_class().allow_request(request, view)
+    return (time.perf_counter() - started) / checks * 1_000_000
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    directory = tempfile.TemporaryDirectory()
+    setup(THROTTLE_SHARED_PATH=str(Path(directory.name) / "throttle"))
+
+    from django.contrib.auth.models import AnonymousUser
+    from rest_framework.test import APIRequestFactory
+    from rest_framework.throttling import ScopedRateThrottle
+    from rest_framework.views import APIView
+
+    from api.throttling import SharedScopedRateThrottle, shared_windows
+
+    # A rate high enough that every check is allowed and recorded.
+    rates = {"benchmark": "1000000/hour"}
+    ScopedRateThrottle.THROTTLE_RATES = SharedScopedRateThrottle.THROTTLE_RATES = rates
+    view = APIView()
+    view.throttle_scope = "benchmark"
+    request = APIRequestFactory().get("/", REMOTE_ADDR="10.0.0.1")
+    request.user = AnonymousUser()
+
+    results = []
+    for history in args.history or HISTORY_SIZES:
+        shared_windows.reset()
+        drf_us = measure(ScopedRateThrottle, view, request, history, args.checks)
+        shared_us = measure(SharedScopedRateThrottle, view, request, history, args.checks)
+        results.append({"history": history, "drf_locmem_us": round(drf_us, 2), "shared_us": round(shared_us, 2)})
+    directory.cleanup()
+
+    if args.json:
+        print(json.dumps(results))
+        return
+    print(f"{'history':>8} {'DRF LocMem µs':>14} {'shared µs':>10}")
+    for row in results:
+        print(f"{row['history']:>8} {row['drf_locmem_us']:>14} {row['shared_us']:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import argparse
+import sys
+
+from benchmarks import runner, setup, test_database
+
+FIELDS = ("id", "email", "is_active", "is_staff", "date_joined", "last_login", "created_at")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="/api/users page latency by depth: keyset cursor versus OFFSET.")
+    parser.add_argument("--users", type=int, default=50_000)
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--depth", type=int, action="append", help="Row offset to measure; repeatable (default: 0, 1%%, 50%%, 99%%).")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.2, help="Minimum seconds per round.")
+    parser.add_argument("--output", default="", help="Results file (default: benchmarks/results/user-directory-<timestamp>.json).")
+    return parser.parse_args(argv)
+
+
+def seed(count: int) -> None:
+    from accounts.models import User
+
+    # auto_now_add stamps each row as it is built, so created_at values are
+    # distinct but close together, and the id tie-breaker gets exercised too.
+    User.objects.bulk_create(
+        [User(email=f"user{index:07d}@example.com", password="!") for index in range(count)], batch_size=5_000
+    )
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    setup()
+
+    from django.db import connection
+
+    from accounts.models import User
+    from accounts.pagination import older_than
+
+    results = {"suite": "user_directory", "benchmarks": {}}
+    with test_database():
+        results["environment"] = runner.environment()
+        seed(args.users)
+        with connection.cursor() as cursor:
+            cursor.execute(f"ANALYZE {User._meta.db_table}")
+        ordered = User.objects.values(*FIELDS).order_by("-created_at", "-id")
+        depths = args.depth or [0, args.users // 100, args.users // 2, args.users - args.page_size]
+
+        for depth in depths:
+            # The cursor a client would hold after walking `depth` rows.
+            last = ordered[depth - 1] if depth else None
+            cursor = (last["created_at"], last["id"]) if last else None
+
+            def keyset():
+                queryset = older_than(ordered, cursor) if cursor else ordered
+                return list(queryset[: args.page_size + 1])
+
+            def offset():
+                return list(ordered[depth : depth + args.page_size])
+
+            for name, fn in (("keyset", keyset), ("offset", offset)):
+                results["benchmarks"][f"{name}:{depth}"] = runner.measure(fn, rounds=args.rounds, min_time=args.min_time)
+
+    path = runner.save(results, args.output, prefix="user-directory")
+    print(f"{'benchmark':<20} {'median µs':>12} {'min µs':>12} {'±':>9}")
+    for name, row in results["benchmarks"].items():
+        print(f"{name:<20} {row['median_us']:>12.1f} {row['min_us']:>12.1f} {row['stdev_us']:>9.1f}")
+    print(f"\nSaved {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,109 @@
+# -------- Production Server (gunicorn) --------
+# gunicorn -c configs/gunicorn.py
+# Serves configs.wsgi with threaded workers, or configs.asgi with uvicorn workers when
+# API_VIEW_MODE=async. Every GUNICORN_* variable below overrides the computed default.
+import gc
+import importlib.util
+import math
+import os
+
+
+def _available_cpus():
+    # CPUs this container may actually use: the affinity mask, capped by a cgroup v2 quota.
+    cpus = len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else os.cpu_count() or 1
+    try:
+        with open('/sys/fs/cgroup/cpu.max') as handle:
+            quota, period = handle.read().split()
+    except (OSError, ValueError):
+        return cpus
+    if quota == 'max':
+        return cpus
+    return max(1, min(cpus, math.ceil(int(quota) / int(period))))
+
+
+CPUS = _available_cpus()
+ASYNC = os.environ.get('API_VIEW_MODE', 'sync') == 'async'
+
+# -------- Sizing --------
+# Login and registration are dominated by password hashing, which runs in each worker's
+# process pool (accounts.hashing) rather than in request threads. One worker per CPU keeps
+# request handling parallel; the CPUs are then split between the workers' hashing pools so
+# the host runs about one hash per CPU at a time instead of workers * PASSWORD_HASHING_WORKERS.
+# Threads only wait (on PostgreSQL or on the hashing pool), so a few per worker are enough.
+workers = int(os.environ.get('GUNICORN_WORKERS', max(2, CPUS)))
+threads = int(os.environ.get('GUNICORN_THREADS', '4'))
+os.environ.setdefault('PASSWORD_HASHING_WORKERS', str(max(1, CPUS // workers)))
+
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'uvicorn_worker.UvicornWorker' if ASYNC else 'gthread')
+if worker_class.startswith('uvicorn_worker.') and importlib.util.find_spec('uvicorn_worker') is None:
+    raise RuntimeError(
+        f'GUNICORN_WORKER_CLASS={worker_class} (the default for API_VIEW_MODE=async) needs the uvicorn-worker '
+        'package from requirements.txt; install it or set GUNICORN_WORKER_CLASS.'
+    )
+wsgi_app = 'configs.asgi:application' if ASYNC else 'configs.wsgi:application'
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000').split(',')
+backlog = int(os.environ.get('GUNICORN_BACKLOG', '2048'))
+
+# -------- Lifecycle --------
+# The app is imported once in the master and forked, so code and settings pages are shared
+# copy-on-write. Workers are replaced after roughly GUNICORN_MAX_REQUESTS requests (jittered
+# so they do not all restart together) to bound slow leaks. On SIGTERM a worker stops
+# accepting, finishes in-flight requests within GUNICORN_GRACEFUL_TIMEOUT, then flushes
+# buffered state in worker_exit.
+preload_app = True
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', '5000'))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', str(max_requests // 10)))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', '30'))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', '30'))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', '5'))
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG', None)
+errorlog = '-'
+loglevel = os.environ.get('GUNICORN_LOG_LEVEL', 'info')
+# Keeps the heartbeat file off a possibly slow container overlay filesystem.
+worker_tmp_dir = os.environ.get('GUNICORN_WORKER_TMP_DIR', '/dev/shm' if os.path.isdir('/dev/shm') else None)
+
+
+def on_starting(server):
+    # Metrics snapshots are per worker pid; files left by a previous run would be merged into
+    # this one's counters. Workers that exit during this run are folded by child_exit.
+    from api.metrics import metrics_registry
+
+    directory = metrics_registry.directory
+    for name in os.listdir(directory) if os.path.isdir(directory) else []:
+        if name.endswith('.json'):
+            os.unlink(os.path.join(directory, name))
+
+
+def when_ready(server):
+    # Runs once in the master after the preloaded app is imported: resolve the URLconf and
+    # load the JWT keys so workers inherit them, and close connections opened while doing so
+    # (a forked connection would be shared by every worker). Then move every live object into
+    # the permanent generation so the workers' collector never writes to, and un-shares, them.
+    from django.db import connections
+    from django.urls import get_resolver
+
+    from accounts.keys import key_ring
+
+    get_resolver().url_patterns
+    key_ring.signing_key()
+    connections.close_all()
+    gc.freeze()
+
+
+def worker_exit(server, worker):
+    # Graceful exits (SIGTERM, max_requests) write what the worker still buffers.
+    from accounts.activity import last_login_buffer
+    from api.metrics import metrics_registry
+
+    last_login_buffer.flush()
+    metrics_registry.flush()
+
+
+def child_exit(server, worker):
+    # Runs in the master for every worker that exits, gracefully or not (max_requests,
+    # timeouts, crashes): its metrics snapshot is folded into the exited-workers total
+    # and deleted, so recycling workers does not grow METRICS_DIR.
+    from api.metrics import metrics_registry
+
+    metrics_registry.mark_process_dead(worker.pid)
@@ -1,8 +1,11 @@
+import json
 import os
 
 from datetime import timedelta
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -12,13 +15,20 @@ SECRET_KEY = os.environ['DJANGO_SECRET_KEY']
 ALLOWED_HOSTS = os.environ['DJANGO_ALLOWED_HOSTS'].split(',')
 
 # -------- Installed Apps --------
-INSTALLED_APPS = [
+# DJANGO_ADMIN_ENABLED=0 is for API-only workers: the admin and the session, message and
+# static file apps it needs are never imported, which shortens cold starts. The API itself
+# authenticates with JWTs and does not use them.
+DJANGO_ADMIN_ENABLED = os.environ.get('DJANGO_ADMIN_ENABLED', '1') == '1'
+_ADMIN_APPS = [
     'django.contrib.admin',
-    'django.contrib.auth',
-    'django.contrib.contenttypes',
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+]
+INSTALLED_APPS = [
+    *(_ADMIN_APPS if DJANGO_ADMIN_ENABLED else []),
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
 
     # Third-party apps
     'corsheaders',
@@ -34,8 +44,24 @@ INSTALLED_APPS = [
 
 # -------- Middleware Chain --------
 MIDDLEWARE = [
+    'api.metrics.RequestMetricsMiddleware',
+    'api.routers.ReplicaRoutingMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'api.middleware.PathScopedMiddleware',
+]
+
+# -------- Path-Scoped Middleware --------
+# PathScopedMiddleware continues the chain with the first entry whose prefix matches the
+# request path. /api/ authenticates with JWTs only, so it skips sessions, CSRF, auth and
+# messages; everything else (the admin) gets Django's full stack in its usual order.
+# api.checks runs Django's middleware checks (X-Frame-Options, CSRF, the admin's
+# dependencies) against each chain, since MIDDLEWARE alone ends at PathScopedMiddleware.
+_API_MIDDLEWARE = [
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+_ADMIN_MIDDLEWARE = [
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -43,6 +69,10 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
+SCOPED_MIDDLEWARE = [
+    ('/api/', _API_MIDDLEWARE),
+    ('', _ADMIN_MIDDLEWARE if DJANGO_ADMIN_ENABLED else _API_MIDDLEWARE),
+]
 
 ROOT_URLCONF = 'configs.urls'
 
@@ -52,6 +82,9 @@ WSGI_APPLICATION = 'configs.wsgi.application'
 # ASGI entrypoint (HTTP + WebSocket via Channels/Daphne)
 # ASGI_APPLICATION = 'configs.asgi.application'
 
+# 'async' routes auth and health to native async views (serve via configs.asgi); 'sync' keeps the APIViews
+API_VIEW_MODE = os.environ.get('API_VIEW_MODE', 'sync')
+
 # -------- Templates --------
 TEMPLATES = [
     {
@@ -60,32 +93,141 @@ TEMPLATES = [
         'APP_DIRS': True,
         'OPTIONS': {'context_processors': [
             'django.template.context_processors.request',
-            'django.contrib.auth.context_processors.auth',
-            'django.contrib.messages.context_processors.messages',
+            *([
+                'django.contrib.auth.context_processors.auth',
+                'django.contrib.messages.context_processors.messages',
+            ] if DJANGO_ADMIN_ENABLED else []),
         ]},
     },
 ]
 
 # -------- Database (PostgreSQL) --------
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.postgresql',
-        'NAME': os.environ['DB_NAME'],
-        'USER': os.environ['DB_USER'],
-        'PASSWORD': os.environ['DB_PASSWORD'],
-        'HOST': os.environ['DB_HOST'],
-        'PORT': os.environ['DB_PORT'],
+# DB_ENGINE=sqlite3 runs offline tooling (benchmarks, local experiments) without a Postgres server
+DB_ENGINE = os.environ.get('DB_ENGINE', 'postgresql')
+if DB_ENGINE == 'sqlite3':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('DB_NAME', str(BASE_DIR / 'db.sqlite3')),
+        }
     }
-}
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ['DB_NAME'],
+            'USER': os.environ['DB_USER'],
+            'PASSWORD': os.environ['DB_PASSWORD'],
+            'HOST': os.environ['DB_HOST'],
+            'PORT': os.environ['DB_PORT'],
+        }
+    }
+
+# -------- Database Connections --------
+# DB_CONN_MODE picks how request workers get a PostgreSQL connection:
+#   direct     - a new connection per request (Django's default)
+#   persistent - keep each thread's connection for DB_CONN_MAX_AGE seconds, checked before reuse
+#   pool       - a psycopg 3 pool per process, sized by DB_POOL_MIN_SIZE/DB_POOL_MAX_SIZE;
+#                a request waits at most DB_POOL_TIMEOUT seconds for a free connection
+#   pgbouncer  - behind a transaction-level pooler: persistent client connections, no
+#                server-side cursors, prepared statements or session-level advisory locks
+# Pool size and wait time are exported by /api/metrics and /api/health/ready.
+DB_CONN_MODE = os.environ.get('DB_CONN_MODE', 'direct')
+if DB_ENGINE != 'sqlite3':
+    if DB_CONN_MODE in ('persistent', 'pgbouncer'):
+        DATABASES['default']['CONN_MAX_AGE'] = int(os.environ.get('DB_CONN_MAX_AGE', '60'))
+        DATABASES['default']['CONN_HEALTH_CHECKS'] = True
+    if DB_CONN_MODE == 'pgbouncer':
+        DATABASES['default']['DISABLE_SERVER_SIDE_CURSORS'] = True
+    elif DB_CONN_MODE == 'pool':
+        DATABASES['default']['OPTIONS'] = {
+            'pool': {
+                'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', '2')),
+                'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', '10')),
+                'timeout': float(os.environ.get('DB_POOL_TIMEOUT', '10')),
+                'max_idle': float(os.environ.get('DB_POOL_MAX_IDLE', '600')),
+            },
+        }
+
+# -------- Read Replicas --------
+# DB_REPLICA_HOSTS lists replica servers (host or host:port, comma-separated) sharing the
+# primary's database name and credentials. Only reads of DB_REPLICA_MODELS use them; after
+# a user is written, reads for that user stay on the primary for DB_REPLICA_STICKY_SECONDS
+# (tracked host-wide in a shared memory table, like the throttle counters). Only writes
+# of a model instance (save(), delete()) are tracked: QuerySet.update() and bulk writes
+# such as update_last_logins() or the background rehash carry no instance and do not pin
+# reads to the primary, so use them only for columns a replica may serve stale.
+DB_REPLICA_ALIASES = []
+if DB_ENGINE != 'sqlite3':
+    for _index, _replica in enumerate(filter(None, os.environ.get('DB_REPLICA_HOSTS', '').split(',')), start=1):
+        _host, _, _port = _replica.strip().partition(':')
+        DATABASES[f'replica{_index}'] = {
+            **DATABASES['default'],
+            'HOST': _host,
+            'PORT': _port or DATABASES['default']['PORT'],
+            'TEST': {'MIRROR': 'default'},
+        }
+        DB_REPLICA_ALIASES.append(f'replica{_index}')
+DB_REPLICA_MODELS = ['accounts.user']
+DB_REPLICA_STICKY_SECONDS = float(os.environ.get('DB_REPLICA_STICKY_SECONDS', '5'))
+DB_STICKY_SHARED_PATH = os.environ.get('DB_STICKY_SHARED_PATH', '')
+DB_STICKY_SHARED_SLOTS = int(os.environ.get('DB_STICKY_SHARED_SLOTS', '16384'))
+DATABASE_ROUTERS = ['api.routers.PrimaryReplicaRouter']
+
+# -------- Admin Changelists --------
+# Unfiltered tables above the threshold show the pg_class row estimate instead of COUNT(*);
+# filtered changelists count at most ADMIN_COUNT_LIMIT rows.
+ADMIN_ESTIMATED_COUNT_THRESHOLD = int(os.environ.get('ADMIN_ESTIMATED_COUNT_THRESHOLD', '100000'))
+ADMIN_COUNT_LIMIT = int(os.environ.get('ADMIN_COUNT_LIMIT', '10000'))
 
 # -------- Authentication Policies --------
 AUTH_PASSWORD_VALIDATORS = [
-    {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
+    {'NAME': 'accounts.password_policy.UserAttributeSimilarityValidator'},
     {'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator'},
-    {'NAME': 'django.contrib.auth.password_validation.CommonPasswordValidator'},
+    {'NAME': 'accounts.password_policy.CommonPasswordValidator'},
     {'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator'},
 ]
 
+AUTHENTICATION_BACKENDS = ['accounts.backends.AccountModelBackend']
+
+# accounts_user.email is unique on lower(email) rather than on the column
+# itself, and stored emails are always lower-cased, so exact lookups are safe.
+SILENCED_SYSTEM_CHECKS = ['auth.W004']
+
+# -------- Password Hashers --------
+# Cost parameters are measured per machine with `python manage.py calibrate_hashers`.
+# Hashes made with older parameters are upgraded in the background on the next login.
+PASSWORD_HASHER_CALIBRATION_FILE = Path(os.environ.get('PASSWORD_HASHER_CALIBRATION_FILE', BASE_DIR / 'hashers.json'))
+_HASHER_CALIBRATION = (
+    json.loads(PASSWORD_HASHER_CALIBRATION_FILE.read_text()) if PASSWORD_HASHER_CALIBRATION_FILE.exists() else {}
+)
+PASSWORD_HASHER_PARAMS = _HASHER_CALIBRATION.get('hashers', {})
+_CALIBRATED_HASHERS = {
+    'pbkdf2_sha256': 'accounts.hashers.CalibratedPBKDF2PasswordHasher',
+    'scrypt': 'accounts.hashers.CalibratedScryptPasswordHasher',
+    'argon2': 'accounts.hashers.CalibratedArgon2PasswordHasher',
+    'bcrypt_sha256': 'accounts.hashers.CalibratedBCryptSHA256PasswordHasher',
+}
+_PREFERRED_HASHER = os.environ.get('PASSWORD_HASHER', _HASHER_CALIBRATION.get('preferred', 'pbkdf2_sha256'))
+if _PREFERRED_HASHER not in _CALIBRATED_HASHERS:
+    raise ImproperlyConfigured(
+        f'PASSWORD_HASHER={_PREFERRED_HASHER} is not one of: {", ".join(_CALIBRATED_HASHERS)}.'
+    )
+PASSWORD_HASHERS = [
+    _CALIBRATED_HASHERS[_PREFERRED_HASHER],
+    *(path for name, path in _CALIBRATED_HASHERS.items() if name != _PREFERRED_HASHER),
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+]
+
+# -------- Password Hashing Pool --------
+# Hashing runs in a process pool; requests beyond MAX_PENDING get 503 instead of queueing.
+# Set PASSWORD_HASHING_WORKERS=0 to hash inline (still bounded by MAX_PENDING).
+PASSWORD_HASHING_WORKERS = int(os.environ.get('PASSWORD_HASHING_WORKERS', '2'))
+PASSWORD_HASHING_MAX_PENDING = int(os.environ.get('PASSWORD_HASHING_MAX_PENDING', '32'))
+PASSWORD_HASHING_TIMEOUT = float(os.environ.get('PASSWORD_HASHING_TIMEOUT', '5'))
+PASSWORD_HASHING_START_METHOD = os.environ.get('PASSWORD_HASHING_START_METHOD', 'forkserver')
+PASSWORD_REHASH_MAX_PENDING = int(os.environ.get('PASSWORD_REHASH_MAX_PENDING', '256'))
+
 # -------- Locale --------
 LANGUAGE_CODE = 'en-us'
 TIME_ZONE = 'Asia/Ho_Chi_Minh'
@@ -112,15 +254,15 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # REST Framework Defaults
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'accounts.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
     'DEFAULT_THROTTLE_CLASSES': (
-        'rest_framework.throttling.AnonRateThrottle',
-        'rest_framework.throttling.UserRateThrottle',
-        'rest_framework.throttling.ScopedRateThrottle',
+        'api.throttling.SharedAnonRateThrottle',
+        'api.throttling.SharedUserRateThrottle',
+        'api.throttling.SharedScopedRateThrottle',
     ),
     'DEFAULT_THROTTLE_RATES': {
         'anon': '100/hour',
@@ -132,22 +274,101 @@ REST_FRAMEWORK = {
     },
 }
 
+# -------- Shared Throttle Table --------
+# Sliding-window counters shared by every worker on the host through a memory-mapped file.
+THROTTLE_SHARED_PATH = os.environ.get('THROTTLE_SHARED_PATH', '')
+THROTTLE_SHARED_SLOTS = int(os.environ.get('THROTTLE_SHARED_SLOTS', '65536'))
+
+# -------- Failed Login Guard --------
+# Failed logins are counted per email and per client network (the IPv4 /LOGIN_GUARD_IPV4_PREFIX or
+# IPv6 /LOGIN_GUARD_IPV6_PREFIX) in a table like the throttle table, over a sliding window of
+# LOGIN_GUARD_WINDOW seconds. A key at its threshold gets 429 before any password is hashed.
+LOGIN_GUARD_ENABLED = os.environ.get('LOGIN_GUARD_ENABLED', '1') == '1'
+LOGIN_GUARD_WINDOW = float(os.environ.get('LOGIN_GUARD_WINDOW', '900'))
+LOGIN_GUARD_EMAIL_FAILURES = int(os.environ.get('LOGIN_GUARD_EMAIL_FAILURES', '10'))
+LOGIN_GUARD_NETWORK_FAILURES = int(os.environ.get('LOGIN_GUARD_NETWORK_FAILURES', '100'))
+LOGIN_GUARD_IPV4_PREFIX = int(os.environ.get('LOGIN_GUARD_IPV4_PREFIX', '24'))
+LOGIN_GUARD_IPV6_PREFIX = int(os.environ.get('LOGIN_GUARD_IPV6_PREFIX', '48'))
+LOGIN_GUARD_SHARED_PATH = os.environ.get('LOGIN_GUARD_SHARED_PATH', '')
+LOGIN_GUARD_SHARED_SLOTS = int(os.environ.get('LOGIN_GUARD_SHARED_SLOTS', '65536'))
+
+# -------- JWT Signing Keys --------
+# JWT_ALGORITHM=HS256 signs with SECRET_KEY. RS256 and EdDSA sign with the private keys in
+# JWT_KEYS_DIR (<kid>.pem, created by `python manage.py generate_jwt_key`): every key there is
+# published at /api/auth/.well-known/jwks.json and JWT_ACTIVE_KID (default: the last kid in
+# sort order) signs new tokens. Keys are parsed once per process, so restart workers after a
+# rotation. Publish a new key for at least JWKS_MAX_AGE seconds before it starts signing, and
+# keep a retired one (its public key is enough) until REFRESH_TOKEN_LIFETIME has passed.
+JWT_ALGORITHM = os.environ.get('JWT_ALGORITHM', 'HS256')
+JWT_KEYS_DIR = Path(os.environ.get('JWT_KEYS_DIR', BASE_DIR / 'jwt-keys'))
+JWT_ACTIVE_KID = os.environ.get('JWT_ACTIVE_KID', '')
+JWKS_MAX_AGE = int(os.environ.get('JWKS_MAX_AGE', '300'))
+
 # JWT Settings
 SIMPLE_JWT = {
+    'ALGORITHM': JWT_ALGORITHM,
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=15),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
     'ROTATE_REFRESH_TOKENS': True,
     'BLACKLIST_AFTER_ROTATION': True,
     'UPDATE_LAST_LOGIN': True,
     'AUTH_HEADER_TYPES': ('Bearer',),
-    'AUTH_TOKEN_CLASSES': ('rest_framework_simplejwt.tokens.AccessToken',),
+    'AUTH_TOKEN_CLASSES': ('accounts.tokens.AccessToken',),
     'USER_ID_FIELD': 'id',
     'USER_ID_CLAIM': 'user_id',
 }
 
+# -------- Last Login Write-Behind --------
+# Logins buffer last_login in memory; each worker writes the batch as one UPDATE every
+# LAST_LOGIN_FLUSH_INTERVAL seconds, sooner at LAST_LOGIN_BATCH_SIZE users, and at exit.
+# Set LAST_LOGIN_FLUSH_INTERVAL=0 to write it on the login request instead.
+LAST_LOGIN_FLUSH_INTERVAL = float(os.environ.get('LAST_LOGIN_FLUSH_INTERVAL', '5'))
+LAST_LOGIN_BATCH_SIZE = int(os.environ.get('LAST_LOGIN_BATCH_SIZE', '500'))
+# Users buffered while flushes fail; logins beyond it are dropped and counted.
+LAST_LOGIN_MAX_PENDING = int(os.environ.get('LAST_LOGIN_MAX_PENDING', '100000'))
+
 # Custom User Model
 AUTH_USER_MODEL = 'accounts.User'
 
+# -------- Authenticated Principal Cache --------
+# Per-worker LRU of decoded access tokens and user snapshots used by CachedJWTAuthentication.
+# Saving or deleting a user through the ORM, on any worker of this host, reaches every
+# worker's cache through the shared change table before its next request. Writes that
+# send no post_save (QuerySet.update(), raw SQL) or that happen on another host are
+# picked up only when entries expire, up to AUTH_PRINCIPAL_CACHE_TTL seconds later,
+# unless followed by principal_cache.invalidate_user().
+AUTH_PRINCIPAL_CACHE_SIZE = int(os.environ.get('AUTH_PRINCIPAL_CACHE_SIZE', '10000'))
+AUTH_PRINCIPAL_CACHE_TTL = float(os.environ.get('AUTH_PRINCIPAL_CACHE_TTL', '60'))
+AUTH_PRINCIPAL_SHARED_PATH = os.environ.get('AUTH_PRINCIPAL_SHARED_PATH', '')
+AUTH_PRINCIPAL_SHARED_SLOTS = int(os.environ.get('AUTH_PRINCIPAL_SHARED_SLOTS', '16384'))
+
+# -------- Token Revocation Filter --------
+# Per-worker Bloom filter over blacklisted refresh tokens; only positive lookups hit the database.
+REVOCATION_FILTER_ENABLED = os.environ.get('REVOCATION_FILTER_ENABLED', '1') == '1'
+REVOCATION_FILTER_CAPACITY = int(os.environ.get('REVOCATION_FILTER_CAPACITY', '100000'))
+REVOCATION_FILTER_ERROR_RATE = float(os.environ.get('REVOCATION_FILTER_ERROR_RATE', '0.001'))
+REVOCATION_FILTER_SYNC_SECONDS = float(os.environ.get('REVOCATION_FILTER_SYNC_SECONDS', '5'))
+
+# -------- Health Probes --------
+# /api/health/ready serves the last result of these probes, refreshed by a background thread per worker.
+HEALTH_PROBE_INTERVAL = float(os.environ.get('HEALTH_PROBE_INTERVAL', '5'))
+HEALTH_READINESS_PROBES = [
+    'api.health.probe_databases',
+]
+
+# -------- Request Metrics --------
+# Served in Prometheus format at /api/metrics to staff users and to scrapers sending
+# `Authorization: Bearer <METRICS_AUTH_TOKEN>`; without a token only DEBUG serves it anonymously.
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', '1') == '1'
+METRICS_DIR = os.environ.get('METRICS_DIR', '')
+METRICS_FLUSH_INTERVAL = float(os.environ.get('METRICS_FLUSH_INTERVAL', '1'))
+METRICS_AUTH_TOKEN = os.environ.get('METRICS_AUTH_TOKEN', '')
+
+# -------- Token Purge --------
+# Defaults for `manage.py purge_expired_tokens`; run it from cron or the token-purge compose service.
+TOKEN_PURGE_BATCH_SIZE = int(os.environ.get('TOKEN_PURGE_BATCH_SIZE', '5000'))
+TOKEN_PURGE_TIME_BUDGET = float(os.environ.get('TOKEN_PURGE_TIME_BUDGET', '60'))
+
 # MongoDB Integration
 # MONGO_URL = os.environ.get('MONGO_URL')
 # MONGO_DB = os.environ.get('MONGO_DB')
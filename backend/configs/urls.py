@@ -1,9 +1,13 @@
-from django.contrib import admin
+from django.conf import settings
 from django.urls import path, include
 
 # -------- Root URL Patterns --------
 urlpatterns = [
-    path('admin/', admin.site.urls),
     # Keep /api/ as the unified entry point for all application endpoints
     path('api/', include('api.urls')),
 ]
+
+if settings.DJANGO_ADMIN_ENABLED:
+    from django.contrib import admin
+
+    urlpatterns.insert(0, path('admin/', admin.site.urls))